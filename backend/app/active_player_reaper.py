@@ -0,0 +1,76 @@
+"""
+Background expiry of stale active player sessions.
+
+Clients keep their ``active_players`` row alive by updating it (the
+``updated_at`` heartbeat). Reads already leave out rows older than
+``ACTIVE_PLAYER_TTL_SECONDS``; this task deletes them in bulk every
+``ACTIVE_PLAYER_REAP_INTERVAL_SECONDS`` so crashed or closed clients do not
+accumulate. Deleting bumps the active-player version, so spectator polls see
+the change. Every worker runs its own reaper; the delete is idempotent. Games
+held in memory by the worker (app.live_games) expire the same way.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import database
+from app.config import settings
+from app.live_games import live_games
+
+logger = logging.getLogger(__name__)
+
+
+class ActivePlayerReaper:
+    """Periodically deletes expired active player sessions."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self, session_factory: async_sessionmaker) -> None:
+        """Start reaping on the running event loop."""
+        if self._task is not None:
+            return
+        self._session_factory = session_factory
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def reap(self) -> int:
+        """Delete expired sessions now. Returns the number deleted."""
+        live_games.expire()
+        try:
+            async with self._session_factory() as db:
+                return await db.run_sync(database.delete_expired_active_players)
+        except Exception:
+            logger.exception("Failed to delete expired active players")
+            return 0
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            deleted = await self.reap()
+            if deleted:
+                logger.info("Deleted %d expired active players", deleted)
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop reaping, letting a delete in progress finish."""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        await self._task
+        self._task = None
+
+
+# Global reaper instance
+active_player_reaper = ActivePlayerReaper(interval=settings.ACTIVE_PLAYER_REAP_INTERVAL_SECONDS)
@@ -0,0 +1,258 @@
+"""
+Async database operations.
+
+Awaitable counterparts of the CRUD functions in ``app.database`` for use from
+``async def`` routes. Each function runs the synchronous implementation on the
+async connection through ``AsyncSession.run_sync``, so queries are executed by
+the async driver (aiosqlite/asyncpg) without blocking the event loop, and the
+query logic lives in one place.
+"""
+from typing import List, Optional, Tuple, Union
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import database
+from app.db_models import (
+    UserModel, LeaderboardEntryModel, ActivePlayerModel, ReplayModel, GameModeEnum
+)
+from app.leaderboard_index import leaderboard_index, IndexedEntry
+from app.rank_index import rank_index, RankedPlayer
+from app.index_sync import index_sync
+from app.models import EntryStatus, GameMode, GameState, LeaderboardWindow
+from app.security import password_hasher
+
+
+# ============================================================================
+# User Operations
+# ============================================================================
+
+async def create_user(db: AsyncSession, username: str, email: str, password: str) -> UserModel:
+    """
+    Create a new user.
+    
+    The password is hashed on the bounded hashing pool, so this raises
+    PasswordHashingBusy when that pool is saturated.
+    """
+    password_hash = await password_hasher.hash(password)
+    return await db.run_sync(database.create_user_with_hash, username, email, password_hash)
+
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[UserModel]:
+    """Get user by ID."""
+    return await db.run_sync(database.get_user_by_id, user_id)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[UserModel]:
+    """Get user by email address."""
+    return await db.run_sync(database.get_user_by_email, email)
+
+
+async def get_user_by_username(db: AsyncSession, username: str) -> Optional[UserModel]:
+    """Get user by username."""
+    return await db.run_sync(database.get_user_by_username, username)
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[UserModel]:
+    """
+    Authenticate user with email and password.
+    
+    Verification runs on the bounded hashing pool, so this raises
+    PasswordHashingBusy when that pool is saturated.
+    """
+    user = await get_user_by_email(db, email)
+    if not user:
+        return None
+    if not await password_hasher.verify(password, user.password_hash):
+        return None
+    return user
+
+
+# ============================================================================
+# Leaderboard Operations
+# ============================================================================
+
+async def create_leaderboard_entry(
+    db: AsyncSession,
+    user_id: int,
+    username: str,
+    score: int,
+    mode: GameMode,
+    status: EntryStatus = EntryStatus.UNVERIFIED
+) -> LeaderboardEntryModel:
+    """Create a new leaderboard entry."""
+    return await db.run_sync(
+        database.create_leaderboard_entry, user_id, username, score, mode, status
+    )
+
+
+async def get_leaderboard(
+    db: AsyncSession,
+    mode: Optional[GameMode] = None,
+    limit: int = 20,
+    after: Optional[Tuple[int, int]] = None
+) -> List[Row]:
+    """Get leaderboard entries (optionally a keyset page) from the database."""
+    return await db.run_sync(database.get_leaderboard, mode, limit, after)
+
+
+async def get_top_leaderboard(
+    db: AsyncSession,
+    mode: Optional[GameMode] = None,
+    limit: int = 20
+) -> List[Union[Row, IndexedEntry]]:
+    """Get leaderboard entries, from memory when the index can serve them."""
+    if index_sync.due():
+        await db.run_sync(index_sync.sync)
+    if leaderboard_index.can_serve(limit):
+        mode_enum = GameModeEnum(mode.value) if mode else None
+        return leaderboard_index.top(mode_enum, limit)
+    return await db.run_sync(database.get_leaderboard, mode, limit)
+
+
+async def get_player_rank(
+    db: AsyncSession,
+    user_id: int,
+    mode: GameMode
+) -> Optional[Tuple[int, int, RankedPlayer]]:
+    """Get a player's rank, from memory once the rank index is loaded."""
+    if index_sync.due():
+        await db.run_sync(index_sync.sync)
+    if rank_index.loaded:
+        return rank_index.rank(GameModeEnum(mode.value), user_id)
+    return await db.run_sync(database.get_player_rank, user_id, mode)
+
+
+async def get_players_around(
+    db: AsyncSession,
+    user_id: int,
+    mode: GameMode,
+    k: int = 5
+) -> Optional[Tuple[int, List[RankedPlayer]]]:
+    """Get the players ranked around a player."""
+    if index_sync.due():
+        await db.run_sync(index_sync.sync)
+    if rank_index.loaded:
+        return rank_index.around(GameModeEnum(mode.value), user_id, k)
+    return await db.run_sync(database.get_players_around, user_id, mode, k)
+
+
+async def clear_leaderboard(db: AsyncSession) -> int:
+    """Clear all leaderboard entries."""
+    return await db.run_sync(database.clear_leaderboard)
+
+
+async def get_best_scores(
+    db: AsyncSession,
+    mode: Optional[GameMode] = None,
+    limit: int = 20
+) -> List[Row]:
+    """Get the per-player leaderboard (one best score per player)."""
+    return await db.run_sync(database.get_best_scores, mode, limit)
+
+
+async def get_window_leaderboard(
+    db: AsyncSession,
+    window: LeaderboardWindow,
+    mode: Optional[GameMode] = None,
+    limit: int = 20
+) -> List[Row]:
+    """Get the leaderboard of the current day, week or season."""
+    return await db.run_sync(database.get_window_leaderboard, window, mode, limit)
+
+
+async def get_leaderboard_entry(db: AsyncSession, entry_id: int) -> Optional[LeaderboardEntryModel]:
+    """Get a single leaderboard entry."""
+    return await db.run_sync(database.get_leaderboard_entry, entry_id)
+
+
+# ============================================================================
+# Replay Operations
+# ============================================================================
+
+async def create_replay(
+    db: AsyncSession,
+    entry_id: int,
+    user_id: int,
+    seed: int,
+    mode: GameMode,
+    tick_count: int,
+    final_score: int,
+    data: bytes
+) -> ReplayModel:
+    """Store the replay of a leaderboard entry."""
+    return await db.run_sync(
+        database.create_replay, entry_id, user_id, seed, mode, tick_count, final_score, data
+    )
+
+
+async def get_replay(db: AsyncSession, entry_id: int) -> Optional[ReplayModel]:
+    """Get the replay of a leaderboard entry."""
+    return await db.run_sync(database.get_replay, entry_id)
+
+
+# ============================================================================
+# Active Player Operations
+# ============================================================================
+
+async def create_active_player(
+    db: AsyncSession,
+    user_id: int,
+    username: str,
+    score: int,
+    mode: GameMode,
+    game_state: Union[GameState, dict, bytes]
+) -> ActivePlayerModel:
+    """Create a new active player session."""
+    return await db.run_sync(
+        database.create_active_player, user_id, username, score, mode, game_state
+    )
+
+
+async def get_active_players(
+    db: AsyncSession,
+    mode: Optional[GameMode] = None
+) -> List[Row]:
+    """Get active players."""
+    return await db.run_sync(database.get_active_players, mode)
+
+
+async def get_active_player(db: AsyncSession, player_id: int) -> Optional[Row]:
+    """Get a single active player session."""
+    return await db.run_sync(database.get_active_player, player_id)
+
+
+async def update_active_player(
+    db: AsyncSession,
+    player_id: int,
+    score: int,
+    game_state: Union[GameState, dict, bytes]
+) -> Optional[ActivePlayerModel]:
+    """Update an active player's score and game state."""
+    return await db.run_sync(database.update_active_player, player_id, score, game_state)
+
+
+async def save_live_games(db: AsyncSession, rows: List[dict]) -> int:
+    """Write the latest state of games kept in memory."""
+    return await db.run_sync(database.save_live_games, rows)
+
+
+async def end_active_player(
+    db: AsyncSession,
+    player_id: int,
+    user_id: int,
+    score: int,
+    status: EntryStatus = EntryStatus.UNVERIFIED
+) -> Tuple[bool, Optional[LeaderboardEntryModel]]:
+    """End a game session and record its final score in one transaction."""
+    return await db.run_sync(database.end_active_player, player_id, user_id, score, status)
+
+
+async def delete_active_player(db: AsyncSession, player_id: int) -> bool:
+    """Delete an active player session."""
+    return await db.run_sync(database.delete_active_player, player_id)
+
+
+async def delete_expired_active_players(db: AsyncSession) -> int:
+    """Delete active player sessions whose heartbeat is older than the TTL."""
+    return await db.run_sync(database.delete_expired_active_players)
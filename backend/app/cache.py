@@ -0,0 +1,337 @@
+"""
+Response cache between the read routers and ``app.database``.
+
+Serialized (and possibly compressed) responses are cached under keys of the
+form ``<resource>:<mode>:<request details>`` (mode ``*`` for reads across all
+modes), where the details include the response's ETag and therefore the
+content versions it was built from and its representation (see
+app.negotiation). A write bumps the versions, so entries
+cached before it are never read again, even by other workers; the write
+paths in ``app.database`` also drop them soon after to free the space.
+
+Backends that do I/O (``blocking``) are never called on the event loop: the
+async helpers below run lookups and stores on the threadpool, and write paths
+hand invalidations to a background thread.
+
+Backends (``RESPONSE_CACHE_BACKEND``):
+
+- ``memory``: per-process LRU with a TTL.
+- ``sqlite``: a SQLite file shared by every worker process on the host, so an
+  invalidation in one worker is seen by all of them.
+- ``off``: no caching.
+
+Entries also expire after ``RESPONSE_CACHE_TTL_SECONDS``, which bounds how
+long a response can be stale after a write made outside the app.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+from starlette.concurrency import run_in_threadpool
+
+from app import negotiation
+from app.config import settings
+from app.db_models import GameModeEnum
+
+logger = logging.getLogger(__name__)
+
+ALL_MODES = "*"
+
+
+def cache_key(resource: str, mode: Optional[GameModeEnum], *parts: object) -> str:
+    """Key for a cached read of a resource, limited to one mode or across all modes."""
+    return ":".join([resource, mode.value if mode is not None else ALL_MODES, *(str(part) for part in parts)])
+
+
+def invalidation_prefixes(resource: str, modes: Optional[Iterable[GameModeEnum]] = None) -> List[str]:
+    """Key prefixes to drop when a resource changes in the given modes (default: all modes)."""
+    modes = set(modes) if modes is not None else set(GameModeEnum)
+    return [f"{resource}:{mode.value}:" for mode in sorted(modes)] + [f"{resource}:{ALL_MODES}:"]
+
+
+class CacheBackend:
+    """Base class for cache backends; counts hits and misses. Caches nothing itself."""
+
+    name = "off"
+    blocking = False  # Whether operations do I/O and must stay off the event loop
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "invalidations": 0, "errors": 0}
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._get(key)
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._set(key, value)
+        self._count("sets")
+
+    def invalidate(self, resource: str, modes: Optional[Iterable[GameModeEnum]] = None) -> None:
+        """Drop a resource's entries for the given modes (default: all modes)."""
+        self._delete_prefixes(invalidation_prefixes(resource, modes))
+        self._count("invalidations")
+
+    def invalidate_in_background(self, resource: str, modes: Optional[Iterable[GameModeEnum]] = None) -> None:
+        """Like ``invalidate``, without waiting for a blocking backend."""
+        self.invalidate(resource, modes)
+
+    def stats(self) -> Dict[str, object]:
+        """Counters since the process started (per worker), plus backend details."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["backend"] = self.name
+        stats["entries"] = self.size()
+        return stats
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    # Backend operations
+
+    def _get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def _set(self, key: str, value: bytes) -> None:
+        pass
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        pass
+
+    def size(self) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with a TTL."""
+
+    name = "memory"
+
+    def __init__(self, ttl: float, max_entries: int):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            found = self._entries.get(key)
+            if found is None:
+                return None
+            expires_at, value = found
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        prefixes = tuple(prefixes)
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefixes)]:
+                del self._entries[key]
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache in a local SQLite file shared by the worker processes on a host.
+
+    Expiry uses wall-clock time, which all processes agree on. Expired rows
+    are purged every ``purge_every`` writes. Backend errors (a locked file,
+    a full disk) are logged and treated as misses: the cache never fails a
+    request.
+    """
+
+    name = "sqlite"
+    blocking = True
+
+    def __init__(self, path: str, ttl: float, purge_every: int = 256):
+        super().__init__(ttl)
+        self.path = path
+        self.purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = 0
+        self._invalidator: Optional[ThreadPoolExecutor] = None
+        self._invalidator_pid = 0
+
+    def invalidate_in_background(self, resource: str, modes: Optional[Iterable[GameModeEnum]] = None) -> None:
+        # The versions already keep readers off the dropped entries, so the
+        # delete only frees space and need not finish before the write returns
+        modes = list(modes) if modes is not None else None
+        with self._lock:
+            # Threads do not survive a fork either
+            if self._invalidator is None or self._invalidator_pid != os.getpid():
+                self._invalidator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-invalidate")
+                self._invalidator_pid = os.getpid()
+            invalidator = self._invalidator
+        invalidator.submit(self.invalidate, resource, modes)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so each worker opens its own
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")  # Losing a cache entry is harmless
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def _execute(self, sql: str, params: tuple = ()) -> Optional[list]:
+        try:
+            with self._lock:
+                return self._connect().execute(sql, params).fetchall()
+        except sqlite3.Error:
+            logger.warning("Response cache operation failed", exc_info=True)
+            self._count("errors")
+            return None
+
+    def _get(self, key: str) -> Optional[bytes]:
+        rows = self._execute(
+            "SELECT value FROM response_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        )
+        return rows[0][0] if rows else None
+
+    def _set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, value, now + self.ttl)
+        )
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            self._execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+
+    def _delete_prefixes(self, prefixes: List[str]) -> None:
+        for prefix in prefixes:
+            # Keys with the prefix sort between it and the prefix with its last character incremented
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            self._execute("DELETE FROM response_cache WHERE key >= ? AND key < ?", (prefix, upper))
+
+    def size(self) -> int:
+        rows = self._execute("SELECT COUNT(*) FROM response_cache WHERE expires_at > ?", (time.time(),))
+        return rows[0][0] if rows else 0
+
+    def clear(self) -> None:
+        self._execute("DELETE FROM response_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            invalidator, self._invalidator = self._invalidator, None
+        if invalidator is not None and self._invalidator_pid == os.getpid():
+            invalidator.shutdown(wait=True)
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+def create_cache() -> CacheBackend:
+    """Create the backend selected in the settings."""
+    ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+    if settings.RESPONSE_CACHE_BACKEND == "memory":
+        return MemoryCache(ttl, settings.RESPONSE_CACHE_MAX_ENTRIES)
+    if settings.RESPONSE_CACHE_BACKEND == "sqlite":
+        return SQLiteCache(settings.RESPONSE_CACHE_PATH, ttl)
+    return CacheBackend(ttl)
+
+
+# Headers stored with a cached body (the caching headers are recomputed per request)
+CACHED_HEADERS = ("x-next-cursor", "content-type", "content-encoding")
+
+
+async def _call(operation, *args):
+    # Blocking backends run on the threadpool, others inline
+    if response_cache.blocking:
+        return await run_in_threadpool(operation, *args)
+    return operation(*args)
+
+
+async def cached_response(key: str, response: Response) -> Optional[Response]:
+    """
+    Look up a cached response.
+
+    Args:
+        key: Cache key
+        response: The endpoint's response, whose headers (ETag, ...) are kept
+
+    Returns:
+        The response to return as-is, or None on a miss
+    """
+    value = await _call(response_cache.get, key)
+    if value is None:
+        return None
+    header_line, body = value.split(b"\n", 1)
+    headers = {"content-type": negotiation.JSON_MEDIA_TYPE, **response.headers}
+    headers.update(json.loads(header_line))
+    return Response(content=body, headers=headers)
+
+
+async def cache_response(
+    key: str,
+    content: object,
+    response: Response,
+    representation: negotiation.Representation
+) -> Response:
+    """
+    Serialize an endpoint's result, cache it, and return it as a response.
+
+    Args:
+        key: Cache key; it must identify the representation (the ETag of a
+            negotiated read does)
+        content: Result to serialize: JSON-ready dicts of the endpoint's
+            response model (see app.fast_json)
+        response: The endpoint's response, whose headers are kept
+        representation: Format and coding the client negotiated
+    """
+    body, headers = negotiation.render(content, representation)
+    response.headers.update(headers)
+    stored = {name: value for name, value in response.headers.items() if name in CACHED_HEADERS}
+    await _call(response_cache.set, key, json.dumps(stored).encode() + b"\n" + body)
+    return Response(content=body, headers=dict(response.headers))
+
+
+# Global response cache
+response_cache = create_cache()
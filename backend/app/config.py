@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Placeholder signing key; only acceptable with DEBUG on (see app.security.check_secret_key)
+DEFAULT_SECRET_KEY = "dev-secret-key-change-in-production"
+
 
 class Settings:
     """Application settings."""
@@ -26,11 +29,70 @@ class Settings:
     POSTGRES_POOL_SIZE = int(os.getenv("POSTGRES_POOL_SIZE", "5"))
     POSTGRES_MAX_OVERFLOW = int(os.getenv("POSTGRES_MAX_OVERFLOW", "10"))
     POSTGRES_POOL_TIMEOUT = int(os.getenv("POSTGRES_POOL_TIMEOUT", "30"))
+    DB_YIELD_PER = int(os.getenv("DB_YIELD_PER", "1000"))  # Rows fetched per batch when streaming large reads
     
     # Application settings
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
+    SECRET_KEY: str = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)  # Signs access tokens; every worker must share it
     DEBUG: bool = os.getenv("DEBUG", "true").lower() == "true"
+    SESSION_COOKIE_SECURE: bool = os.getenv("SESSION_COOKIE_SECURE", str(not DEBUG)).lower() == "true"  # Send the session cookie over HTTPS only
+    ACCESS_TOKEN_TTL_SECONDS = int(os.getenv("ACCESS_TOKEN_TTL_SECONDS", str(7 * 24 * 3600)))  # Lifetime of signed login tokens
+    IDENTITY_CACHE_TTL_SECONDS = float(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))  # How long a resolved user is reused
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "10000"))  # Users kept per worker
+
+    # Password hashing settings
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))  # Concurrent hashing jobs
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))  # Jobs allowed to wait for a worker
+    
+    # Server settings (python -m app.server)
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))  # Worker processes forked by the supervisor
+    SETUP_LOCK_PATH: str = os.getenv("SETUP_LOCK_PATH", "/tmp/snake_glory_setup.lock")  # Serialises schema setup across processes
+    INDEX_SYNC_INTERVAL_MS = int(os.getenv("INDEX_SYNC_INTERVAL_MS", "100"))  # How often a worker catches up on other workers' scores
+    INDEX_RELOAD_PATH: str = os.getenv("INDEX_RELOAD_PATH", "/tmp/snake_glory_index_reload")  # Replaced by app.manage to make workers reload their indexes
+    
+    # Leaderboard settings
+    LEADERBOARD_INDEX_SIZE = int(os.getenv("LEADERBOARD_INDEX_SIZE", "100"))  # Top-K entries kept in memory per mode
+    LEADERBOARD_SEASON: str = os.getenv("LEADERBOARD_SEASON", "")  # Season name; empty disables the season board
+    LEADERBOARD_SEASON_START: str = os.getenv("LEADERBOARD_SEASON_START", "")  # ISO date or datetime (UTC unless it has an offset)
+    LEADERBOARD_SEASON_END: str = os.getenv("LEADERBOARD_SEASON_END", "")  # ISO date or datetime (UTC unless it has an offset), exclusive
+    LEADERBOARD_WINDOW_RETENTION_DAYS = int(os.getenv("LEADERBOARD_WINDOW_RETENTION_DAYS", "35"))  # Keep closed windows this long
+    
+    # Replay settings
+    REPLAY_KEYFRAME_INTERVAL = int(os.getenv("REPLAY_KEYFRAME_INTERVAL", "256"))  # Ticks per seekable chunk
+    REPLAY_MAX_TICKS = int(os.getenv("REPLAY_MAX_TICKS", "100000"))  # Longest replay accepted
+    
+    # Spectator settings
+    ACTIVE_PLAYER_TTL_SECONDS = int(os.getenv("ACTIVE_PLAYER_TTL_SECONDS", "60"))  # Sessions without an update for this long expire; 0 disables
+    ACTIVE_PLAYER_REAP_INTERVAL_SECONDS = float(os.getenv("ACTIVE_PLAYER_REAP_INTERVAL_SECONDS", "30"))  # How often expired sessions are deleted
+    SPECTATOR_STREAM_INTERVAL_MS = int(os.getenv("SPECTATOR_STREAM_INTERVAL_MS", "150"))  # One game tick at initial speed
+    LIVE_GAME_FLUSH_INTERVAL_MS = int(os.getenv("LIVE_GAME_FLUSH_INTERVAL_MS", "1000"))  # How often in-memory games are written to active_players
     
+    # HTTP caching settings
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))  # Seconds clients may reuse polled reads; 0 revalidates every time
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))  # Smallest read body sent gzip/brotli-compressed
+    
+    # Response cache settings
+    RESPONSE_CACHE_BACKEND: str = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # "memory", "sqlite" or "off"
+    RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "5"))  # Upper bound on staleness
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))  # LRU size of the memory backend
+    RESPONSE_CACHE_PATH: str = os.getenv("RESPONSE_CACHE_PATH", "./response_cache.db")  # File shared by workers (sqlite backend)
+    
+    # Score ingestion settings
+    SCORE_INGEST_MODE: str = os.getenv("SCORE_INGEST_MODE", "direct")  # "direct" or "buffered"
+    SCORE_INGEST_BATCH_SIZE = int(os.getenv("SCORE_INGEST_BATCH_SIZE", "500"))  # Flush when this many are buffered
+    SCORE_INGEST_FLUSH_INTERVAL_MS = int(os.getenv("SCORE_INGEST_FLUSH_INTERVAL_MS", "200"))  # Flush at least this often
+    SCORE_INGEST_BUFFER_SIZE = int(os.getenv("SCORE_INGEST_BUFFER_SIZE", "10000"))  # Max buffered submissions
+    SCORE_INGEST_MAX_ATTEMPTS = int(os.getenv("SCORE_INGEST_MAX_ATTEMPTS", "5"))  # Failed batch writes before rows are written one by one
+    
+    # Score verification settings
+    SCORE_VERIFICATION: str = os.getenv("SCORE_VERIFICATION", "off")  # "off", "optional" or "required"
+    SCORE_VERIFY_WORKERS = int(os.getenv("SCORE_VERIFY_WORKERS", str(os.cpu_count() or 1)))  # Worker processes
+    SCORE_VERIFY_BATCH_SIZE = int(os.getenv("SCORE_VERIFY_BATCH_SIZE", "16"))  # Recordings per worker call
+    SCORE_VERIFY_CPU_SECONDS = float(os.getenv("SCORE_VERIFY_CPU_SECONDS", "2"))  # CPU time allowed per recording or replay upload
+    SCORE_VERIFY_QUEUE_SIZE = int(os.getenv("SCORE_VERIFY_QUEUE_SIZE", "1000"))  # Max recordings waiting
+    SCORE_VERIFY_PENDING_TIMEOUT_SECONDS = int(os.getenv("SCORE_VERIFY_PENDING_TIMEOUT_SECONDS", "600"))  # Pending entries older than this were lost and are rejected
+
     @property
     def is_sqlite(self) -> bool:
         """Check if using SQLite database."""
@@ -41,6 +103,18 @@ class Settings:
         """Check if using PostgreSQL database."""
         return self.DATABASE_URL.startswith("postgresql")
     
+    @property
+    def async_database_url(self) -> str:
+        """Database URL using the async driver (aiosqlite or asyncpg)."""
+        url = self.DATABASE_URL
+        if url.startswith("sqlite:"):
+            return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+        if url.startswith("postgresql+psycopg2:"):
+            return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+        if url.startswith("postgresql:"):
+            return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+        return url
+    
     def get_engine_args(self) -> dict:
         """Get database engine arguments based on database type."""
         if self.is_sqlite:
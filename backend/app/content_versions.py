@@ -0,0 +1,97 @@
+"""
+Content version counters for conditional GETs.
+
+Every write path in ``app.database`` that changes what a read endpoint returns
+bumps a counter for the affected (resource, game mode) after it commits. Read
+endpoints derive a strong ETag from the counters they depend on, so a poller
+sending ``If-None-Match`` gets a 304 without the database being queried.
+
+The counters are shared by all workers of the server (see app.shared_state),
+so every worker hands out the same ETag for the same content.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+from app.config import settings
+from app.db_models import GameModeEnum
+from app.shared_state import SharedCounters, shared_counters
+
+# Resources with their own counters
+LEADERBOARD = "leaderboard"
+ACTIVE_PLAYERS = "active_players"
+
+
+class ContentVersions:
+    """Per-mode version counters."""
+
+    def __init__(self, counters: SharedCounters):
+        self._counters = counters
+
+    @property
+    def epoch(self) -> str:
+        # Counters restart at zero with the server; the epoch keeps ETags
+        # handed out before a restart from matching
+        return self._counters.epoch
+
+    def bump(self, resource: str, modes: Optional[Iterable[GameModeEnum]] = None) -> None:
+        """Record a change to a resource in the given modes (default: all modes)."""
+        for mode in set(modes) if modes is not None else GameModeEnum:
+            self._counters.increment(f"{resource}:{mode.value}")
+
+    def get(self, resource: str, mode: GameModeEnum) -> int:
+        return self._counters.get(f"{resource}:{mode.value}")
+
+    def etag(self, resource: str, mode: Optional[GameModeEnum] = None, *parts: object) -> str:
+        """
+        Strong ETag for a read of a resource.
+
+        Args:
+            resource: Resource the response is built from
+            mode: Mode the response is limited to (None: all modes)
+            parts: Anything else the response depends on (query parameters,
+                the current window key, ...)
+        """
+        modes = [mode] if mode is not None else list(GameModeEnum)
+        versions = ",".join(f"{m.value}={self.get(resource, m)}" for m in modes)
+        identity = "|".join([self.epoch, resource, versions, *(str(part) for part in parts)])
+        return '"' + hashlib.blake2b(identity.encode(), digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_control() -> str:
+    """Cache-Control value for versioned reads."""
+    if settings.HTTP_CACHE_MAX_AGE > 0:
+        return f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, must-revalidate"
+    return "no-cache"
+
+
+def conditional_get(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Handle If-None-Match for a read.
+
+    Returns:
+        A 304 response to return as-is if the client's copy is current;
+        otherwise None, after setting the caching headers on ``response``
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control()}
+    if "vary" in response.headers:
+        headers["Vary"] = response.headers["vary"]
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+# Global version counters
+content_versions = ContentVersions(shared_counters)
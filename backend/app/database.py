@@ -2,18 +2,42 @@
 Database operations using SQLAlchemy.
 This module provides CRUD operations for users, leaderboard, and active players.
 """
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, and_
-from datetime import datetime, date
+from sqlalchemy import Row, bindparam, desc, and_, or_, delete, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from datetime import datetime, date, timedelta
 import random
 
-from app.db_models import UserModel, LeaderboardEntryModel, ActivePlayerModel, GameModeEnum
+from app.db_models import (
+    UserModel, LeaderboardEntryModel, ActivePlayerModel, ReplayModel, UserBestScoreModel,
+    LeaderboardWindowScoreModel, GameModeEnum, EntryStatusEnum, VISIBLE_ENTRY_STATUSES,
+    LEADERBOARD_ENTRY_COLUMNS, BEST_SCORE_COLUMNS, WINDOW_SCORE_COLUMNS, ACTIVE_PLAYER_COLUMNS
+)
 from app.models import (
     User, LeaderboardEntry, GameMode, GameState, ActivePlayer, 
-    Direction, Position
+    Direction, Position, ReplayInfo, EntryStatus, LeaderboardWindow, RankedLeaderboardEntry
 )
+from app.config import settings
 from app.security import hash_password, verify_password
+from app.leaderboard_index import leaderboard_index, IndexedEntry
+from app.rank_index import rank_index, RankedPlayer
+from app.index_sync import index_sync
+from app.content_versions import content_versions, LEADERBOARD, ACTIVE_PLAYERS
+from app.cache import response_cache
+from app.leaderboard_windows import open_spans, prune_before, read_key, window_rotation
+from app.game_state_codec import encode_game_state, is_legacy_json, load_stored_game_state
+from app.replay import ReplayReader
+from app.engine.verify import VerificationResult
+
+
+def _content_changed(resource: str, modes: Optional[Iterable[GameModeEnum]] = None) -> None:
+    """Bump a resource's version counters and drop its cached responses (call after committing)."""
+    modes = list(modes) if modes is not None else None
+    content_versions.bump(resource, modes)
+    # Often called inside run_sync on the event loop, so do not wait for the cache
+    response_cache.invalidate_in_background(resource, modes)
 
 
 # ============================================================================
@@ -34,6 +58,27 @@ def create_user(db: Session, username: str, email: str, password: str) -> UserMo
         Created user model
     """
     password_hash = hash_password(password)
+    return create_user_with_hash(db, username, email, password_hash)
+
+
+def create_user_with_hash(
+    db: Session,
+    username: str,
+    email: str,
+    password_hash: str
+) -> UserModel:
+    """
+    Create a new user from an already hashed password.
+    
+    Args:
+        db: Database session
+        username: Username
+        email: Email address
+        password_hash: bcrypt hash of the password
+        
+    Returns:
+        Created user model
+    """
     user = UserModel(
         username=username,
         email=email,
@@ -45,6 +90,20 @@ def create_user(db: Session, username: str, email: str, password: str) -> UserMo
     return user
 
 
+def get_user_by_id(db: Session, user_id: int) -> Optional[UserModel]:
+    """
+    Get user by ID.
+    
+    Args:
+        db: Database session
+        user_id: User ID
+        
+    Returns:
+        User model or None if not found
+    """
+    return db.query(UserModel).filter(UserModel.id == user_id).first()
+
+
 def get_user_by_email(db: Session, email: str) -> Optional[UserModel]:
     """
     Get user by email address.
@@ -102,7 +161,8 @@ def create_leaderboard_entry(
     user_id: int,
     username: str,
     score: int,
-    mode: GameMode
+    mode: GameMode,
+    status: EntryStatus = EntryStatus.UNVERIFIED
 ) -> LeaderboardEntryModel:
     """
     Create a new leaderboard entry.
@@ -113,6 +173,8 @@ def create_leaderboard_entry(
         username: Username (denormalized)
         score: Game score
         mode: Game mode
+        status: Verification status; PENDING entries stay hidden until
+            the score has been verified
         
     Returns:
         Created leaderboard entry
@@ -124,37 +186,220 @@ def create_leaderboard_entry(
         user_id=user_id,
         username=username,
         score=score,
-        mode=mode_enum
+        mode=mode_enum,
+        status=EntryStatusEnum(status.value)
     )
     db.add(entry)
+    db.flush()
+    update_score_rollups(db, [entry])
     db.commit()
     db.refresh(entry)
+    leaderboard_index.add(entry)
+    rank_index.add_many([entry])
+    index_sync.published_appends([entry])
+    _content_changed(LEADERBOARD, [mode_enum])
     return entry
 
 
+def create_leaderboard_entries(
+    db: Session,
+    rows: List[dict]
+) -> List[LeaderboardEntryModel]:
+    """
+    Create many leaderboard entries in a single transaction.
+    
+    The rows are written with one multi-row INSERT ... RETURNING and a
+    single commit, which is what the buffered score ingestion uses.
+    
+    Args:
+        db: Database session
+        rows: Dicts with user_id, username, score, mode (GameModeEnum) and
+            optionally created_at
+        
+    Returns:
+        Created leaderboard entries
+    """
+    entries = insert_leaderboard_entries(db, rows)
+    publish_leaderboard_entries(entries)
+    return entries
+
+
+def insert_leaderboard_entries(
+    db: Session,
+    rows: List[dict]
+) -> List[LeaderboardEntryModel]:
+    """
+    Insert and commit leaderboard entries without publishing them.
+    
+    The first half of create_leaderboard_entries; callers that retry failed
+    writes use it to tell a failed commit from a failure after it.
+    
+    Args:
+        db: Database session
+        rows: As for create_leaderboard_entries
+        
+    Returns:
+        Created (committed) leaderboard entries
+    """
+    if not rows:
+        return []
+    
+    entries = list(db.scalars(
+        insert(LeaderboardEntryModel).returning(LeaderboardEntryModel),
+        rows
+    ))
+    update_score_rollups(db, entries)
+    db.commit()
+    return entries
+
+
+def publish_leaderboard_entries(entries: List[LeaderboardEntryModel]) -> None:
+    """
+    Add committed entries to the in-memory indexes and bump the versions.
+    
+    Args:
+        entries: Entries returned by insert_leaderboard_entries
+    """
+    if not entries:
+        return
+    leaderboard_index.add_many(entries)
+    rank_index.add_many(entries)
+    index_sync.published_appends(entries)
+    _content_changed(LEADERBOARD, (entry.mode for entry in entries))
+
+
 def get_leaderboard(
     db: Session,
     mode: Optional[GameMode] = None,
-    limit: int = 20
-) -> List[LeaderboardEntryModel]:
+    limit: int = 20,
+    after: Optional[Tuple[int, int]] = None
+) -> List[Row]:
     """
     Get leaderboard entries.
     
+    Pages are keyset-based: pass the (score, id) of the last entry of the
+    previous page as ``after`` instead of an offset, so deep pages cost the
+    same as the first one. Only the columns of LEADERBOARD_ENTRY_COLUMNS are
+    read, as plain rows rather than ORM instances.
+    
     Args:
         db: Database session
         mode: Optional game mode filter
         limit: Maximum number of entries to return
+        after: Return only entries ranked after this (score, id)
         
     Returns:
-        List of leaderboard entries ordered by score (descending)
+        Leaderboard entry rows ordered by score (descending), older entries
+        first on equal scores
     """
-    query = db.query(LeaderboardEntryModel)
+    query = select(*LEADERBOARD_ENTRY_COLUMNS).where(
+        LeaderboardEntryModel.status.in_(VISIBLE_ENTRY_STATUSES)
+    )
     
     if mode:
         mode_enum = GameModeEnum(mode.value)
-        query = query.filter(LeaderboardEntryModel.mode == mode_enum)
+        query = query.where(LeaderboardEntryModel.mode == mode_enum)
+    
+    if after is not None:
+        score, entry_id = after
+        query = query.where(or_(
+            LeaderboardEntryModel.score < score,
+            and_(LeaderboardEntryModel.score == score, LeaderboardEntryModel.id > entry_id)
+        ))
+    
+    query = query.order_by(desc(LeaderboardEntryModel.score), LeaderboardEntryModel.id).limit(limit)
+    return db.execute(query).all()
+
+
+def get_top_leaderboard(
+    db: Session,
+    mode: Optional[GameMode] = None,
+    limit: int = 20
+) -> List[Union[Row, IndexedEntry]]:
+    """
+    Get leaderboard entries from the in-memory top-K index.
+    
+    Falls back to the database when the index is not loaded or the
+    requested limit exceeds its capacity.
     
-    return query.order_by(desc(LeaderboardEntryModel.score)).limit(limit).all()
+    Args:
+        db: Database session
+        mode: Optional game mode filter
+        limit: Maximum number of entries to return
+        
+    Returns:
+        List of leaderboard entries ordered by score (descending)
+    """
+    if index_sync.due():
+        index_sync.sync(db)
+    if not leaderboard_index.can_serve(limit):
+        return get_leaderboard(db, mode=mode, limit=limit)
+    
+    mode_enum = GameModeEnum(mode.value) if mode else None
+    return leaderboard_index.top(mode_enum, limit)
+
+
+def get_player_rank(
+    db: Session,
+    user_id: int,
+    mode: GameMode
+) -> Optional[Tuple[int, int, RankedPlayer]]:
+    """
+    Get a player's rank by personal best, from the in-memory rank index.
+    
+    Args:
+        db: Database session (used to load the index if needed)
+        user_id: User ID
+        mode: Game mode
+        
+    Returns:
+        (rank, number of ranked players, player) or None if the player has
+        no score in the mode
+    """
+    if not rank_index.loaded:
+        rank_index.rebuild(db)
+    elif index_sync.due():
+        index_sync.sync(db)
+    return rank_index.rank(GameModeEnum(mode.value), user_id)
+
+
+def get_players_around(
+    db: Session,
+    user_id: int,
+    mode: GameMode,
+    k: int = 5
+) -> Optional[Tuple[int, List[RankedPlayer]]]:
+    """
+    Get up to k players ranked directly above and below a player.
+    
+    Args:
+        db: Database session (used to load the index if needed)
+        user_id: User ID
+        mode: Game mode
+        k: Number of neighbours on each side
+        
+    Returns:
+        (rank of the first player, players in rank order including the
+        player) or None if the player has no score in the mode
+    """
+    if not rank_index.loaded:
+        rank_index.rebuild(db)
+    elif index_sync.due():
+        index_sync.sync(db)
+    return rank_index.around(GameModeEnum(mode.value), user_id, k)
+
+
+def rebuild_leaderboard_index(db: Session) -> None:
+    """
+    Reload this worker's in-memory leaderboard and rank indexes from the database.
+    
+    Call this after leaderboard_entries has been modified outside the app.
+    
+    Args:
+        db: Database session
+    """
+    index_sync.reload(db)
+    _content_changed(LEADERBOARD)
 
 
 def clear_leaderboard(db: Session) -> int:
@@ -167,11 +412,513 @@ def clear_leaderboard(db: Session) -> int:
     Returns:
         Number of deleted entries
     """
+    db.query(UserBestScoreModel).delete()
+    db.query(LeaderboardWindowScoreModel).delete()
     num_deleted = db.query(LeaderboardEntryModel).delete()
     db.commit()
+    leaderboard_index.clear()
+    rank_index.clear()
+    index_sync.published_reset()
+    _content_changed(LEADERBOARD)
     return num_deleted
 
 
+def get_leaderboard_entry(db: Session, entry_id: int) -> Optional[LeaderboardEntryModel]:
+    """
+    Get a single leaderboard entry.
+    
+    Args:
+        db: Database session
+        entry_id: Leaderboard entry ID
+        
+    Returns:
+        Leaderboard entry or None if not found
+    """
+    return db.query(LeaderboardEntryModel).filter(LeaderboardEntryModel.id == entry_id).first()
+
+
+def apply_verification_results(db: Session, results: List[VerificationResult]) -> int:
+    """
+    Record the outcome of score verification.
+    
+    Verified entries get the replay produced while verifying them and are
+    added to the leaderboard index; rejected entries stay hidden.
+    
+    Args:
+        db: Database session
+        results: Results from app.engine.verify
+        
+    Returns:
+        Number of entries that were verified
+    """
+    verified = []
+    for result in results:
+        status = EntryStatusEnum(result.status)
+        updated = db.execute(
+            update(LeaderboardEntryModel)
+            .where(LeaderboardEntryModel.id == result.entry_id)
+            .where(LeaderboardEntryModel.status == EntryStatusEnum.PENDING)
+            .values(status=status)
+        ).rowcount
+        # Skip entries deleted (or already decided) while being verified
+        if not updated or status != EntryStatusEnum.VERIFIED:
+            continue
+        
+        verified.append(result.entry_id)
+        has_replay = db.query(ReplayModel.id).filter(
+            ReplayModel.leaderboard_entry_id == result.entry_id
+        ).first()
+        if not has_replay:
+            db.add(ReplayModel(
+                leaderboard_entry_id=result.entry_id,
+                user_id=result.user_id,
+                seed=result.seed,
+                mode=GameModeEnum(result.mode),
+                tick_count=result.tick_count,
+                final_score=result.final_score,
+                data=result.replay
+            ))
+    entries = []
+    if verified:
+        entries = (
+            db.query(LeaderboardEntryModel)
+            .filter(LeaderboardEntryModel.id.in_(verified))
+            .populate_existing()
+            .all()
+        )
+        update_score_rollups(db, entries)
+    db.commit()
+    
+    leaderboard_index.add_many(entries)
+    rank_index.add_many(entries)
+    if entries:
+        # Verified entries are older than the watermark other workers catch up from
+        index_sync.published_reset()
+    _content_changed(LEADERBOARD, (entry.mode for entry in entries))
+    return len(verified)
+
+
+def reject_stale_pending_entries(
+    db: Session,
+    max_age_seconds: Optional[float] = None,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Reject PENDING entries whose verification can no longer finish.
+    
+    Verification jobs live in memory, so an entry submitted before its
+    process died stays PENDING (hidden) forever. Entries pending for longer
+    than max_age_seconds are marked REJECTED; a late result for one of them
+    is ignored by apply_verification_results.
+    
+    Args:
+        db: Database session
+        max_age_seconds: Default: SCORE_VERIFY_PENDING_TIMEOUT_SECONDS
+        now: Current time (default: now)
+        
+    Returns:
+        Number of entries rejected
+    """
+    if max_age_seconds is None:
+        max_age_seconds = settings.SCORE_VERIFY_PENDING_TIMEOUT_SECONDS
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=max_age_seconds)
+    rejected = db.execute(
+        update(LeaderboardEntryModel)
+        .where(LeaderboardEntryModel.status == EntryStatusEnum.PENDING)
+        .where(LeaderboardEntryModel.created_at < cutoff)
+        .values(status=EntryStatusEnum.REJECTED)
+    ).rowcount
+    db.commit()
+    return rejected
+
+
+# ============================================================================
+# Score Rollup Operations (Personal Bests)
+# ============================================================================
+
+def update_score_rollups(db: Session, entries: List[LeaderboardEntryModel]) -> None:
+    """
+    Fold newly visible entries into the personal-best and time-window tables.
+    
+    Runs in the caller's transaction (no commit), so rollups are never
+    visible without their entries. Hidden (pending or rejected) entries are
+    ignored. Once a day this also deletes closed windows past retention.
+    
+    Args:
+        db: Database session
+        entries: Flushed leaderboard entries
+    """
+    now = datetime.utcnow()
+    if window_rotation.due(now):
+        rotate_window_scores(db, now)
+    
+    entries = sorted(
+        (entry for entry in entries if entry.status in VISIBLE_ENTRY_STATUSES),
+        key=lambda entry: entry.id
+    )
+    if entries:
+        upsert_best_scores(db, entries)
+        upsert_window_scores(db, entries)
+
+
+def _best_rows(rows: List[dict], key_columns: List[str]) -> List[dict]:
+    # Reduce to one row per key (earliest wins ties): ON CONFLICT cannot
+    # touch a row twice in one statement
+    best = {}
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        if key not in best or row["score"] > best[key]["score"]:
+            best[key] = row
+    return list(best.values())
+
+
+def _upsert_max_scores(db: Session, model, key_columns: List[str], rows: List[dict]) -> None:
+    """Insert rows, or replace existing rows with the same key when the new score is higher."""
+    rows = _best_rows(rows, key_columns)
+    if not rows:
+        return
+    
+    table = model.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[column] for column in key_columns],
+            set_={
+                column: stmt.excluded[column]
+                for column in rows[0] if column not in key_columns
+            },
+            where=stmt.excluded.score > table.c.score,
+        )
+        db.execute(stmt, rows)
+        return
+    
+    # Other databases: read-compare-write
+    for row in rows:
+        current = db.get(model, tuple(row[column] for column in key_columns))
+        if current is None:
+            db.add(model(**row))
+        elif row["score"] > current.score:
+            for column, value in row.items():
+                setattr(current, column, value)
+    db.flush()
+
+
+def _rollup_row(entry: LeaderboardEntryModel) -> dict:
+    return {
+        "user_id": entry.user_id,
+        "mode": entry.mode,
+        "username": entry.username,
+        "score": entry.score,
+        "leaderboard_entry_id": entry.id,
+        "status": entry.status,
+        "achieved_at": entry.created_at,
+    }
+
+
+def upsert_best_scores(db: Session, entries: List[LeaderboardEntryModel]) -> None:
+    """
+    Raise the personal bests of the entries' users to the entries' scores.
+    
+    On equal scores the earlier entry is kept. Does not commit.
+    
+    Args:
+        db: Database session
+        entries: Flushed, visible leaderboard entries
+    """
+    _upsert_max_scores(
+        db, UserBestScoreModel, ["user_id", "mode"],
+        [_rollup_row(entry) for entry in entries]
+    )
+
+
+def get_best_scores(
+    db: Session,
+    mode: Optional[GameMode] = None,
+    limit: int = 20
+) -> List[Row]:
+    """
+    Get the per-player leaderboard: each player's best score, once.
+    
+    Args:
+        db: Database session
+        mode: Optional game mode filter; without it a player's best across
+            all modes is used
+        limit: Maximum number of players to return
+        
+    Returns:
+        Personal best rows (BEST_SCORE_COLUMNS) ordered by score (descending)
+    """
+    def top(mode_enum: GameModeEnum) -> List[Row]:
+        return db.execute(
+            select(*BEST_SCORE_COLUMNS)
+            .where(UserBestScoreModel.mode == mode_enum)
+            .order_by(desc(UserBestScoreModel.score), UserBestScoreModel.leaderboard_entry_id)
+            .limit(limit)
+        ).all()
+    
+    if mode:
+        return top(GameModeEnum(mode.value))
+    
+    return _unique_players((row for mode_enum in GameModeEnum for row in top(mode_enum)), limit)
+
+
+def _unique_players(rows, limit: int) -> list:
+    # Each player has one row per mode, so the overall top players are
+    # contained in the union of the per-mode top lists
+    seen = set()
+    best = []
+    for row in sorted(rows, key=lambda row: (-row.score, row.leaderboard_entry_id)):
+        if row.user_id not in seen:
+            seen.add(row.user_id)
+            best.append(row)
+    return best[:limit]
+
+
+def backfill_best_scores(db: Session) -> int:
+    """
+    Rebuild user_best_scores if it is empty while leaderboard entries exist.
+    
+    Covers databases created before personal bests were tracked.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Number of personal bests written
+    """
+    if db.query(UserBestScoreModel.user_id).first() or not db.query(LeaderboardEntryModel.id).first():
+        return 0
+    return rebuild_best_scores(db)
+
+
+def rebuild_best_scores(db: Session) -> int:
+    """
+    Recompute user_best_scores from leaderboard_entries.
+    
+    For backfills and after leaderboard_entries has been modified outside
+    the app. The table is replaced in one transaction.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Number of personal bests written
+    """
+    entries = LeaderboardEntryModel.__table__
+    ranked = (
+        select(
+            entries.c.user_id,
+            entries.c.mode,
+            entries.c.username,
+            entries.c.score,
+            entries.c.id.label("leaderboard_entry_id"),
+            entries.c.status,
+            entries.c.created_at.label("achieved_at"),
+            func.row_number().over(
+                partition_by=(entries.c.user_id, entries.c.mode),
+                order_by=(entries.c.score.desc(), entries.c.id)
+            ).label("rank")
+        )
+        .where(entries.c.status.in_(VISIBLE_ENTRY_STATUSES))
+        .subquery()
+    )
+    columns = ["user_id", "mode", "username", "score", "leaderboard_entry_id", "status", "achieved_at"]
+    
+    db.execute(delete(UserBestScoreModel))
+    db.execute(
+        insert(UserBestScoreModel).from_select(
+            columns,
+            select(*(ranked.c[column] for column in columns)).where(ranked.c.rank == 1)
+        )
+    )
+    db.commit()
+    if rank_index.loaded:
+        rank_index.rebuild(db)
+    index_sync.published_reset()
+    _content_changed(LEADERBOARD)
+    return db.query(UserBestScoreModel).count()
+
+
+# ============================================================================
+# Time-Windowed Leaderboard Operations
+# ============================================================================
+
+def upsert_window_scores(db: Session, entries: List[LeaderboardEntryModel]) -> None:
+    """
+    Raise each player's best in the day, week and season the entries fall in.
+    
+    Does not commit.
+    
+    Args:
+        db: Database session
+        entries: Flushed, visible leaderboard entries
+    """
+    rows = [
+        dict(_rollup_row(entry), window_key=span.key, window_end=span.end)
+        for entry in entries
+        for span in open_spans(entry.created_at)
+    ]
+    _upsert_max_scores(db, LeaderboardWindowScoreModel, ["window_key", "user_id", "mode"], rows)
+
+
+def get_window_leaderboard(
+    db: Session,
+    window: LeaderboardWindow,
+    mode: Optional[GameMode] = None,
+    limit: int = 20,
+    now: Optional[datetime] = None
+) -> List[Row]:
+    """
+    Get the leaderboard of the current day, week or season.
+    
+    Each player appears once, with their best score in the window.
+    
+    Args:
+        db: Database session
+        window: DAY, WEEK or SEASON
+        mode: Optional game mode filter
+        limit: Maximum number of players to return
+        now: Time to resolve the current window at (default: now, UTC)
+        
+    Returns:
+        Window best rows (WINDOW_SCORE_COLUMNS) ordered by score
+        (descending); empty if the window (e.g. the season) is not configured
+    """
+    key = read_key(window, now or datetime.utcnow())
+    if key is None:
+        return []
+    
+    def top(mode_enum: GameModeEnum) -> List[Row]:
+        return db.execute(
+            select(*WINDOW_SCORE_COLUMNS)
+            .where(LeaderboardWindowScoreModel.window_key == key)
+            .where(LeaderboardWindowScoreModel.mode == mode_enum)
+            .order_by(desc(LeaderboardWindowScoreModel.score), LeaderboardWindowScoreModel.leaderboard_entry_id)
+            .limit(limit)
+        ).all()
+    
+    if mode:
+        return top(GameModeEnum(mode.value))
+    return _unique_players((row for mode_enum in GameModeEnum for row in top(mode_enum)), limit)
+
+
+def rotate_window_scores(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Delete rollups of windows that closed more than the retention period ago.
+    
+    Does not commit.
+    
+    Args:
+        db: Database session
+        now: Current time (default: now, UTC)
+        
+    Returns:
+        Number of deleted rows
+    """
+    cutoff = prune_before(now or datetime.utcnow())
+    return db.execute(
+        delete(LeaderboardWindowScoreModel).where(LeaderboardWindowScoreModel.window_end < cutoff)
+    ).rowcount
+
+
+def rebuild_window_scores(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Recompute the rollups of the currently open windows from leaderboard_entries.
+    
+    For backfills; scans the entries created since the earliest open window
+    started (idx_leaderboard_created_at).
+    
+    Args:
+        db: Database session
+        now: Current time (default: now, UTC)
+        
+    Returns:
+        Number of window rows written
+    """
+    now = now or datetime.utcnow()
+    spans = open_spans(now)
+    keys = [span.key for span in spans]
+    
+    db.execute(delete(LeaderboardWindowScoreModel).where(LeaderboardWindowScoreModel.window_key.in_(keys)))
+    entries = (
+        db.query(LeaderboardEntryModel)
+        .filter(LeaderboardEntryModel.created_at >= min(span.start for span in spans))
+        .filter(LeaderboardEntryModel.status.in_(VISIBLE_ENTRY_STATUSES))
+        .order_by(LeaderboardEntryModel.id)
+        .all()
+    )
+    rows = [
+        dict(_rollup_row(entry), window_key=span.key, window_end=span.end)
+        for entry in entries
+        for span in open_spans(entry.created_at)
+        if span.key in keys
+    ]
+    _upsert_max_scores(db, LeaderboardWindowScoreModel, ["window_key", "user_id", "mode"], rows)
+    db.commit()
+    _content_changed(LEADERBOARD)
+    return len(_best_rows(rows, ["window_key", "user_id", "mode"]))
+
+
+# ============================================================================
+# Replay Operations
+# ============================================================================
+
+def create_replay(
+    db: Session,
+    entry_id: int,
+    user_id: int,
+    seed: int,
+    mode: GameMode,
+    tick_count: int,
+    final_score: int,
+    data: bytes
+) -> ReplayModel:
+    """
+    Store the replay of a leaderboard entry.
+    
+    Args:
+        db: Database session
+        entry_id: Leaderboard entry the replay belongs to
+        user_id: User ID
+        seed: Game seed
+        mode: Game mode
+        tick_count: Number of simulated ticks
+        final_score: Score reached by the simulation
+        data: Encoded replay (see app.replay)
+        
+    Returns:
+        Created replay model
+    """
+    replay = ReplayModel(
+        leaderboard_entry_id=entry_id,
+        user_id=user_id,
+        seed=seed,
+        mode=GameModeEnum(mode.value),
+        tick_count=tick_count,
+        final_score=final_score,
+        data=data
+    )
+    db.add(replay)
+    db.commit()
+    db.refresh(replay)
+    return replay
+
+
+def get_replay(db: Session, entry_id: int) -> Optional[ReplayModel]:
+    """
+    Get the replay of a leaderboard entry.
+    
+    Args:
+        db: Database session
+        entry_id: Leaderboard entry ID
+        
+    Returns:
+        Replay model or None if the entry has no replay
+    """
+    return db.query(ReplayModel).filter(ReplayModel.leaderboard_entry_id == entry_id).first()
+
+
 # ============================================================================
 # Active Player Operations
 # ============================================================================
@@ -182,7 +929,7 @@ def create_active_player(
     username: str,
     score: int,
     mode: GameMode,
-    game_state: dict
+    game_state: Union[GameState, dict, bytes]
 ) -> ActivePlayerModel:
     """
     Create a new active player session.
@@ -193,7 +940,7 @@ def create_active_player(
         username: Username (denormalized)
         score: Current score
         mode: Game mode
-        game_state: Serialized game state
+        game_state: Game state (GameState, equivalent dict or encoded bytes)
         
     Returns:
         Created active player model
@@ -210,37 +957,69 @@ def create_active_player(
     db.add(player)
     db.commit()
     db.refresh(player)
+    _content_changed(ACTIVE_PLAYERS, [mode_enum])
     return player
 
 
+def _active_players_query(now: Optional[datetime] = None):
+    # Sessions without a heartbeat for longer than the TTL are expired
+    query = select(*ACTIVE_PLAYER_COLUMNS)
+    if settings.ACTIVE_PLAYER_TTL_SECONDS > 0:
+        cutoff = (now or datetime.utcnow()) - timedelta(seconds=settings.ACTIVE_PLAYER_TTL_SECONDS)
+        query = query.where(ActivePlayerModel.updated_at >= cutoff)
+    return query
+
+
 def get_active_players(
     db: Session,
-    mode: Optional[GameMode] = None
-) -> List[ActivePlayerModel]:
+    mode: Optional[GameMode] = None,
+    now: Optional[datetime] = None
+) -> List[Row]:
     """
-    Get active players.
+    Get active players, leaving out expired sessions.
     
     Args:
         db: Database session
         mode: Optional game mode filter
+        now: Current time (default: now, UTC)
         
     Returns:
-        List of active players
+        Active player rows (ACTIVE_PLAYER_COLUMNS), game states decoded
     """
-    query = db.query(ActivePlayerModel)
+    query = _active_players_query(now)
     
     if mode:
         mode_enum = GameModeEnum(mode.value)
-        query = query.filter(ActivePlayerModel.mode == mode_enum)
+        query = query.where(ActivePlayerModel.mode == mode_enum)
     
-    return query.order_by(desc(ActivePlayerModel.updated_at)).all()
+    return db.execute(query.order_by(desc(ActivePlayerModel.updated_at))).all()
+
+
+def get_active_player(
+    db: Session,
+    player_id: int,
+    now: Optional[datetime] = None
+) -> Optional[Row]:
+    """
+    Get a single active player session.
+    
+    Args:
+        db: Database session
+        player_id: Player ID
+        now: Current time (default: now, UTC)
+        
+    Returns:
+        Active player row (ACTIVE_PLAYER_COLUMNS) or None if not found or
+        expired
+    """
+    return db.execute(_active_players_query(now).where(ActivePlayerModel.id == player_id)).first()
 
 
 def update_active_player(
     db: Session,
     player_id: int,
     score: int,
-    game_state: dict
+    game_state: Union[GameState, dict, bytes]
 ) -> Optional[ActivePlayerModel]:
     """
     Update an active player's score and game state.
@@ -249,7 +1028,7 @@ def update_active_player(
         db: Database session
         player_id: Player ID
         score: New score
-        game_state: Updated game state
+        game_state: Updated game state (GameState, equivalent dict or encoded bytes)
         
     Returns:
         Updated player model or None if not found
@@ -261,9 +1040,116 @@ def update_active_player(
         player.updated_at = datetime.utcnow()
         db.commit()
         db.refresh(player)
+        _content_changed(ACTIVE_PLAYERS, [player.mode])
     return player
 
 
+def save_live_games(db: Session, rows: List[dict]) -> int:
+    """
+    Write the latest state of games kept in memory (see app.live_games).
+    
+    One executemany UPDATE per mode however many games changed. A row
+    written more recently than a game's state (by another worker that
+    received later ticks) is left alone. Only the modes where a row changed
+    get a new active-player version, so readers of the others keep their
+    ETags and do not reload them.
+    
+    Args:
+        db: Database session
+        rows: One dict per game with player_id, mode, score, game_state
+            (packed bytes) and updated_at
+        
+    Returns:
+        Number of rows updated
+    """
+    if not rows:
+        return 0
+    
+    table = ActivePlayerModel.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("player_id"))
+        .where(table.c.updated_at <= bindparam("state_time"))
+        .values(
+            score=bindparam("new_score"),
+            game_state=bindparam("packed_state"),
+            updated_at=bindparam("state_time"),
+        )
+    )
+    by_mode: Dict[GameModeEnum, List[dict]] = {}
+    for row in rows:
+        by_mode.setdefault(GameModeEnum(row["mode"]), []).append({
+            "player_id": row["player_id"],
+            "new_score": row["score"],
+            "packed_state": row["game_state"],
+            "state_time": row["updated_at"],
+        })
+    updated = {mode: db.execute(statement, params).rowcount for mode, params in by_mode.items()}
+    db.commit()
+    changed = [mode for mode, count in updated.items() if count]
+    if changed:
+        _content_changed(ACTIVE_PLAYERS, changed)
+    return sum(updated.values())
+
+
+def end_active_player(
+    db: Session,
+    player_id: int,
+    user_id: int,
+    score: int,
+    status: EntryStatus = EntryStatus.UNVERIFIED
+) -> Tuple[bool, Optional[LeaderboardEntryModel]]:
+    """
+    End a game session and record its final score in one transaction.
+    
+    Either both the session is deleted and the entry is written, or
+    neither. Games ending at zero leave no leaderboard entry.
+    
+    Args:
+        db: Database session
+        player_id: Player ID
+        user_id: User the session must belong to
+        score: Final score
+        status: Verification status of the entry
+        
+    Returns:
+        (False, None) if the user has no such session, otherwise True and
+        the created entry (None for a zero score)
+    """
+    player = (
+        db.query(ActivePlayerModel)
+        .filter(ActivePlayerModel.id == player_id, ActivePlayerModel.user_id == user_id)
+        .first()
+    )
+    if not player:
+        return False, None
+    
+    mode_enum = player.mode
+    entry = None
+    db.delete(player)
+    if score > 0:
+        entry = LeaderboardEntryModel(
+            user_id=user_id,
+            username=player.username,
+            score=score,
+            mode=mode_enum,
+            status=EntryStatusEnum(status.value)
+        )
+        db.add(entry)
+        db.flush()
+        update_score_rollups(db, [entry])
+    db.commit()
+    
+    _content_changed(ACTIVE_PLAYERS, [mode_enum])
+    if entry is not None:
+        db.refresh(entry)
+        leaderboard_index.add(entry)
+        rank_index.add_many([entry])
+        index_sync.published_appends([entry])
+        _content_changed(LEADERBOARD, [mode_enum])
+    return True, entry
+
+
 def delete_active_player(db: Session, player_id: int) -> bool:
     """
     Delete an active player session.
@@ -277,12 +1163,73 @@ def delete_active_player(db: Session, player_id: int) -> bool:
     """
     player = db.query(ActivePlayerModel).filter(ActivePlayerModel.id == player_id).first()
     if player:
+        mode = player.mode
         db.delete(player)
         db.commit()
+        _content_changed(ACTIVE_PLAYERS, [mode])
         return True
     return False
 
 
+def delete_expired_active_players(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Delete active player sessions whose heartbeat is older than the TTL.
+    
+    One bulk DELETE over idx_active_players_updated_at; run periodically
+    by app.active_player_reaper.
+    
+    Args:
+        db: Database session
+        now: Current time (default: now, UTC)
+        
+    Returns:
+        Number of deleted sessions
+    """
+    if settings.ACTIVE_PLAYER_TTL_SECONDS <= 0:
+        return 0
+    
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settings.ACTIVE_PLAYER_TTL_SECONDS)
+    deleted = db.execute(
+        delete(ActivePlayerModel).where(ActivePlayerModel.updated_at < cutoff)
+    ).rowcount
+    db.commit()
+    if deleted:
+        _content_changed(ACTIVE_PLAYERS)
+    return deleted
+
+
+def repack_active_player_game_states(db: Session) -> int:
+    """
+    Convert active player rows still holding JSON game states to the packed format.
+    
+    Legacy rows are readable as-is; this rewrites them so they take the
+    compact size. Safe to run repeatedly.
+    
+    Args:
+        db: Database session
+        
+    Returns:
+        Number of rows converted
+    """
+    table = ActivePlayerModel.__table__
+    # Read the raw column so values are not decoded by the column type
+    rows = db.execute(text("SELECT id, game_state FROM active_players")).all()
+    
+    converted = 0
+    for player_id, raw in rows:
+        if raw is None or not is_legacy_json(raw):
+            continue
+        db.execute(
+            update(table)
+            .where(table.c.id == player_id)
+            .values(game_state=encode_game_state(load_stored_game_state(raw)))
+        )
+        converted += 1
+    
+    db.commit()
+    return converted
+
+
 # ============================================================================
 # Database Initialization and Seeding
 # ============================================================================
@@ -349,27 +1296,108 @@ def user_model_to_pydantic(user: UserModel) -> User:
     )
 
 
-def leaderboard_model_to_pydantic(entry: LeaderboardEntryModel) -> LeaderboardEntry:
-    """Convert LeaderboardEntryModel to Pydantic LeaderboardEntry."""
+def leaderboard_model_to_pydantic(
+    entry: Union[LeaderboardEntryModel, Row, IndexedEntry]
+) -> LeaderboardEntry:
+    """Convert LeaderboardEntryModel (or a projected row or indexed copy) to Pydantic LeaderboardEntry."""
     return LeaderboardEntry(
         id=str(entry.id),
         username=entry.username,
         score=entry.score,
         mode=GameMode(entry.mode.value),
-        date=entry.created_at.date()
+        date=entry.created_at.date(),
+        status=EntryStatus(entry.status.value)
     )
 
 
-def active_player_model_to_pydantic(player: ActivePlayerModel) -> ActivePlayer:
+def active_player_model_to_pydantic(player: Union[ActivePlayerModel, Row]) -> ActivePlayer:
     """Convert ActivePlayerModel to Pydantic ActivePlayer."""
-    # Deserialize game state from JSON
-    game_state_dict = player.game_state
-    game_state = GameState(**game_state_dict)
-    
+    # The column type already decodes the stored state into a GameState
     return ActivePlayer(
         id=str(player.id),
         username=player.username,
         score=player.score,
         mode=GameMode(player.mode.value),
-        gameState=game_state
+        gameState=player.game_state
+    )
+
+
+def best_score_model_to_pydantic(
+    best: Union[UserBestScoreModel, LeaderboardWindowScoreModel, Row]
+) -> LeaderboardEntry:
+    """Convert a personal-best or window rollup row to Pydantic LeaderboardEntry (id is the entry's)."""
+    return LeaderboardEntry(
+        id=str(best.leaderboard_entry_id),
+        username=best.username,
+        score=best.score,
+        mode=GameMode(best.mode.value),
+        date=best.achieved_at.date(),
+        status=EntryStatus(best.status.value)
+    )
+
+
+def ranked_player_to_pydantic(player: RankedPlayer, mode: GameMode, rank: int) -> RankedLeaderboardEntry:
+    """Convert a rank index player to Pydantic RankedLeaderboardEntry (id is the entry's)."""
+    return RankedLeaderboardEntry(
+        id=str(player.leaderboard_entry_id),
+        username=player.username,
+        score=player.score,
+        mode=mode,
+        date=player.achieved_at.date(),
+        status=EntryStatus(player.status.value),
+        rank=rank
+    )
+
+
+# The read endpoints convert trusted rows straight to JSON-ready dicts of the
+# same shape, skipping validation (see app.fast_json)
+
+def leaderboard_model_to_dict(entry: Union[LeaderboardEntryModel, Row, IndexedEntry]) -> dict:
+    """Convert LeaderboardEntryModel (or a projected row or indexed copy) to a LeaderboardEntry dict."""
+    return {
+        "id": str(entry.id),
+        "username": entry.username,
+        "score": entry.score,
+        "mode": entry.mode.value,
+        "date": entry.created_at.date(),
+        "status": entry.status.value,
+    }
+
+
+def best_score_model_to_dict(best: Union[UserBestScoreModel, LeaderboardWindowScoreModel, Row]) -> dict:
+    """Convert a personal-best or window rollup row to a LeaderboardEntry dict (id is the entry's)."""
+    return {
+        "id": str(best.leaderboard_entry_id),
+        "username": best.username,
+        "score": best.score,
+        "mode": best.mode.value,
+        "date": best.achieved_at.date(),
+        "status": best.status.value,
+    }
+
+
+def ranked_player_to_dict(player: RankedPlayer, mode: GameMode, rank: int) -> dict:
+    """Convert a rank index player to a RankedLeaderboardEntry dict (id is the entry's)."""
+    return {
+        "id": str(player.leaderboard_entry_id),
+        "username": player.username,
+        "score": player.score,
+        "mode": mode.value,
+        "date": player.achieved_at.date(),
+        "status": player.status.value,
+        "rank": rank,
+    }
+
+
+def replay_model_to_pydantic(replay: ReplayModel) -> ReplayInfo:
+    """Convert ReplayModel to Pydantic ReplayInfo."""
+    reader = ReplayReader(replay.data)
+    return ReplayInfo(
+        entryId=str(replay.leaderboard_entry_id),
+        seed=replay.seed,
+        mode=GameMode(replay.mode.value),
+        tickCount=replay.tick_count,
+        finalScore=replay.final_score,
+        keyframeTicks=reader.keyframe_ticks,
+        size=len(replay.data)
     )
@@ -2,11 +2,13 @@
 SQLAlchemy database models for Snake Glory Lounge.
 """
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum, JSON, Index
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Enum as SQLEnum, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
 
+from app.game_state_codec import PackedGameState
+
 Base = declarative_base()
 
 
@@ -16,6 +18,18 @@ class GameModeEnum(str, enum.Enum):
     WALLS = "walls"
 
 
+class EntryStatusEnum(str, enum.Enum):
+    """Leaderboard entry verification status."""
+    UNVERIFIED = "unverified"
+    PENDING = "pending"
+    VERIFIED = "verified"
+    REJECTED = "rejected"
+
+
+# Entries shown on the leaderboard; pending and rejected ones are hidden
+VISIBLE_ENTRY_STATUSES = (EntryStatusEnum.UNVERIFIED, EntryStatusEnum.VERIFIED)
+
+
 class UserModel(Base):
     """User account model."""
     __tablename__ = "users"
@@ -29,6 +43,7 @@ class UserModel(Base):
     
     # Relationships
     leaderboard_entries = relationship("LeaderboardEntryModel", back_populates="user", cascade="all, delete-orphan")
+    best_scores = relationship("UserBestScoreModel", back_populates="user", cascade="all, delete-orphan")
     active_sessions = relationship("ActivePlayerModel", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
@@ -44,10 +59,17 @@ class LeaderboardEntryModel(Base):
     username = Column(String(50), nullable=False)  # Denormalized for faster queries
     score = Column(Integer, nullable=False)
     mode = Column(SQLEnum(GameModeEnum), nullable=False)
+    status = Column(
+        SQLEnum(EntryStatusEnum, native_enum=False, length=16),
+        nullable=False,
+        default=EntryStatusEnum.UNVERIFIED,
+        server_default=EntryStatusEnum.UNVERIFIED.name,
+    )
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     user = relationship("UserModel", back_populates="leaderboard_entries")
+    replay = relationship("ReplayModel", back_populates="entry", uselist=False, cascade="all, delete-orphan")
     
     # Indexes for common queries
     __table_args__ = (
@@ -59,6 +81,58 @@ class LeaderboardEntryModel(Base):
         return f"<LeaderboardEntryModel(id={self.id}, username='{self.username}', score={self.score}, mode='{self.mode}')>"
 
 
+class UserBestScoreModel(Base):
+    """Personal best per user and game mode, maintained on every entry write."""
+    __tablename__ = "user_best_scores"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    mode = Column(SQLEnum(GameModeEnum), primary_key=True)
+    username = Column(String(50), nullable=False)  # Denormalized for faster queries
+    score = Column(Integer, nullable=False)
+    leaderboard_entry_id = Column(
+        Integer, ForeignKey("leaderboard_entries.id", ondelete="CASCADE"), nullable=False
+    )
+    status = Column(SQLEnum(EntryStatusEnum, native_enum=False, length=16), nullable=False)
+    achieved_at = Column(DateTime, nullable=False)
+    
+    # Relationships
+    user = relationship("UserModel", back_populates="best_scores")
+    
+    # Index for the per-player leaderboard
+    __table_args__ = (
+        Index('idx_user_best_scores_mode_score', 'mode', 'score'),
+    )
+    
+    def __repr__(self):
+        return f"<UserBestScoreModel(user_id={self.user_id}, mode='{self.mode}', score={self.score})>"
+
+
+class LeaderboardWindowScoreModel(Base):
+    """Best score per user and game mode within a day, week or season."""
+    __tablename__ = "leaderboard_window_scores"
+    
+    window_key = Column(String(64), primary_key=True)  # e.g. "day:2024-05-01", "week:2024-W18"
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    mode = Column(SQLEnum(GameModeEnum), primary_key=True)
+    username = Column(String(50), nullable=False)  # Denormalized for faster queries
+    score = Column(Integer, nullable=False)
+    leaderboard_entry_id = Column(
+        Integer, ForeignKey("leaderboard_entries.id", ondelete="CASCADE"), nullable=False
+    )
+    status = Column(SQLEnum(EntryStatusEnum, native_enum=False, length=16), nullable=False)
+    achieved_at = Column(DateTime, nullable=False)
+    window_end = Column(DateTime, nullable=False)  # Rows are pruned some time after this
+    
+    # Indexes for windowed leaderboards and rotation
+    __table_args__ = (
+        Index('idx_window_scores_key_mode_score', 'window_key', 'mode', 'score'),
+        Index('idx_window_scores_window_end', 'window_end'),
+    )
+    
+    def __repr__(self):
+        return f"<LeaderboardWindowScoreModel(window_key='{self.window_key}', user_id={self.user_id}, score={self.score})>"
+
+
 class ActivePlayerModel(Base):
     """Active player session model."""
     __tablename__ = "active_players"
@@ -68,7 +142,7 @@ class ActivePlayerModel(Base):
     username = Column(String(50), nullable=False)  # Denormalized for faster queries
     score = Column(Integer, nullable=False, default=0)
     mode = Column(SQLEnum(GameModeEnum), nullable=False)
-    game_state = Column(JSON, nullable=False)  # Serialized GameState
+    game_state = Column(PackedGameState, nullable=False)  # Compact binary GameState (see app.game_state_codec)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
@@ -83,3 +157,49 @@ class ActivePlayerModel(Base):
     
     def __repr__(self):
         return f"<ActivePlayerModel(id={self.id}, username='{self.username}', score={self.score}, mode='{self.mode}')>"
+
+
+class ReplayModel(Base):
+    """Compressed replay of the game behind a leaderboard entry (see app.replay)."""
+    __tablename__ = "game_replays"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    leaderboard_entry_id = Column(
+        Integer, ForeignKey("leaderboard_entries.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    seed = Column(BigInteger, nullable=False)
+    mode = Column(SQLEnum(GameModeEnum), nullable=False)
+    tick_count = Column(Integer, nullable=False)
+    final_score = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # Header plus compressed chunks
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    entry = relationship("LeaderboardEntryModel", back_populates="replay")
+    
+    def __repr__(self):
+        return f"<ReplayModel(id={self.id}, leaderboard_entry_id={self.leaderboard_entry_id}, ticks={self.tick_count})>"
+
+
+# Columns the read paths select as plain rows instead of loading full ORM
+# instances (see app.database); the write paths keep using the models
+LEADERBOARD_ENTRY_COLUMNS = (
+    LeaderboardEntryModel.id, LeaderboardEntryModel.user_id, LeaderboardEntryModel.username,
+    LeaderboardEntryModel.score, LeaderboardEntryModel.mode, LeaderboardEntryModel.status,
+    LeaderboardEntryModel.created_at,
+)
+BEST_SCORE_COLUMNS = (
+    UserBestScoreModel.user_id, UserBestScoreModel.mode, UserBestScoreModel.username,
+    UserBestScoreModel.score, UserBestScoreModel.leaderboard_entry_id, UserBestScoreModel.status,
+    UserBestScoreModel.achieved_at,
+)
+WINDOW_SCORE_COLUMNS = (
+    LeaderboardWindowScoreModel.user_id, LeaderboardWindowScoreModel.mode, LeaderboardWindowScoreModel.username,
+    LeaderboardWindowScoreModel.score, LeaderboardWindowScoreModel.leaderboard_entry_id,
+    LeaderboardWindowScoreModel.status, LeaderboardWindowScoreModel.achieved_at,
+)
+ACTIVE_PLAYER_COLUMNS = (
+    ActivePlayerModel.id, ActivePlayerModel.user_id, ActivePlayerModel.username, ActivePlayerModel.score,
+    ActivePlayerModel.mode, ActivePlayerModel.game_state, ActivePlayerModel.updated_at,
+)
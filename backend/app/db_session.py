@@ -1,12 +1,13 @@
 """
 Database session management and dependency injection.
 """
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect, text, LargeBinary
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 from app.config import settings
 from app.db_models import Base
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 # Create database engine
 if settings.is_sqlite:
@@ -17,8 +18,22 @@ if settings.is_sqlite:
         poolclass=StaticPool,  # Use static pool for SQLite
     )
     
+    # Async engine (aiosqlite); an in-memory database needs a single shared connection
+    if ":memory:" in settings.DATABASE_URL:
+        async_engine = create_async_engine(
+            settings.async_database_url,
+            **settings.get_engine_args(),
+            poolclass=StaticPool,
+        )
+    else:
+        async_engine = create_async_engine(
+            settings.async_database_url,
+            **settings.get_engine_args(),
+        )
+    
     # Enable foreign key support for SQLite
     @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
     def set_sqlite_pragma(dbapi_conn, connection_record):
         cursor = dbapi_conn.cursor()
         cursor.execute("PRAGMA foreign_keys=ON")
@@ -30,6 +45,12 @@ else:
         settings.DATABASE_URL,
         **settings.get_engine_args(),
     )
+    
+    # Async engine (asyncpg)
+    async_engine = create_async_engine(
+        settings.async_database_url,
+        **settings.get_engine_args(),
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -38,10 +59,52 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# Create async session factory (objects stay usable after commit)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def create_tables():
     """Create all database tables."""
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+
+def upgrade_schema():
+    """
+    Apply in-place schema changes that create_all cannot make on existing tables.
+    
+    - active_players.game_state moved from JSON to the packed binary format.
+      SQLite columns are untyped, so only PostgreSQL needs the column type
+      changed; existing JSON documents are kept as UTF-8 bytes and still
+      decode (see app.database.repack_active_player_game_states).
+    - leaderboard_entries.status was added for score verification; existing
+      entries become UNVERIFIED and stay visible.
+    """
+    inspector = inspect(engine)
+    
+    if inspector.has_table("leaderboard_entries"):
+        columns = {column["name"] for column in inspector.get_columns("leaderboard_entries")}
+        if "status" not in columns:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "ALTER TABLE leaderboard_entries "
+                    "ADD COLUMN status VARCHAR(16) NOT NULL DEFAULT 'UNVERIFIED'"
+                ))
+    
+    if engine.dialect.name != "postgresql" or not inspector.has_table("active_players"):
+        return
+    
+    columns = {column["name"]: column for column in inspector.get_columns("active_players")}
+    if not isinstance(columns["game_state"]["type"], LargeBinary):
+        with engine.begin() as conn:
+            conn.execute(text(
+                "ALTER TABLE active_players ALTER COLUMN game_state TYPE bytea "
+                "USING convert_to(game_state::text, 'UTF8')"
+            ))
 
 
 def drop_tables():
@@ -67,3 +130,33 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    
+    Yields:
+        Async database session
+        
+    Usage:
+        @app.get("/endpoint")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            # Use await with the functions in app.async_database
+            pass
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Dependency function to get the async session factory.
+    
+    For long-lived handlers (e.g. WebSockets) that open their own
+    short sessions instead of holding one for the whole connection.
+    
+    Returns:
+        Async session factory
+    """
+    return AsyncSessionLocal
@@ -0,0 +1,6 @@
+"""
+Server-side snake engine.
+
+``app.engine.rules`` is a direct port of ``frontend/src/lib/gameLogic.ts`` for
+single games; ``app.engine.batch`` steps many games at once with NumPy.
+"""
@@ -0,0 +1,225 @@
+"""
+Vectorised snake engine stepping many games per call.
+
+Game state is held in NumPy arrays instead of ``List[Position]``:
+
+- ``body``: each snake as a ring buffer of cell indices (``y * GRID_SIZE + x``)
+  with ``head`` pointing at the head slot and ``length`` cells behind it
+- ``occupied``: a per-game occupancy grid, so collision checks and food
+  placement are O(1) lookups instead of scans over the snake
+
+The rules are exactly those of ``app.engine.rules`` (and the frontend).
+"""
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.engine.rules import FOOD_SCORE, MIN_SPEED, SPEED_STEP
+from app.models import (
+    Direction, GameMode, GameState, GameStatus, GRID_SIZE, INITIAL_SPEED, Position
+)
+
+CELLS = GRID_SIZE * GRID_SIZE
+
+# Direction codes, with the movement and reverse of each
+DIRECTIONS = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+NO_CHANGE = -1
+_DX = np.array([0, 0, -1, 1], dtype=np.int32)
+_DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+_OPPOSITE = np.array([1, 0, 3, 2], dtype=np.int8)
+
+# Status codes
+STATUSES = [GameStatus.IDLE, GameStatus.PLAYING, GameStatus.PAUSED, GameStatus.GAME_OVER]
+IDLE, PLAYING, PAUSED, GAME_OVER = range(4)
+
+# Food value when the snake covers the whole board
+NO_FOOD = -1
+
+# Rejection-sampling rounds before placing food by scanning free cells
+_FOOD_SAMPLE_ROUNDS = 16
+
+
+class BatchEngine:
+    """A batch of independent snake games advanced together."""
+
+    def __init__(
+        self,
+        n_games: int,
+        modes: Union[GameMode, Sequence[GameMode]] = GameMode.WALLS,
+        seed: Optional[int] = None,
+    ):
+        self.n_games = n_games
+        self.rng = np.random.default_rng(seed)
+
+        if isinstance(modes, GameMode):
+            modes = [modes] * n_games
+        self.walls = np.array([GameMode(m) == GameMode.WALLS for m in modes], dtype=bool)
+
+        self.body = np.zeros((n_games, CELLS), dtype=np.int16)
+        self.head = np.zeros(n_games, dtype=np.int32)
+        self.length = np.zeros(n_games, dtype=np.int32)
+        self.occupied = np.zeros((n_games, CELLS), dtype=bool)
+        self.direction = np.zeros(n_games, dtype=np.int8)
+        self.status = np.zeros(n_games, dtype=np.int8)
+        self.score = np.zeros(n_games, dtype=np.int32)
+        self.speed = np.zeros(n_games, dtype=np.int32)
+        self.food = np.zeros(n_games, dtype=np.int32)
+
+        self.reset()
+
+    # ------------------------------------------------------------------
+    # Setup and conversion
+    # ------------------------------------------------------------------
+
+    def reset(self, games: Optional[np.ndarray] = None, status: int = PLAYING) -> None:
+        """Put games (default: all) back to the initial 3-cell snake heading right."""
+        games = np.arange(self.n_games) if games is None else np.asarray(games)
+
+        initial = np.array([10 * GRID_SIZE + 8, 10 * GRID_SIZE + 9, 10 * GRID_SIZE + 10], dtype=np.int16)
+        self.occupied[games] = False
+        self.body[games, :3] = initial
+        self.head[games] = 2
+        self.length[games] = 3
+        self.occupied[games[:, None], initial[None, :]] = True
+        self.direction[games] = DIRECTION_CODES[Direction.RIGHT]
+        self.status[games] = status
+        self.score[games] = 0
+        self.speed[games] = INITIAL_SPEED
+        self._place_food(games)
+
+    def load(self, game: int, state: GameState) -> None:
+        """Replace one game with the given state."""
+        cells = [p.y * GRID_SIZE + p.x for p in state.snake]
+        length = len(cells)
+
+        self.occupied[game] = False
+        # Stored tail first so the head ends up at slot length - 1
+        self.body[game, :length] = cells[::-1]
+        self.head[game] = length - 1
+        self.length[game] = length
+        self.occupied[game, cells] = True
+        self.walls[game] = GameMode(state.mode) == GameMode.WALLS
+        self.direction[game] = DIRECTION_CODES[Direction(state.direction)]
+        self.status[game] = STATUSES.index(GameStatus(state.status))
+        self.score[game] = state.score
+        self.speed[game] = state.speed
+        self.food[game] = state.food.y * GRID_SIZE + state.food.x
+
+    def snake_cells(self, game: int) -> np.ndarray:
+        """Snake of one game as cell indices, head first."""
+        slots = (self.head[game] - np.arange(self.length[game])) % CELLS
+        return self.body[game, slots]
+
+    def to_game_state(self, game: int) -> GameState:
+        """Export one game as a GameState."""
+        def position(cell: int) -> Position:
+            y, x = divmod(int(cell), GRID_SIZE)
+            return Position.model_construct(x=x, y=y)
+
+        food = int(self.food[game])
+        return GameState.model_construct(
+            snake=[position(cell) for cell in self.snake_cells(game)],
+            food=position(food) if food != NO_FOOD else position(0),
+            direction=DIRECTIONS[self.direction[game]],
+            score=int(self.score[game]),
+            status=STATUSES[self.status[game]],
+            mode=GameMode.WALLS if self.walls[game] else GameMode.PASS_THROUGH,
+            speed=int(self.speed[game]),
+        )
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+
+    def step(self, directions: Union[None, int, np.ndarray] = None) -> np.ndarray:
+        """
+        Advance every playing game by one tick.
+
+        Args:
+            directions: Requested direction code per game (NO_CHANGE to keep
+                going), a single code for all games, or None
+
+        Returns:
+            Boolean mask of games that ate food this tick
+        """
+        ate_mask = np.zeros(self.n_games, dtype=bool)
+        games = np.flatnonzero(self.status == PLAYING)
+        if games.size == 0:
+            return ate_mask
+
+        current = self.direction[games]
+        if directions is None:
+            direction = current
+        else:
+            requested = np.broadcast_to(np.asarray(directions, dtype=np.int8), (self.n_games,))[games]
+            turn = (requested != NO_CHANGE) & (requested != _OPPOSITE[current])
+            direction = np.where(turn, requested, current).astype(np.int8)
+
+        head_cell = self.body[games, self.head[games]].astype(np.int32)
+        x = head_cell % GRID_SIZE + _DX[direction]
+        y = head_cell // GRID_SIZE + _DY[direction]
+
+        outside = (x < 0) | (x >= GRID_SIZE) | (y < 0) | (y >= GRID_SIZE)
+        hit_wall = outside & self.walls[games]
+        new_cell = (y % GRID_SIZE) * GRID_SIZE + x % GRID_SIZE
+
+        ate = new_cell == self.food[games]
+        tail_slot = (self.head[games] - self.length[games] + 1) % CELLS
+        tail_cell = self.body[games, tail_slot]
+        # The tail moves out of the way unless the snake grows this tick
+        hit_self = self.occupied[games, new_cell] & (ate | (new_cell != tail_cell))
+
+        dead = hit_wall | hit_self
+        self.status[games[dead]] = GAME_OVER
+
+        alive = ~dead
+        games, new_cell, ate, direction = games[alive], new_cell[alive], ate[alive], direction[alive]
+        tail_cell = tail_cell[alive]
+
+        moved = ~ate
+        self.occupied[games[moved], tail_cell[moved]] = False
+
+        head_slot = (self.head[games] + 1) % CELLS
+        self.body[games, head_slot] = new_cell
+        self.head[games] = head_slot
+        self.occupied[games, new_cell] = True
+        self.direction[games] = direction
+
+        eaters = games[ate]
+        if eaters.size:
+            self.length[eaters] += 1
+            self.score[eaters] += FOOD_SCORE
+            self.speed[eaters] = np.maximum(MIN_SPEED, self.speed[eaters] - SPEED_STEP)
+            self._place_food(eaters)
+            ate_mask[eaters] = True
+
+        return ate_mask
+
+    def _place_food(self, games: np.ndarray) -> None:
+        """Place food uniformly on a free cell for each of the given games."""
+        pending = np.asarray(games)
+        for _ in range(_FOOD_SAMPLE_ROUNDS):
+            if pending.size == 0:
+                return
+            cells = self.rng.integers(0, CELLS, size=pending.size)
+            free = ~self.occupied[pending, cells]
+            self.food[pending[free]] = cells[free]
+            pending = pending[~free]
+
+        # Nearly full boards: choose among the remaining free cells directly
+        for game in pending:
+            free_cells = np.flatnonzero(~self.occupied[game])
+            self.food[game] = self.rng.choice(free_cells) if free_cells.size else NO_FOOD
+
+    @property
+    def playing(self) -> np.ndarray:
+        """Boolean mask of games still in progress."""
+        return self.status == PLAYING
+
+    def direction_codes(self, directions: List[Optional[Direction]]) -> np.ndarray:
+        """Convert a list of directions (None for no change) to step() codes."""
+        return np.array(
+            [NO_CHANGE if d is None else DIRECTION_CODES[Direction(d)] for d in directions],
+            dtype=np.int8,
+        )
@@ -0,0 +1,67 @@
+"""
+Portable seeded randomness for reproducible games.
+
+Replays and score verification need the server to place food exactly where
+the client did. Python's ``random`` cannot be reproduced in the browser, so
+food placement in seeded games uses Mulberry32, a 32-bit generator that is a
+few lines in TypeScript:
+
+    function mulberry32(a: number) {
+      return () => {
+        let t = (a += 0x6d2b79f5);
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+      };
+    }
+
+Each food placement gets its own generator seeded from the game seed and the
+number of foods eaten so far (``food_rng``), so any point of a game can be
+resumed from its state alone without carrying generator state around.
+"""
+from typing import List
+
+from app.engine.rules import FOOD_SCORE, FoodGenerator, generate_food
+from app.models import Position
+
+_MASK = 0xFFFFFFFF
+_GOLDEN = 0x9E3779B9
+
+
+def _imul(a: int, b: int) -> int:
+    return (a * b) & _MASK
+
+
+class Mulberry32:
+    """Mulberry32 generator exposing ``random()`` like ``random.Random``."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed: int):
+        self.state = seed & _MASK
+
+    def random(self) -> float:
+        self.state = (self.state + 0x6D2B79F5) & _MASK
+        t = self.state
+        t = _imul(t ^ (t >> 15), t | 1)
+        t ^= (t + _imul(t ^ (t >> 7), t | 61)) & _MASK
+        return ((t ^ (t >> 14)) & _MASK) / 4294967296
+
+
+def food_rng(seed: int, food_index: int) -> Mulberry32:
+    """Generator for the ``food_index``-th food of a seeded game (JS: ``mulberry32((seed ^ Math.imul(index, 0x9e3779b9)) >>> 0)``)."""
+    return Mulberry32((seed ^ _imul(food_index, _GOLDEN)) & _MASK)
+
+
+def seeded_food_generator(seed: int, score: int) -> FoodGenerator:
+    """
+    Food placement for the move that is about to eat, given the score before it.
+
+    Use with ``move_snake(..., food_generator=...)``.
+    """
+    food_index = score // FOOD_SCORE + 1
+
+    def generate(snake: List[Position]) -> Position:
+        return generate_food(snake, food_rng(seed, food_index))
+
+    return generate
@@ -0,0 +1,172 @@
+"""
+Snake game rules for a single game.
+
+A line-for-line port of ``frontend/src/lib/gameLogic.ts`` so the server can
+reproduce exactly what the client does. Functions take and return GameState
+models; results are built without re-validation since they are derived from
+already valid states.
+"""
+import random
+from typing import Callable, List, Optional
+
+from app.models import (
+    Direction, GameMode, GameState, GameStatus, GRID_SIZE, INITIAL_SPEED, Position
+)
+
+# Score gained and speed lost (ms per tick) per food eaten
+FOOD_SCORE = 10
+SPEED_STEP = 2
+MIN_SPEED = 50
+
+_OPPOSITES = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
+FoodGenerator = Callable[[List[Position]], Position]
+
+
+def _position(x: int, y: int) -> Position:
+    return Position.model_construct(x=x, y=y)
+
+
+def create_initial_state(mode: GameMode, rng: Optional[random.Random] = None) -> GameState:
+    """Create a new idle game with a 3-cell snake heading right."""
+    initial_snake = [_position(10, 10), _position(9, 10), _position(8, 10)]
+
+    return GameState.model_construct(
+        snake=initial_snake,
+        food=generate_food(initial_snake, rng),
+        direction=Direction.RIGHT,
+        score=0,
+        status=GameStatus.IDLE,
+        mode=mode,
+        speed=INITIAL_SPEED,
+    )
+
+
+def generate_food(snake: List[Position], rng: Optional[random.Random] = None) -> Position:
+    """
+    Pick a random cell not covered by the snake.
+
+    Raises:
+        ValueError: If the snake covers the whole board (the client would
+            loop forever here)
+    """
+    rng = rng or random
+    occupied = {(segment.x, segment.y) for segment in snake}
+    if len(occupied) >= GRID_SIZE * GRID_SIZE:
+        raise ValueError("No free cell left for food")
+
+    while True:
+        x = int(rng.random() * GRID_SIZE)
+        y = int(rng.random() * GRID_SIZE)
+        if (x, y) not in occupied:
+            return _position(x, y)
+
+
+def get_next_position(head: Position, direction: Direction, mode: GameMode) -> Position:
+    """Cell the head moves to, wrapping around the edges in pass-through mode."""
+    x, y = head.x, head.y
+
+    if direction == Direction.UP:
+        y -= 1
+    elif direction == Direction.DOWN:
+        y += 1
+    elif direction == Direction.LEFT:
+        x -= 1
+    elif direction == Direction.RIGHT:
+        x += 1
+
+    # Handle pass-through mode (wrap around)
+    if mode == GameMode.PASS_THROUGH:
+        if x < 0:
+            x = GRID_SIZE - 1
+        if x >= GRID_SIZE:
+            x = 0
+        if y < 0:
+            y = GRID_SIZE - 1
+        if y >= GRID_SIZE:
+            y = 0
+
+    return _position(x, y)
+
+
+def check_wall_collision(position: Position) -> bool:
+    return position.x < 0 or position.x >= GRID_SIZE or position.y < 0 or position.y >= GRID_SIZE
+
+
+def check_self_collision(snake: List[Position]) -> bool:
+    head, body = snake[0], snake[1:]
+    return any(segment.x == head.x and segment.y == head.y for segment in body)
+
+
+def check_food_collision(head: Position, food: Position) -> bool:
+    return head.x == food.x and head.y == food.y
+
+
+def is_opposite_direction(current: Direction, next: Direction) -> bool:
+    return _OPPOSITES[current] == next
+
+
+def move_snake(
+    state: GameState,
+    new_direction: Optional[Direction] = None,
+    rng: Optional[random.Random] = None,
+    food_generator: Optional[FoodGenerator] = None,
+) -> GameState:
+    """
+    Advance a game by one tick.
+
+    Args:
+        state: Current state
+        new_direction: Direction requested this tick, ignored if it reverses the snake
+        rng: Random source for food placement
+        food_generator: Overrides food placement entirely (used to replay or
+            cross-check games whose food positions are already known)
+
+    Returns:
+        The next state (the same object if the game is not playing)
+    """
+    if state.status != GameStatus.PLAYING:
+        return state
+
+    direction = (
+        new_direction
+        if new_direction and not is_opposite_direction(state.direction, new_direction)
+        else state.direction
+    )
+
+    head = state.snake[0]
+    new_head = get_next_position(head, direction, state.mode)
+
+    # Check wall collision in walls mode
+    if state.mode == GameMode.WALLS and check_wall_collision(new_head):
+        return state.model_copy(update={"status": GameStatus.GAME_OVER})
+
+    new_snake = [new_head, *state.snake]
+
+    # Check if food is eaten
+    ate_food = check_food_collision(new_head, state.food)
+
+    if not ate_food:
+        new_snake.pop()
+
+    # Check self collision after moving
+    if check_self_collision(new_snake):
+        return state.model_copy(update={"status": GameStatus.GAME_OVER})
+
+    if ate_food:
+        food = food_generator(new_snake) if food_generator else generate_food(new_snake, rng)
+    else:
+        food = state.food
+
+    return state.model_copy(update={
+        "snake": new_snake,
+        "food": food,
+        "score": state.score + FOOD_SCORE if ate_food else state.score,
+        "direction": direction,
+        "speed": max(MIN_SPEED, state.speed - SPEED_STEP) if ate_food else state.speed,
+    })
@@ -0,0 +1,181 @@
+"""
+Score verification by re-simulation.
+
+These functions run in worker processes (see ``app.score_verification``), so
+jobs and results are small picklable tuples and nothing here touches the
+database.
+
+Uploaded replays (``app.routers.replays``) are built here too, under the same
+CPU-time cap, by ``build_replay_limited``.
+
+A submission is verified when its recording replays, from the standard
+initial state of a seeded game, to exactly the claimed score. Each job is
+limited to ``max_ticks`` simulated ticks and ``cpu_seconds`` of CPU time, so a
+hostile recording can only cost its own job and not the worker.
+"""
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from app.engine.prng import food_rng
+from app.engine.rules import create_initial_state
+from app.models import GameMode, GameState
+from app.replay import ReplayError, build_replay
+
+VERIFIED = "verified"
+REJECTED = "rejected"
+
+
+class VerificationJob(NamedTuple):
+    """A pending leaderboard entry and the recording it claims."""
+
+    entry_id: int
+    user_id: int
+    score: int
+    mode: str
+    seed: int
+    tick_count: int
+    initial_state: dict
+    inputs: List[Tuple[int, str]]
+
+
+class VerificationResult(NamedTuple):
+    """Outcome of one job; ``replay`` is the encoded replay when verified."""
+
+    entry_id: int
+    user_id: int
+    status: str
+    reason: Optional[str]
+    mode: str
+    seed: int
+    tick_count: int
+    final_score: int
+    replay: Optional[bytes]
+
+
+class CpuLimitExceeded(Exception):
+    """Raised inside a job that used up its CPU-time budget."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise CpuLimitExceeded()
+
+
+@contextmanager
+def cpu_limit(seconds: float) -> Iterator[None]:
+    """
+    Raise CpuLimitExceeded once the block has used ``seconds`` of CPU time.
+
+    Uses a profiling interval timer, which counts CPU time rather than wall
+    time. Timers are only available on POSIX and only from the main thread
+    (which is where process pool jobs run); elsewhere the block runs with
+    only the tick cap as a bound.
+    """
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    previous = signal.signal(signal.SIGPROF, _on_cpu_limit)
+    signal.setitimer(signal.ITIMER_PROF, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous)
+
+
+def expected_initial_state(mode: GameMode, seed: int) -> GameState:
+    """The state every seeded game starts from (first food from ``food_rng(seed, 0)``)."""
+    return create_initial_state(mode, food_rng(seed, 0))
+
+
+def _result(job: VerificationJob, status: str, reason: Optional[str] = None, game=None, replay: Optional[bytes] = None) -> VerificationResult:
+    return VerificationResult(
+        entry_id=job.entry_id,
+        user_id=job.user_id,
+        status=status,
+        reason=reason,
+        mode=job.mode,
+        seed=job.seed,
+        tick_count=game.tick_count if game else 0,
+        final_score=game.final_state.score if game else 0,
+        replay=replay,
+    )
+
+
+def reject(job: VerificationJob, reason: str) -> VerificationResult:
+    """Rejected result for a job, e.g. one that could not be run at all."""
+    return _result(job, REJECTED, reason)
+
+
+def verify_job(job: VerificationJob, cpu_seconds: float, max_ticks: int, keyframe_interval: int) -> VerificationResult:
+    """Re-simulate one recording and compare the outcome to the claimed score."""
+    if job.tick_count > max_ticks:
+        return reject(job, "Recording is too long")
+
+    try:
+        mode = GameMode(job.mode)
+        initial_state = GameState.model_validate(job.initial_state)
+    except ValueError:
+        return reject(job, "Malformed recording")
+
+    # Only games started from the standard seeded state can be verified
+    expected = expected_initial_state(mode, job.seed)
+    if initial_state.model_dump(exclude={"status"}) != expected.model_dump(exclude={"status"}):
+        return reject(job, "Initial state does not match the seed")
+
+    try:
+        with cpu_limit(cpu_seconds):
+            game, data = build_replay(
+                job.seed,
+                initial_state,
+                job.inputs,
+                job.tick_count,
+                keyframe_interval,
+            )
+    except CpuLimitExceeded:
+        return reject(job, "CPU time limit exceeded")
+    except (ReplayError, ValueError) as e:
+        return reject(job, str(e))
+
+    if game.final_state.score != job.score:
+        return _result(job, REJECTED, "Score does not match the recording", game)
+    return _result(job, VERIFIED, None, game, data)
+
+
+def verify_batch(
+    jobs: List[VerificationJob],
+    cpu_seconds: float,
+    max_ticks: int,
+    keyframe_interval: int,
+) -> List[VerificationResult]:
+    """Verify a batch of jobs in one worker call."""
+    return [verify_job(job, cpu_seconds, max_ticks, keyframe_interval) for job in jobs]
+
+
+def build_replay_limited(
+    seed: int,
+    initial_state: dict,
+    inputs: List[Tuple[int, str]],
+    tick_count: int,
+    cpu_seconds: float,
+    keyframe_interval: int,
+) -> Tuple[int, int, bytes]:
+    """
+    Build an uploaded replay within ``cpu_seconds`` of CPU time.
+
+    Returns:
+        (ticks simulated, final score, encoded replay)
+
+    Raises:
+        ReplayError: If the upload is invalid or uses up its CPU time
+    """
+    try:
+        with cpu_limit(cpu_seconds):
+            game, data = build_replay(
+                seed, GameState.model_validate(initial_state), inputs, tick_count, keyframe_interval
+            )
+    except CpuLimitExceeded:
+        raise ReplayError("Replay exceeds the CPU time limit")
+    return game.tick_count, game.final_state.score, data
@@ -0,0 +1,35 @@
+"""
+Fast JSON encoding for responses built from trusted data.
+
+Rows read back from the database (and the in-memory indexes and live games)
+were validated on the way in. The read endpoints therefore convert them
+straight to JSON-ready dicts (the ``*_to_dict`` converters in
+``app.database``) and encode them with orjson, instead of building validated
+Pydantic models that FastAPI would validate and encode once more through the
+``response_model``. The response models stay on the routes for the OpenAPI
+schema. ``python -m benchmarks.bench_serialization`` compares both paths.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def _default(value: Any) -> Any:
+    # Anything orjson has no native support for; models are rare here
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode dicts, lists, strings, numbers, enums and dates (and the odd model) as JSON."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson; return it from an endpoint to skip response_model validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,102 @@
+"""
+Reloading the in-memory leaderboard indexes after changes made outside the server.
+
+Workers learn about each other's leaderboard writes through the shared
+counters (app.index_sync), which other processes cannot reach. A maintenance
+command that changes the leaderboard tables (``python -m app.manage``)
+instead replaces the file at ``INDEX_RELOAD_PATH``. Every worker checks the
+file every ``INDEX_SYNC_INTERVAL_MS``; when it has changed, the worker
+reloads its leaderboard and rank indexes before the next read and bumps the
+leaderboard versions, so ETags and cached responses from before the change
+are not reused. The manager and the server must share the path (same host).
+"""
+import asyncio
+import logging
+import os
+from typing import Optional, Tuple
+
+from app.cache import response_cache
+from app.config import settings
+from app.content_versions import content_versions, LEADERBOARD
+from app.index_sync import index_sync
+
+logger = logging.getLogger(__name__)
+
+
+def request_reload(path: Optional[str] = None) -> None:
+    """Ask every running worker to reload its leaderboard indexes."""
+    path = path or settings.INDEX_RELOAD_PATH
+    temporary = f"{path}.{os.getpid()}"
+    with open(temporary, "wb") as f:
+        f.write(os.urandom(16))
+    # A new file each time, so the change shows even with coarse timestamps
+    os.replace(temporary, path)
+
+
+def _stamp(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class IndexReloadWatcher:
+    """Watches the reload request file for this worker."""
+
+    def __init__(self, path: str, interval: float):
+        self.path = path
+        self.interval = interval
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        """Start watching on the running event loop; earlier requests are ignored."""
+        if self._task is not None:
+            return
+        # The indexes are loaded at startup, after any earlier request
+        self._stamp = _stamp(self.path)
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def check(self) -> bool:
+        """Apply a reload request made since the last check. Returns whether there was one."""
+        stamp = _stamp(self.path)
+        if stamp is None or stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        index_sync.request_reload()
+        content_versions.bump(LEADERBOARD)
+        response_cache.invalidate_in_background(LEADERBOARD)
+        logger.info("Leaderboard index reload requested")
+        return True
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Failed to check for an index reload request")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def stop(self) -> None:
+        """Stop watching."""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        await self._task
+        self._task = None
+
+
+# Global watcher instance
+index_reload_watcher = IndexReloadWatcher(
+    settings.INDEX_RELOAD_PATH, interval=settings.INDEX_SYNC_INTERVAL_MS / 1000
+)
@@ -0,0 +1,127 @@
+"""
+Keeps every worker's in-memory leaderboard and rank indexes current.
+
+Each worker updates its own indexes when it writes, and publishes the write
+through the shared counters (app.shared_state): ``index_appends`` after
+committing new entries, ``index_resets`` after changes that are not plain
+appends (clears, rebuilds, verification results). Before serving from memory,
+a worker compares the counters with the values its indexes reflect, at most
+once per ``INDEX_SYNC_INTERVAL_MS``:
+
+- resets changed: reload both indexes from the database;
+- appends changed: re-offer the entries committed since its watermark (the
+  highest entry ID it has read), minus an overlap for IDs that committed out
+  of order on PostgreSQL. The indexes ignore entries they already hold.
+
+A single-process server always sees its own writes in step with the
+counters, so it never has to catch up. Processes outside the server cannot
+reach the counters; they request a reload through a file instead (see
+app.index_reload).
+"""
+import threading
+import time
+from typing import List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db_models import LEADERBOARD_ENTRY_COLUMNS, LeaderboardEntryModel
+from app.leaderboard_index import leaderboard_index
+from app.rank_index import rank_index
+from app.shared_state import SharedCounters, shared_counters
+
+APPENDS = "index_appends"
+RESETS = "index_resets"
+
+
+class IndexSync:
+    """Tracks which published index changes this worker has applied."""
+
+    def __init__(self, counters: SharedCounters, interval: float, overlap: int):
+        self.interval = interval
+        self.overlap = overlap
+        self._counters = counters
+        self._lock = threading.Lock()
+        self._seen_appends = 0
+        self._seen_resets = 0
+        self._watermark = 0
+        self._next_check = 0.0
+        self._reload_requested = False
+
+    def request_reload(self) -> None:
+        """Reload this worker's indexes before they are next read."""
+        self._reload_requested = True
+
+    def _behind(self) -> bool:
+        return (
+            self._reload_requested
+            or self._counters.get(APPENDS) != self._seen_appends
+            or self._counters.get(RESETS) != self._seen_resets
+        )
+
+    def due(self) -> bool:
+        """Whether other workers changed the indexes and a catch-up is allowed now."""
+        return time.monotonic() >= self._next_check and self._behind()
+
+    def reload(self, db: Session) -> None:
+        """Reload both indexes from the database."""
+        # Read the counters first: anything published later is caught up next time
+        appends, resets = self._counters.get(APPENDS), self._counters.get(RESETS)
+        self._reload_requested = False
+        leaderboard_index.rebuild(db)
+        rank_index.rebuild(db)
+        watermark = db.query(func.max(LeaderboardEntryModel.id)).scalar() or 0
+        with self._lock:
+            self._seen_appends, self._seen_resets, self._watermark = appends, resets, watermark
+
+    def sync(self, db: Session) -> None:
+        """Apply the changes other workers have published since the last sync."""
+        appends, resets = self._counters.get(APPENDS), self._counters.get(RESETS)
+        self._next_check = time.monotonic() + self.interval
+        if resets != self._seen_resets or self._reload_requested:
+            self.reload(db)
+            return
+        if appends == self._seen_appends:
+            return
+
+        # Streamed in batches: a worker that was idle may have a lot to catch up on
+        result = db.execute(
+            select(*LEADERBOARD_ENTRY_COLUMNS)
+            .where(LeaderboardEntryModel.id > self._watermark - self.overlap)
+            .order_by(LeaderboardEntryModel.id)
+            .execution_options(yield_per=settings.DB_YIELD_PER)
+        )
+        watermark = self._watermark
+        for entries in result.partitions():
+            leaderboard_index.add_many(entries)
+            rank_index.add_many(entries)
+            watermark = entries[-1].id
+        with self._lock:
+            self._seen_appends = appends
+            self._watermark = max(self._watermark, watermark)
+
+    def published_appends(self, entries: List[LeaderboardEntryModel]) -> None:
+        """Publish entries this worker committed and already added to its indexes."""
+        value = self._counters.increment(APPENDS)
+        with self._lock:
+            # Stay in step unless another worker published in the meantime
+            if value == self._seen_appends + 1:
+                self._seen_appends = value
+                self._watermark = max([self._watermark] + [entry.id for entry in entries])
+
+    def published_reset(self) -> None:
+        """Publish a change that other workers can only apply by reloading."""
+        value = self._counters.increment(RESETS)
+        with self._lock:
+            if value == self._seen_resets + 1:
+                self._seen_resets = value
+
+
+# Global index synchronisation state
+index_sync = IndexSync(
+    shared_counters,
+    interval=settings.INDEX_SYNC_INTERVAL_MS / 1000,
+    # SQLite serialises writers, so entry IDs always commit in order
+    overlap=0 if settings.is_sqlite else 256,
+)
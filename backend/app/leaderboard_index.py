@@ -0,0 +1,166 @@
+"""
+In-memory top-K leaderboard index.
+
+Keeps the best K entries per game mode (plus one list across all modes) so
+leaderboard reads can be served without touching the database. The index is
+loaded from ``leaderboard_entries`` at startup and kept current by the write
+paths in ``app.database``.
+"""
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import desc, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db_models import (
+    EntryStatusEnum, GameModeEnum, LeaderboardEntryModel, LEADERBOARD_ENTRY_COLUMNS, VISIBLE_ENTRY_STATUSES
+)
+
+
+class IndexedEntry:
+    """Lightweight copy of a leaderboard row held by the index."""
+
+    __slots__ = ("id", "user_id", "username", "score", "mode", "status", "created_at")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        username: str,
+        score: int,
+        mode: GameModeEnum,
+        created_at: datetime,
+        status: EntryStatusEnum = EntryStatusEnum.UNVERIFIED,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.username = username
+        self.score = score
+        self.mode = mode
+        self.status = status
+        self.created_at = created_at
+
+    @classmethod
+    def from_model(cls, entry) -> "IndexedEntry":
+        """Copy a LeaderboardEntryModel or a LEADERBOARD_ENTRY_COLUMNS row."""
+        return cls(
+            id=entry.id,
+            user_id=entry.user_id,
+            username=entry.username,
+            score=entry.score,
+            mode=entry.mode,
+            created_at=entry.created_at,
+            status=entry.status,
+        )
+
+    @property
+    def sort_key(self):
+        # Highest score first, older entries win ties
+        return (-self.score, self.id)
+
+    def __lt__(self, other: "IndexedEntry") -> bool:
+        return self.sort_key < other.sort_key
+
+    def __repr__(self):
+        return f"<IndexedEntry(id={self.id}, username='{self.username}', score={self.score}, mode='{self.mode}')>"
+
+
+class LeaderboardIndex:
+    """Bounded, sorted top-K lists per game mode and across all modes."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._all: List[IndexedEntry] = []
+        self._by_mode: Dict[GameModeEnum, List[IndexedEntry]] = {
+            mode: [] for mode in GameModeEnum
+        }
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been populated and can serve reads."""
+        return self._loaded
+
+    def _insert(self, bucket: List[IndexedEntry], item: IndexedEntry) -> None:
+        if len(bucket) >= self.capacity and not item < bucket[-1]:
+            return
+        position = bisect_left(bucket, item)
+        if position < len(bucket) and bucket[position].id == item.id:
+            return  # Already indexed (entries are re-offered when catching up)
+        bucket.insert(position, item)
+        if len(bucket) > self.capacity:
+            bucket.pop()
+
+    def add(self, entry: LeaderboardEntryModel) -> None:
+        """Write-through a newly committed entry."""
+        self.add_many([entry])
+
+    def add_many(self, entries: Iterable[LeaderboardEntryModel]) -> None:
+        """Write-through several newly committed entries (hidden ones are skipped)."""
+        items = [
+            IndexedEntry.from_model(entry) for entry in entries
+            if entry.status in VISIBLE_ENTRY_STATUSES
+        ]
+        with self._lock:
+            if not self._loaded:
+                return
+            for item in items:
+                self._insert(self._all, item)
+                self._insert(self._by_mode[item.mode], item)
+
+    def top(self, mode: Optional[GameModeEnum] = None, limit: int = 20) -> List[IndexedEntry]:
+        """Return up to ``limit`` best entries, optionally for a single mode."""
+        with self._lock:
+            bucket = self._by_mode[mode] if mode else self._all
+            return bucket[:limit]
+
+    def can_serve(self, limit: int) -> bool:
+        """Whether a read of ``limit`` entries can be answered from memory."""
+        return self._loaded and limit <= self.capacity
+
+    def rebuild(self, db: Session) -> None:
+        """Reload the index from the database.
+
+        Use this at startup and whenever ``leaderboard_entries`` is changed
+        outside the application.
+        """
+        by_mode = {}
+        for mode in GameModeEnum:
+            rows = db.execute(
+                select(*LEADERBOARD_ENTRY_COLUMNS)
+                .where(LeaderboardEntryModel.mode == mode)
+                .where(LeaderboardEntryModel.status.in_(VISIBLE_ENTRY_STATUSES))
+                .order_by(desc(LeaderboardEntryModel.score), LeaderboardEntryModel.id)
+                .limit(self.capacity)
+                .execution_options(yield_per=settings.DB_YIELD_PER)
+            )
+            by_mode[mode] = [IndexedEntry.from_model(row) for row in rows]
+
+        # The overall top K is always contained in the union of per-mode top K
+        merged = sorted(item for items in by_mode.values() for item in items)
+
+        with self._lock:
+            self._by_mode = by_mode
+            self._all = merged[:self.capacity]
+            self._loaded = True
+
+    def clear(self) -> None:
+        """Drop all indexed entries while keeping the index loaded."""
+        with self._lock:
+            self._all = []
+            self._by_mode = {mode: [] for mode in GameModeEnum}
+
+    def reset(self) -> None:
+        """Drop all entries and mark the index as not loaded."""
+        with self._lock:
+            self._all = []
+            self._by_mode = {mode: [] for mode in GameModeEnum}
+            self._loaded = False
+
+
+# Global index instance
+leaderboard_index = LeaderboardIndex(settings.LEADERBOARD_INDEX_SIZE)
@@ -0,0 +1,139 @@
+"""
+Time windows for daily, weekly and seasonal leaderboards.
+
+Each window instance has a key (``day:2024-05-01``, ``week:2024-W18``,
+``season:<name>``) under which ``leaderboard_window_scores`` keeps every
+player's best score while the window is open. Reads look up the current key,
+so a window "rotates" simply by its key changing; rows of closed windows are
+deleted after ``LEADERBOARD_WINDOW_RETENTION_DAYS``. All times are UTC.
+
+The season settings are parsed once; a season with a missing, unreadable or
+empty interval is logged and left disabled rather than failing score writes.
+"""
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+from app.config import settings
+from app.models import LeaderboardWindow
+
+logger = logging.getLogger(__name__)
+
+
+class WindowSpan(NamedTuple):
+    """One instance of a window: its key and [start, end) interval."""
+
+    key: str
+    start: datetime
+    end: datetime
+
+
+class Season(NamedTuple):
+    name: str
+    start: datetime
+    end: datetime
+
+
+def _utc(value: str) -> datetime:
+    at = datetime.fromisoformat(value.strip())
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+
+@lru_cache(maxsize=4)
+def _parse_season(name: str, start: str, end: str) -> Optional[Season]:
+    if not name:
+        return None
+    try:
+        season = Season(name=name, start=_utc(start), end=_utc(end))
+    except ValueError as e:
+        logger.error("Season %r disabled: its start and end must be ISO dates or datetimes (%s)", name, e)
+        return None
+    if season.end <= season.start:
+        logger.error("Season %r disabled: it ends before it starts", name)
+        return None
+    return season
+
+
+def configured_season() -> Optional[Season]:
+    """The season from the settings, or None if no (valid) season is configured."""
+    return _parse_season(
+        settings.LEADERBOARD_SEASON, settings.LEADERBOARD_SEASON_START, settings.LEADERBOARD_SEASON_END
+    )
+
+
+def window_span(window: LeaderboardWindow, at: datetime) -> Optional[WindowSpan]:
+    """
+    The instance of a window that contains ``at``.
+
+    Returns:
+        The span, or None for ALL and for a season that is not configured or
+        does not contain ``at``
+    """
+    if window == LeaderboardWindow.DAY:
+        start = datetime(at.year, at.month, at.day)
+        return WindowSpan(f"day:{start:%Y-%m-%d}", start, start + timedelta(days=1))
+
+    if window == LeaderboardWindow.WEEK:
+        start = datetime(at.year, at.month, at.day) - timedelta(days=at.weekday())
+        year, week, _ = start.isocalendar()
+        return WindowSpan(f"week:{year}-W{week:02d}", start, start + timedelta(weeks=1))
+
+    if window == LeaderboardWindow.SEASON:
+        season = configured_season()
+        if season and season.start <= at < season.end:
+            return WindowSpan(f"season:{season.name}", season.start, season.end)
+
+    return None
+
+
+def read_key(window: LeaderboardWindow, now: datetime) -> Optional[str]:
+    """
+    Key to read for a window's leaderboard.
+
+    A season stays readable (with its final standings) after it ends.
+    """
+    if window == LeaderboardWindow.SEASON:
+        season = configured_season()
+        return f"season:{season.name}" if season else None
+    span = window_span(window, now)
+    return span.key if span else None
+
+
+def open_spans(at: datetime) -> List[WindowSpan]:
+    """Every window instance a score achieved at ``at`` counts towards."""
+    spans = (window_span(window, at) for window in LeaderboardWindow if window != LeaderboardWindow.ALL)
+    return [span for span in spans if span]
+
+
+class WindowRotation:
+    """Tracks when closed windows were last pruned (at most once per UTC day)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_day: Optional[str] = None
+
+    def due(self, now: datetime) -> bool:
+        """True once per day: the first call after the day key changes."""
+        day = window_span(LeaderboardWindow.DAY, now).key
+        with self._lock:
+            if day == self._last_day:
+                return False
+            self._last_day = day
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._last_day = None
+
+
+def prune_before(now: datetime) -> datetime:
+    """Windows that ended before this time are deleted."""
+    return now - timedelta(days=settings.LEADERBOARD_WINDOW_RETENTION_DAYS)
+
+
+# Global rotation tracker
+window_rotation = WindowRotation()
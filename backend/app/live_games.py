@@ -0,0 +1,552 @@
+"""
+In-memory store of the games in progress, written behind to the database.
+
+Clients report their game state every tick. Instead of a SELECT, UPDATE,
+commit and refresh per tick, each worker keeps the games started on it in
+memory, one slotted ``LiveGame`` per player with the snake held as an
+``array("H")`` of cell indices, and overwrites it in place. A background task
+writes the games that changed to ``active_players`` every
+``LIVE_GAME_FLUSH_INTERVAL_MS`` in one executemany UPDATE, however many ticks
+arrived in between; a game that is over is written straight away.
+
+Spectator reads (the /spectator endpoints and the stream hub) are served
+from the store: this worker's games from memory, the other workers' from
+``active_players``, reloading a mode only when its shared active-player
+version shows its rows changed. With several workers a game started elsewhere is
+therefore seen as of its last flush.
+
+Clients send either full snapshots or patches: "new head cells, cells dropped
+from the tail" plus the fields that changed, the same shape as the spectator
+stream's deltas, numbered consecutively per game. A patch that is out of
+order or does not fit the snake is rejected (PatchRejected) and the client
+resends a snapshot. Patches only apply to games this worker holds.
+
+Snapshots for a game this worker does not hold (it was started on another
+worker, or before a restart) are written to the database directly. Requests
+for one game need not stick to one worker: when the store reloads
+``active_players`` it stops holding games whose row was deleted (the game
+was ended through another worker) or written more recently than its own
+copy (a snapshot went to another worker), and serves the row instead.
+"""
+import asyncio
+import logging
+import os
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Union
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.async_database import get_active_player, get_active_players, save_live_games, update_active_player
+from app.config import settings
+from app.content_versions import content_versions, ACTIVE_PLAYERS
+from app.db_models import ActivePlayerModel, GameModeEnum
+from app.game_state_codec import cell_to_position, encode_game_state, pack_game_state, position_to_cell
+from app.models import ActivePlayer, Direction, GameMode, GamePatch, GameState, GameStatus, GRID_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class PatchRejected(Exception):
+    """Raised when an update does not apply to a game's current state; the client should send a snapshot."""
+
+    def __init__(self, message: str, seq: Optional[int] = None):
+        super().__init__(message)
+        self.seq = seq  # Last update applied to the game, if it is held here
+
+
+def _adjacent(a: int, b: int, wrap: bool) -> bool:
+    (ay, ax), (by, bx) = divmod(a, GRID_SIZE), divmod(b, GRID_SIZE)
+    dx, dy = abs(ax - bx), abs(ay - by)
+    if wrap:
+        dx, dy = min(dx, GRID_SIZE - dx), min(dy, GRID_SIZE - dy)
+    return dx + dy == 1
+
+
+class LiveGame:
+    """One game in progress."""
+
+    __slots__ = (
+        "id", "user_id", "username", "mode", "score", "cells", "food", "direction",
+        "status", "speed", "state_score", "seq", "updated_at", "dirty", "_player", "_json",
+    )
+
+    def __init__(self, player_id: int, user_id: int, username: str, mode: GameMode):
+        self.id = player_id
+        self.user_id = user_id
+        self.username = username
+        self.mode = mode
+        self.score = 0
+        self.cells = array("H")
+        self.food = 0
+        self.direction = Direction.RIGHT
+        self.status = GameStatus.IDLE
+        self.speed = 0
+        self.state_score = 0
+        self.seq = 0  # Sequence number of the last update applied
+        self.updated_at = datetime.utcnow()
+        self.dirty = False
+        # Built on first read after a change
+        self._player: Optional[ActivePlayer] = None
+        self._json: Optional[dict] = None
+
+    @classmethod
+    def from_model(cls, player: Union[ActivePlayerModel, Row]) -> "LiveGame":
+        """Load a game from its active_players model or row."""
+        game = cls(player.id, player.user_id, player.username, GameMode(player.mode.value))
+        game.apply(player.score, player.game_state, player.updated_at)
+        game.dirty = False
+        return game
+
+    def apply(self, score: int, state: GameState, now: datetime) -> None:
+        """
+        Overwrite the game with its latest state.
+
+        Raises:
+            ValueError: If a position is outside the grid or a field is out of range
+        """
+        cells = array("H", (position_to_cell(p.x, p.y) for p in state.snake))
+        food = position_to_cell(state.food.x, state.food.y)
+        if not (0 <= state.speed <= 0xFFFF and 0 <= state.score <= 0xFFFFFFFF):
+            raise ValueError("Game state field out of range")
+
+        self.score = score
+        self.cells = cells
+        self.food = food
+        self.direction = Direction(state.direction)
+        self.status = GameStatus(state.status)
+        self.speed = state.speed
+        self.state_score = state.score
+        self.updated_at = now
+        self.dirty = True
+        self._player = self._json = None
+
+    def apply_patch(self, patch: GamePatch, now: datetime) -> None:
+        """
+        Apply the next patch; the game is unchanged if it is rejected.
+
+        Raises:
+            PatchRejected: If the patch is out of order or inconsistent with the game
+        """
+        if patch.seq != self.seq + 1:
+            raise PatchRejected(f"Expected update {self.seq + 1}, got {patch.seq}", self.seq)
+
+        try:
+            heads = [position_to_cell(x, y) for x, y in patch.head]
+            food = position_to_cell(*patch.food) if patch.food is not None else self.food
+        except ValueError as e:
+            raise PatchRejected(str(e), self.seq) from e
+        if patch.speed is not None and not 0 <= patch.speed <= 0xFFFF:
+            raise PatchRejected("Speed out of range", self.seq)
+        if patch.score is not None and not 0 <= patch.score <= 0xFFFFFFFF:
+            raise PatchRejected("Score out of range", self.seq)
+
+        # The new heads (newest first) must extend the snake one step at a
+        # time, and at least one old cell must remain
+        kept = len(self.cells) - patch.drop
+        if kept < (1 if self.cells else 0) or kept + len(heads) < 1:
+            raise PatchRejected("Patch drops more cells than the snake has", self.seq)
+        wrap = self.mode == GameMode.PASS_THROUGH
+        chain = heads + self.cells[:1].tolist()
+        if any(not _adjacent(a, b, wrap) for a, b in zip(chain, chain[1:])):
+            raise PatchRejected("Patch does not continue the snake", self.seq)
+
+        cells = array("H", heads)
+        cells.extend(self.cells[:kept])
+        self.cells = cells
+        self.food = food
+        if patch.score is not None:
+            self.score = self.state_score = patch.score
+        if patch.status is not None:
+            self.status = patch.status
+        if patch.direction is not None:
+            self.direction = patch.direction
+        if patch.speed is not None:
+            self.speed = patch.speed
+        self.seq = patch.seq
+        self.updated_at = now
+        self.dirty = True
+        self._player = self._json = None
+
+    def game_state(self) -> GameState:
+        # The fields were validated by apply, so the models skip validation
+        return GameState.model_construct(
+            snake=[cell_to_position(cell) for cell in self.cells],
+            food=cell_to_position(self.food),
+            direction=self.direction,
+            score=self.state_score,
+            status=self.status,
+            mode=self.mode,
+            speed=self.speed,
+        )
+
+    def to_active_player(self) -> ActivePlayer:
+        if self._player is None:
+            self._player = ActivePlayer.model_construct(
+                id=str(self.id),
+                username=self.username,
+                score=self.score,
+                mode=self.mode,
+                gameState=self.game_state(),
+            )
+        return self._player
+
+    def game_state_dict(self) -> dict:
+        """The game state as a JSON-ready GameState dict (see app.fast_json)."""
+        return self.to_dict()["gameState"]
+
+    def to_dict(self) -> dict:
+        """The game as a JSON-ready ActivePlayer dict (see app.fast_json)."""
+        if self._json is None:
+            food_y, food_x = divmod(self.food, GRID_SIZE)
+            self._json = {
+                "id": str(self.id),
+                "username": self.username,
+                "score": self.score,
+                "mode": self.mode.value,
+                "gameState": {
+                    "snake": [{"x": cell % GRID_SIZE, "y": cell // GRID_SIZE} for cell in self.cells],
+                    "food": {"x": food_x, "y": food_y},
+                    "direction": self.direction.value,
+                    "score": self.state_score,
+                    "status": self.status.value,
+                    "mode": self.mode.value,
+                    "speed": self.speed,
+                },
+            }
+        return self._json
+
+    def row(self) -> dict:
+        """Parameters for database.save_live_games."""
+        return {
+            "player_id": self.id,
+            "mode": self.mode.value,
+            "score": self.score,
+            "game_state": pack_game_state(
+                self.cells, self.food, self.direction, self.status, self.mode, self.speed, self.state_score
+            ),
+            "updated_at": self.updated_at,
+        }
+
+
+def _expired_before(now: Optional[datetime]) -> Optional[datetime]:
+    if settings.ACTIVE_PLAYER_TTL_SECONDS <= 0:
+        return None
+    return (now or datetime.utcnow()) - timedelta(seconds=settings.ACTIVE_PLAYER_TTL_SECONDS)
+
+
+class LiveGameStore:
+    """
+    This worker's games in progress, plus its view of the other workers' games.
+
+    Used from the event loop only.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        self._games: Dict[int, LiveGame] = {}
+        self._remote: Dict[int, LiveGame] = {}
+        self._remote_versions: Dict[GameModeEnum, int] = {}
+        self._version = 0
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    @property
+    def tag(self) -> str:
+        """What the reads depend on besides the shared versions (an ETag part)."""
+        # Without games of its own, a worker serves the same content as the others
+        own = f"{os.getpid()}.{self._version}" if self._games else ""
+        if settings.ACTIVE_PLAYER_TTL_SECONDS <= 0:
+            return own
+        # Games drop out of the reads as they expire, before anything bumps a
+        # version: the oldest one shown expires first, and the tag with it
+        games = self.games()
+        return f"{own}:{games[-1].updated_at.isoformat()}" if games else own
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def track(self, player: ActivePlayerModel) -> LiveGame:
+        """Hold a newly created game in memory from now on."""
+        game = LiveGame.from_model(player)
+        self._games[game.id] = game
+        self._remote.pop(game.id, None)
+        self._version += 1
+        return game
+
+    def update(
+        self,
+        player_id: int,
+        score: int,
+        game_state: Union[GameState, dict],
+        now: Optional[datetime] = None,
+        seq: Optional[int] = None
+    ) -> Optional[LiveGame]:
+        """
+        Apply a game snapshot in memory.
+
+        Args:
+            seq: Sequence number of the snapshot; patches continue from it
+
+        Returns:
+            The game, or None if this worker does not hold it
+
+        Raises:
+            ValueError: If the state is not a valid game state
+            PatchRejected: If the snapshot is older than the game
+        """
+        game = self._games.get(player_id)
+        if game is None:
+            return None
+        if seq is not None and seq <= game.seq:
+            raise PatchRejected(f"Update {seq} is older than the game", game.seq)
+        if isinstance(game_state, dict):
+            game_state = GameState(**game_state)
+
+        game.apply(score, game_state, now or datetime.utcnow())
+        if seq is not None:
+            game.seq = seq
+        self._changed(game)
+        return game
+
+    def patch(
+        self,
+        player_id: int,
+        patches: List[GamePatch],
+        now: Optional[datetime] = None
+    ) -> Optional[LiveGame]:
+        """
+        Apply patches in order.
+
+        Returns:
+            The game, or None if this worker does not hold it
+
+        Raises:
+            PatchRejected: At the first patch that does not apply (the ones
+                before it stay applied)
+        """
+        game = self._games.get(player_id)
+        if game is None:
+            return None
+
+        now = now or datetime.utcnow()
+        seq = game.seq
+        try:
+            for patch in patches:
+                game.apply_patch(patch, now)
+        finally:
+            if game.seq != seq:
+                self._changed(game)
+        return game
+
+    def _changed(self, game: LiveGame) -> None:
+        self._version += 1
+        if game.status == GameStatus.GAME_OVER and self._wake is not None:
+            self._wake.set()
+
+    def finish(self, player_id: int) -> Optional[LiveGame]:
+        """Stop holding a game (its row is deleted by the caller)."""
+        game = self._games.pop(player_id, None)
+        if game is not None:
+            self._version += 1
+        return game
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Drop games without an update for longer than the TTL. Returns the number dropped."""
+        cutoff = _expired_before(now)
+        if cutoff is None:
+            return 0
+        expired = [game.id for game in self._games.values() if game.updated_at < cutoff]
+        for player_id in expired:
+            del self._games[player_id]
+        if expired:
+            self._version += 1
+        return len(expired)
+
+    def clear(self) -> None:
+        self._games.clear()
+        self._remote.clear()
+        self._remote_versions = {}
+        self._version += 1
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """Reload the other workers' games in the modes whose active_players rows changed since the last load."""
+        versions = {mode: content_versions.get(ACTIVE_PLAYERS, mode) for mode in GameModeEnum}
+        changed = {mode for mode, version in versions.items() if self._remote_versions.get(mode) != version}
+        if not changed:
+            return
+
+        # Held games whose row could have changed elsewhere; those tracked
+        # while the query runs may be missing from its result
+        held = [
+            game for game in self._games.values()
+            if not game.dirty and GameModeEnum(game.mode.value) in changed
+        ]
+        if len(changed) == len(versions):
+            players = await get_active_players(db)
+        else:
+            players = []
+            for mode in changed:
+                players += await get_active_players(db, GameMode(mode.value))
+        rows = {player.id: player for player in players}
+        dropped = 0
+        for game in held:
+            if self._games.get(game.id) is not game:
+                continue
+            row = rows.get(game.id)
+            if row is None and not game.dirty:
+                # Ended (or expired) through another worker
+                del self._games[game.id]
+                dropped += 1
+            elif row is not None and row.updated_at > game.updated_at:
+                # Updated through another worker: its snapshot is newer, and
+                # this copy could not be written over it anyway
+                del self._games[game.id]
+                dropped += 1
+        if dropped:
+            self._version += 1
+
+        self._remote = {
+            player_id: game
+            for player_id, game in self._remote.items()
+            if GameModeEnum(game.mode.value) not in changed and player_id not in self._games
+        }
+        self._remote.update(
+            (player.id, LiveGame.from_model(player))
+            for player in players
+            if player.id not in self._games
+        )
+        self._remote_versions = versions
+
+    def held(self, player_id: int) -> Optional[LiveGame]:
+        """A game this worker holds, or None."""
+        return self._games.get(player_id)
+
+    def get(self, player_id: int, now: Optional[datetime] = None) -> Optional[LiveGame]:
+        """A game in progress, or None if unknown or expired."""
+        game = self._games.get(player_id) or self._remote.get(player_id)
+        cutoff = _expired_before(now)
+        if game is None or (cutoff is not None and game.updated_at < cutoff):
+            return None
+        return game
+
+    def games(self, mode: Optional[GameMode] = None, now: Optional[datetime] = None) -> List[LiveGame]:
+        """Games in progress, most recently updated first, leaving out expired ones."""
+        cutoff = _expired_before(now)
+        games = [
+            game
+            for games in (self._games, self._remote)
+            for game in games.values()
+            if (mode is None or game.mode == mode) and (cutoff is None or game.updated_at >= cutoff)
+        ]
+        games.sort(key=lambda game: game.updated_at, reverse=True)
+        return games
+
+    def players(self, mode: Optional[GameMode] = None, now: Optional[datetime] = None) -> List[ActivePlayer]:
+        """Games in progress as ActivePlayer models, most recently updated first."""
+        return [game.to_active_player() for game in self.games(mode, now)]
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+
+    async def start(self, session_factory: async_sessionmaker) -> None:
+        """Start writing changed games behind on the running event loop."""
+        if self._task is not None:
+            return
+        self._session_factory = session_factory
+        self._stop_event = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def flush(self) -> int:
+        """Write the games changed since the last flush. Returns the number written."""
+        games = [game for game in self._games.values() if game.dirty]
+        if not games:
+            return 0
+
+        rows = []
+        for game in games:
+            rows.append(game.row())
+            game.dirty = False
+        try:
+            async with self._session_factory() as db:
+                await save_live_games(db, rows)
+        except Exception:
+            logger.exception("Failed to write %d live games", len(rows))
+            for game in games:
+                game.dirty = True
+            return 0
+        return len(rows)
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def stop(self) -> None:
+        """Write the remaining changes and stop."""
+        if self._task is None:
+            return
+        self._stop_event.set()
+        self._wake.set()
+        await self._task
+        self._task = None
+        self._wake = None
+
+
+async def record_game_state(
+    db: AsyncSession,
+    player_id: int,
+    user_id: int,
+    score: int,
+    game_state: Union[GameState, dict],
+    seq: Optional[int] = None
+) -> bool:
+    """
+    Apply a client's game snapshot: in memory if this worker holds the game,
+    otherwise in the database.
+
+    Returns:
+        False if the user has no such game
+
+    Raises:
+        ValueError: If the state is not a valid game state
+        PatchRejected: If the snapshot is older than the game
+    """
+    game = live_games.held(player_id)
+    if game is not None:
+        if game.user_id != user_id:
+            return False
+        live_games.update(player_id, score, game_state, seq=seq)
+        return True
+
+    player = await get_active_player(db, player_id)
+    if player is None or player.user_id != user_id:
+        return False
+    # Encoded up front so invalid states raise ValueError, not a database error
+    await update_active_player(db, player_id, score, encode_game_state(game_state))
+    return True
+
+
+# Global live game store
+live_games = LiveGameStore(flush_interval=settings.LIVE_GAME_FLUSH_INTERVAL_MS / 1000)
@@ -1,8 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import auth, leaderboard, spectator
-from app.db_session import create_tables, SessionLocal
-from app.database import init_db
+from app.routers import auth, leaderboard, spectator, games, replays, system
+from app.config import settings
+from app.db_session import SessionLocal, AsyncSessionLocal, async_engine
+from app.database import rebuild_leaderboard_index
+from app.server import run_setup_once
+from app.security import check_secret_key, password_hasher
+from app.score_ingest import score_ingestor
+from app.score_verification import score_verifier
+from app.active_player_reaper import active_player_reaper
+from app.live_games import live_games
+from app.index_reload import index_reload_watcher
+from app.leaderboard_windows import configured_season
 
 from fastapi.staticfiles import StaticFiles
 import os
@@ -20,26 +29,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Location"],
 )
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(leaderboard.router, prefix="/api")
 app.include_router(spectator.router, prefix="/api")
+app.include_router(games.router, prefix="/api")
+app.include_router(replays.router, prefix="/api")
+app.include_router(system.router, prefix="/api")
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup."""
-    # Create tables if they don't exist
-    create_tables()
+    check_secret_key()
+    configured_season()  # Logs a misconfigured season now rather than on the first score
+    
+    # Create tables, seed and backfill (done once by the supervisor when
+    # running several workers)
+    run_setup_once()
     
-    # Seed initial data if database is empty
     db = SessionLocal()
     try:
-        init_db(db)
+        # Load this worker's in-memory leaderboard index
+        rebuild_leaderboard_index(db)
     finally:
         db.close()
+    
+    # Reload the index when a maintenance command changes the tables
+    await index_reload_watcher.start()
+    
+    # Start write-behind score ingestion if enabled
+    if settings.SCORE_INGEST_MODE == "buffered":
+        await score_ingestor.start(AsyncSessionLocal)
+    
+    # Start the score verification pool if enabled
+    if settings.SCORE_VERIFICATION != "off":
+        await score_verifier.start(AsyncSessionLocal)
+    
+    # Start writing in-memory games behind to the database
+    await live_games.start(AsyncSessionLocal)
+    
+    # Start deleting expired active player sessions
+    if settings.ACTIVE_PLAYER_TTL_SECONDS > 0:
+        await active_player_reaper.start(AsyncSessionLocal)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered scores, verifications and live games, then release database connections and workers."""
+    await index_reload_watcher.stop()
+    await score_ingestor.stop()
+    await score_verifier.stop()
+    await active_player_reaper.stop()
+    await live_games.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 
 # Mount static files correctly
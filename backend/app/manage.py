@@ -0,0 +1,79 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.manage rebuild-best-scores
+    python -m app.manage rebuild-window-scores
+    python -m app.manage rebuild-leaderboard-index
+
+Each command asks running servers on this host to reload their in-memory
+leaderboard indexes afterwards (see app.index_reload).
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from app.db_session import create_tables, SessionLocal
+from app.database import rebuild_best_scores, rebuild_window_scores
+from app.index_reload import request_reload
+
+
+def rebuild_best_scores_command(args: argparse.Namespace) -> None:
+    """Recompute every personal best from the leaderboard entries."""
+    create_tables()
+    db = SessionLocal()
+    try:
+        count = rebuild_best_scores(db)
+    finally:
+        db.close()
+    request_reload()
+    print(f"Rebuilt {count} personal bests")
+
+
+def rebuild_window_scores_command(args: argparse.Namespace) -> None:
+    """Recompute the current day, week and season leaderboards from the entries."""
+    create_tables()
+    db = SessionLocal()
+    try:
+        count = rebuild_window_scores(db)
+    finally:
+        db.close()
+    request_reload()
+    print(f"Rebuilt {count} window scores")
+
+
+def rebuild_leaderboard_index_command(args: argparse.Namespace) -> None:
+    """Make running servers reload their leaderboard indexes from the database."""
+    request_reload()
+    print("Requested a leaderboard index reload")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.manage", description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-best-scores",
+        help="Recompute user_best_scores from leaderboard_entries (backfills, manual edits)",
+    )
+    rebuild.set_defaults(handler=rebuild_best_scores_command)
+
+    rebuild_windows = commands.add_parser(
+        "rebuild-window-scores",
+        help="Recompute the current day/week/season leaderboards from leaderboard_entries",
+    )
+    rebuild_windows.set_defaults(handler=rebuild_window_scores_command)
+
+    reload_index = commands.add_parser(
+        "rebuild-leaderboard-index",
+        help="Make running servers reload their in-memory leaderboard indexes (after editing the tables)",
+    )
+    reload_index.set_defaults(handler=rebuild_leaderboard_index_command)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
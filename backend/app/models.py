@@ -1,8 +1,15 @@
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pydantic import BaseModel, EmailStr, Field
 from datetime import date
 
+# Board constants (mirrors frontend/src/lib/gameLogic.ts)
+GRID_SIZE = 20
+INITIAL_SPEED = 150
+
+# Most game states accepted in one tick upload
+MAX_TICKS_PER_BATCH = 64
+
 class GameMode(str, Enum):
     PASS_THROUGH = "pass-through"
     WALLS = "walls"
@@ -31,6 +38,7 @@ class User(BaseModel):
 class AuthResponse(BaseModel):
     success: bool
     user: Optional[User] = None
+    token: Optional[str] = None  # Bearer token (also set as a cookie)
     error: Optional[str] = None
 
 class LoginRequest(BaseModel):
@@ -51,16 +59,52 @@ class GameState(BaseModel):
     mode: GameMode
     speed: int
 
+class LeaderboardWindow(str, Enum):
+    ALL = "all"
+    DAY = "day"  # Current UTC day
+    WEEK = "week"  # Current ISO week (UTC)
+    SEASON = "season"  # Configured season
+
+class EntryStatus(str, Enum):
+    UNVERIFIED = "unverified"  # Accepted without a recording
+    PENDING = "pending"
+    VERIFIED = "verified"
+    REJECTED = "rejected"
+
 class LeaderboardEntry(BaseModel):
     id: str
     username: str
     score: int
     mode: GameMode
     date: date
+    status: EntryStatus = EntryStatus.UNVERIFIED
+
+class RankedLeaderboardEntry(LeaderboardEntry):
+    rank: int
+
+class PlayerRank(BaseModel):
+    username: str
+    mode: GameMode
+    score: int
+    rank: int
+    totalPlayers: int
+    percentile: float  # Share of players ranked at or below this player
+
+class ReplayInput(BaseModel):
+    tick: int = Field(ge=0)
+    direction: Direction
+
+class GameRecording(BaseModel):
+    seed: int = Field(ge=0, le=0xFFFFFFFF)
+    tickCount: int = Field(ge=0)
+    initialState: GameState
+    inputs: List[ReplayInput]
 
 class SubmitScoreRequest(BaseModel):
     score: int
     mode: GameMode
+    durable: bool = False  # Write synchronously even when ingestion is buffered
+    recording: Optional[GameRecording] = None  # Input log to verify the score against
 
 class ActivePlayer(BaseModel):
     id: str
@@ -68,3 +112,54 @@ class ActivePlayer(BaseModel):
     score: int
     mode: GameMode
     gameState: GameState
+
+class StartGameRequest(BaseModel):
+    mode: GameMode
+    gameState: GameState
+
+class GameTicksRequest(BaseModel):
+    ticks: List[GameState] = Field(min_length=1, max_length=MAX_TICKS_PER_BATCH)  # Oldest first, e.g. every 500 ms
+    seq: Optional[int] = Field(None, ge=0)  # Sequence number of the last state; patches continue from it
+
+class GamePatch(BaseModel):
+    seq: int = Field(ge=1)  # One more than the previous update's
+    head: List[Tuple[int, int]] = []  # New head cells, newest first
+    drop: int = Field(0, ge=0)  # Cells removed from the tail
+    food: Optional[Tuple[int, int]] = None
+    score: Optional[int] = None
+    status: Optional[GameStatus] = None
+    direction: Optional[Direction] = None
+    speed: Optional[int] = None
+
+class GamePatchesRequest(BaseModel):
+    patches: List[GamePatch] = Field(min_length=1, max_length=MAX_TICKS_PER_BATCH)  # In sequence order
+
+class EndGameRequest(BaseModel):
+    score: int = Field(ge=0)
+    recording: Optional[GameRecording] = None  # Input log to verify the score against
+
+class UploadReplayRequest(BaseModel):
+    entryId: str
+    seed: int = Field(ge=0, le=0xFFFFFFFF)
+    tickCount: int = Field(ge=0)
+    initialState: GameState
+    inputs: List[ReplayInput]
+
+class ReplayInfo(BaseModel):
+    entryId: str
+    seed: int
+    mode: GameMode
+    tickCount: int
+    finalScore: int
+    keyframeTicks: List[int]
+    size: int
+
+class FoodSpawn(BaseModel):
+    tick: int
+    position: Position
+
+class ReplayRange(BaseModel):
+    keyframeTick: int
+    keyframe: GameState
+    inputs: List[ReplayInput]
+    food: List[FoodSpawn]
@@ -0,0 +1,183 @@
+"""
+Content negotiation for the leaderboard and spectator reads.
+
+Responses are JSON unless the client prefers MessagePack
+(``Accept: application/msgpack``): the same documents, with dates as ISO
+strings, except that game state positions (``snake`` cells and ``food``) are
+packed as ``[x, y]`` arrays, 3 bytes each instead of the 7 of
+``{"x":12,"y":7}`` (see ``PackedGameState`` in openapi.yaml). Bodies of at least ``COMPRESSION_MIN_BYTES`` are
+compressed when the client accepts it: brotli if the ``brotli`` package is
+installed, otherwise gzip. Smaller bodies are sent as they are, since
+compressing them costs more than it saves.
+
+Clients that send neither header (e.g. the frontend's ``services/api.ts``,
+whose browser adds Accept-Encoding and decompresses transparently) keep
+getting plain JSON. Every representation has its own ETag and cache entry,
+and responses carry ``Vary: Accept, Accept-Encoding`` for shared caches.
+"""
+import gzip
+from datetime import date
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import msgpack
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app import fast_json
+from app.config import settings
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Also accepted in Accept headers; responses always use MSGPACK_MEDIA_TYPE
+MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# Supported codings, preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+VARY = "Accept, Accept-Encoding"
+
+
+class Representation(NamedTuple):
+    """Negotiated response format: media type plus the coding to use for large bodies."""
+
+    media_type: str
+    encoding: Optional[str]  # "br", "gzip" or None
+
+    @property
+    def tag(self) -> str:
+        """Short name, part of the ETag (and so the cache key) of a response."""
+        name = "msgpack" if self.media_type == MSGPACK_MEDIA_TYPE else "json"
+        return f"{name}+{self.encoding}" if self.encoding else name
+
+
+def _qualities(header: Optional[str]) -> Dict[str, float]:
+    # "a/b;q=0.5, c/d" -> {"a/b": 0.5, "c/d": 1.0}
+    qualities = {}
+    for item in (header or "").split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    return qualities
+
+
+def _media_type(accept: Optional[str]) -> str:
+    qualities = _qualities(accept)
+    msgpack_quality = max(qualities.get(name, 0.0) for name in MSGPACK_ALIASES)
+    if msgpack_quality <= 0:
+        return JSON_MEDIA_TYPE
+    json_quality = qualities.get(
+        JSON_MEDIA_TYPE, qualities.get("application/*", qualities.get("*/*", 0.0))
+    )
+    # MessagePack only when asked for by name and not ranked below JSON
+    return MSGPACK_MEDIA_TYPE if msgpack_quality >= json_quality else JSON_MEDIA_TYPE
+
+
+def _encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    qualities = _qualities(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def negotiate(request: Request, response: Optional[Response] = None) -> Representation:
+    """
+    Pick the representation for a read from its Accept and Accept-Encoding headers.
+
+    Args:
+        request: The request
+        response: The endpoint's response, which gets the Vary header
+
+    Returns:
+        The representation; JSON without compression if the client states
+        no preference
+    """
+    if response is not None:
+        response.headers["Vary"] = VARY
+    return Representation(
+        _media_type(request.headers.get("accept")),
+        _encoding(request.headers.get("accept-encoding"))
+    )
+
+
+def _msgpack_default(value: Any) -> Any:
+    # The same values the JSON encoder handles beyond the native types
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not MessagePack serializable: {type(value).__name__}")
+
+
+def _pack_positions(content: Any) -> Any:
+    # Game states, alone or as an active player's gameState, get [x, y] positions
+    if isinstance(content, BaseModel):
+        content = content.model_dump(mode="json")
+    if isinstance(content, list):
+        return [_pack_positions(item) for item in content]
+    if not isinstance(content, dict):
+        return content
+    if "gameState" in content:
+        return {**content, "gameState": _pack_positions(content["gameState"])}
+    if "snake" in content and "food" in content:
+        return {
+            **content,
+            "snake": [[cell["x"], cell["y"]] for cell in content["snake"]],
+            "food": [content["food"]["x"], content["food"]["y"]],
+        }
+    return content
+
+
+def render(content: Any, representation: Representation) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Serialize and, above the size threshold, compress a result.
+
+    Args:
+        content: JSON-ready dicts and lists (see app.fast_json)
+        representation: Negotiated representation
+
+    Returns:
+        The body and its Content-Type (and Content-Encoding) headers
+    """
+    if representation.media_type == MSGPACK_MEDIA_TYPE:
+        body = msgpack.packb(_pack_positions(content), default=_msgpack_default)
+    else:
+        body = fast_json.dumps(content)
+    headers = {"content-type": representation.media_type}
+
+    if representation.encoding is None or len(body) < settings.COMPRESSION_MIN_BYTES:
+        return body, headers
+    if representation.encoding == "br":
+        body = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        # A fixed mtime keeps the bytes, and so the strong ETag, stable
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    headers["content-encoding"] = representation.encoding
+    return body, headers
+
+
+def negotiated_response(request: Request, content: Any) -> Response:
+    """Response for an uncached read, in the representation the client asked for."""
+    body, headers = render(content, negotiate(request))
+    return Response(content=body, headers={**headers, "vary": VARY})
@@ -0,0 +1,246 @@
+"""
+In-memory order-statistic index of player ranks.
+
+Holds every player's personal best per mode (``user_best_scores``) in a
+bucketed sorted list, so a player's rank, and the players just above and below
+them, are found without counting rows in the database. The index is loaded at
+startup and kept current by the write paths in ``app.database``, next to the
+top-K ``leaderboard_index``.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db_models import (
+    BEST_SCORE_COLUMNS, EntryStatusEnum, GameModeEnum, LeaderboardEntryModel, VISIBLE_ENTRY_STATUSES
+)
+
+# Sort key: highest score first, older entries win ties
+RankKey = Tuple[int, int]  # (-score, leaderboard_entry_id)
+
+
+class RankedPlayer(NamedTuple):
+    """A player's personal best as held by the rank index."""
+
+    user_id: int
+    username: str
+    score: int
+    leaderboard_entry_id: int
+    status: EntryStatusEnum
+    achieved_at: datetime
+
+
+class SortedKeyList:
+    """
+    Sorted list split into buckets of at most ``bucket_size`` keys.
+
+    Inserts and removals touch a single bucket, and positional lookups walk
+    bucket lengths instead of elements, which keeps every operation cheap at
+    hundreds of thousands of keys.
+    """
+
+    def __init__(self, bucket_size: int = 1000):
+        self.bucket_size = bucket_size
+        self._buckets: List[List[RankKey]] = []
+        self._maxes: List[RankKey] = []
+        self._len = 0
+
+    @classmethod
+    def from_sorted(cls, keys: List[RankKey], bucket_size: int = 1000) -> "SortedKeyList":
+        """Build from keys that are already sorted."""
+        instance = cls(bucket_size)
+        half = max(bucket_size // 2, 1)
+        instance._buckets = [keys[i:i + half] for i in range(0, len(keys), half)]
+        instance._maxes = [bucket[-1] for bucket in instance._buckets]
+        instance._len = len(keys)
+        return instance
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _bucket_for(self, key: RankKey) -> int:
+        index = bisect_left(self._maxes, key)
+        return min(index, len(self._buckets) - 1)
+
+    def add(self, key: RankKey) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            return
+
+        index = self._bucket_for(key)
+        bucket = self._buckets[index]
+        insort(bucket, key)
+        self._maxes[index] = bucket[-1]
+        self._len += 1
+
+        if len(bucket) > self.bucket_size:
+            half = len(bucket) // 2
+            self._buckets[index:index + 1] = [bucket[:half], bucket[half:]]
+            self._maxes[index:index + 1] = [bucket[half - 1], bucket[-1]]
+
+    def remove(self, key: RankKey) -> None:
+        index = self._bucket_for(key)
+        bucket = self._buckets[index]
+        position = bisect_left(bucket, key)
+        if position == len(bucket) or bucket[position] != key:
+            raise KeyError(key)
+        del bucket[position]
+        self._len -= 1
+        if bucket:
+            self._maxes[index] = bucket[-1]
+        else:
+            del self._buckets[index]
+            del self._maxes[index]
+
+    def index(self, key: RankKey) -> int:
+        """Number of keys that sort before ``key``."""
+        if not self._buckets:
+            return 0
+        index = bisect_left(self._maxes, key)
+        if index == len(self._buckets):
+            return self._len
+        return sum(len(bucket) for bucket in self._buckets[:index]) + bisect_left(self._buckets[index], key)
+
+    def slice(self, start: int, stop: int) -> List[RankKey]:
+        """Keys at positions [start, stop)."""
+        start, stop = max(start, 0), min(stop, self._len)
+        result: List[RankKey] = []
+        offset = 0
+        for bucket in self._buckets:
+            if offset + len(bucket) > start and offset < stop:
+                result.extend(bucket[max(start - offset, 0):stop - offset])
+            offset += len(bucket)
+            if offset >= stop:
+                break
+        return result
+
+
+class RankIndex:
+    """Per-mode player rankings over personal bests."""
+
+    def __init__(self, bucket_size: int = 1000):
+        self.bucket_size = bucket_size
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self._ranks: Dict[GameModeEnum, SortedKeyList] = {
+            mode: SortedKeyList(self.bucket_size) for mode in GameModeEnum
+        }
+        self._players: Dict[GameModeEnum, Dict[int, RankedPlayer]] = {mode: {} for mode in GameModeEnum}
+        self._by_key: Dict[GameModeEnum, Dict[RankKey, int]] = {mode: {} for mode in GameModeEnum}
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the index has been populated and can serve reads."""
+        return self._loaded
+
+    @staticmethod
+    def _key(player: RankedPlayer) -> RankKey:
+        return (-player.score, player.leaderboard_entry_id)
+
+    def _offer(self, mode: GameModeEnum, player: RankedPlayer) -> None:
+        current = self._players[mode].get(player.user_id)
+        if current is not None:
+            if not self._key(player) < self._key(current):
+                return
+            self._ranks[mode].remove(self._key(current))
+            del self._by_key[mode][self._key(current)]
+        self._players[mode][player.user_id] = player
+        self._by_key[mode][self._key(player)] = player.user_id
+        self._ranks[mode].add(self._key(player))
+
+    def add_many(self, entries: List[LeaderboardEntryModel]) -> None:
+        """Raise personal bests with newly committed entries (hidden ones are skipped)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            for entry in entries:
+                if entry.status not in VISIBLE_ENTRY_STATUSES:
+                    continue
+                self._offer(entry.mode, RankedPlayer(
+                    entry.user_id, entry.username, entry.score, entry.id, entry.status, entry.created_at
+                ))
+
+    def rank(self, mode: GameModeEnum, user_id: int) -> Optional[Tuple[int, int, RankedPlayer]]:
+        """
+        A player's 1-based rank in a mode.
+
+        Returns:
+            (rank, number of ranked players, player), or None if the player
+            has no visible score in the mode
+        """
+        with self._lock:
+            player = self._players[mode].get(user_id)
+            if player is None:
+                return None
+            ranks = self._ranks[mode]
+            return ranks.index(self._key(player)) + 1, len(ranks), player
+
+    def around(self, mode: GameModeEnum, user_id: int, k: int) -> Optional[Tuple[int, List[RankedPlayer]]]:
+        """
+        Up to ``k`` players above and below a player, and the player.
+
+        Returns:
+            (rank of the first returned player, players in rank order), or
+            None if the player has no visible score in the mode
+        """
+        with self._lock:
+            player = self._players[mode].get(user_id)
+            if player is None:
+                return None
+            ranks = self._ranks[mode]
+            position = ranks.index(self._key(player))
+            start = max(position - k, 0)
+            keys = ranks.slice(start, position + k + 1)
+            players = [self._players[mode][self._by_key[mode][key]] for key in keys]
+            return start + 1, players
+
+    def rebuild(self, db: Session) -> None:
+        """Reload the index from user_best_scores."""
+        # Every player's best in every mode: streamed rather than loaded at once
+        rows = db.execute(select(*BEST_SCORE_COLUMNS).execution_options(yield_per=settings.DB_YIELD_PER))
+
+        players: Dict[GameModeEnum, Dict[int, RankedPlayer]] = {mode: {} for mode in GameModeEnum}
+        for row in rows:
+            players[row.mode][row.user_id] = RankedPlayer(
+                row.user_id, row.username, row.score, row.leaderboard_entry_id, row.status, row.achieved_at
+            )
+        # One row per (user, mode), so keys are unique
+        by_key = {
+            mode: {self._key(player): user_id for user_id, player in players[mode].items()}
+            for mode in GameModeEnum
+        }
+        ranks = {
+            mode: SortedKeyList.from_sorted(sorted(by_key[mode]), self.bucket_size)
+            for mode in GameModeEnum
+        }
+
+        with self._lock:
+            self._players = players
+            self._by_key = by_key
+            self._ranks = ranks
+            self._loaded = True
+
+    def clear(self) -> None:
+        """Drop all players while keeping the index loaded."""
+        with self._lock:
+            self._reset_state()
+
+    def reset(self) -> None:
+        """Drop all players and mark the index as not loaded."""
+        with self._lock:
+            self._reset_state()
+            self._loaded = False
+
+
+# Global rank index instance
+rank_index = RankIndex()
@@ -0,0 +1,276 @@
+"""
+Compressed, seekable game replays.
+
+A replay is the game seed, the initial state and the tick-indexed direction
+changes. The server re-simulates the game with ``app.engine.rules`` (food via
+``app.engine.prng``) and stores the result as an append-only sequence of
+independently compressed chunks:
+
+    header  "SGRP" | version u8 | mode u8 | seed u32 | keyframe_interval u16
+    chunk*  start_tick u32 | size u32 | zlib(chunk body)
+
+    chunk body  keyframe_size u16 | keyframe (app.game_state_codec format)
+                event*  tick_offset varint | kind u8 [| food cell u16]
+
+Each chunk starts with a keyframe (the state before ``start_tick``) and holds
+the direction changes (kinds 0-3) and food spawns (kind 4) of the following
+``keyframe_interval`` ticks. A viewer can seek to tick N by decoding only the
+chunk that contains it, and food spawns are stored so viewers never need to
+re-run the food generator.
+"""
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.engine.prng import seeded_food_generator
+from app.engine.rules import move_snake
+from app.game_state_codec import decode_game_state, encode_game_state, position_to_cell
+from app.models import Direction, GameMode, GameState, GameStatus, GRID_SIZE, Position
+
+MAGIC = b"SGRP"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sBBIH")
+_CHUNK_HEADER = struct.Struct("<II")
+_KEYFRAME_SIZE = struct.Struct("<H")
+_CELL = struct.Struct("<H")
+
+_DIRECTIONS = [Direction.UP, Direction.DOWN, Direction.LEFT, Direction.RIGHT]
+_DIRECTION_CODES = {direction: code for code, direction in enumerate(_DIRECTIONS)}
+_MODES = [GameMode.PASS_THROUGH, GameMode.WALLS]
+FOOD_EVENT = 4
+
+
+class ReplayError(ValueError):
+    """Raised for malformed replay data or uploads."""
+
+
+class SimulatedGame:
+    """Outcome of re-simulating a replay's inputs."""
+
+    __slots__ = ("final_state", "tick_count", "chunks")
+
+    def __init__(self, final_state: GameState, tick_count: int, chunks: List[Tuple[int, bytes]]):
+        self.final_state = final_state
+        self.tick_count = tick_count
+        self.chunks = chunks  # (start_tick, uncompressed chunk body)
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def simulate(
+    seed: int,
+    initial_state: GameState,
+    inputs: Dict[int, Direction],
+    tick_count: int,
+    keyframe_interval: int,
+) -> SimulatedGame:
+    """
+    Re-run a game from its seed, initial state and direction changes.
+
+    Simulation stops after ``tick_count`` ticks or when the game ends,
+    whichever comes first. There is always at least one chunk, starting
+    with the keyframe of tick 0.
+    """
+    state = initial_state.model_copy(update={"status": GameStatus.PLAYING})
+    chunks: List[Tuple[int, bytes]] = []
+    body = bytearray()
+    chunk_start = 0
+    tick = 0
+
+    while tick < tick_count and state.status == GameStatus.PLAYING:
+        if tick % keyframe_interval == 0:
+            if tick:
+                chunks.append((chunk_start, bytes(body)))
+            keyframe = encode_game_state(state)
+            body = bytearray(_KEYFRAME_SIZE.pack(len(keyframe)) + keyframe)
+            chunk_start = tick
+
+        direction = inputs.get(tick)
+        if direction is not None:
+            body += _varint(tick - chunk_start) + bytes([_DIRECTION_CODES[direction]])
+
+        next_state = move_snake(
+            state, direction, food_generator=seeded_food_generator(seed, state.score)
+        )
+        if next_state.food is not state.food:
+            body += _varint(tick - chunk_start) + bytes([FOOD_EVENT])
+            body += _CELL.pack(position_to_cell(next_state.food.x, next_state.food.y))
+
+        state = next_state
+        tick += 1
+
+    if not body and not chunks:
+        # A game that ran no ticks still gets its starting keyframe
+        keyframe = encode_game_state(state)
+        body = bytearray(_KEYFRAME_SIZE.pack(len(keyframe)) + keyframe)
+    if body:
+        chunks.append((chunk_start, bytes(body)))
+    return SimulatedGame(state, tick, chunks)
+
+
+def build_replay(
+    seed: int,
+    initial_state: GameState,
+    inputs: List[Tuple[int, Direction]],
+    tick_count: int,
+    keyframe_interval: int,
+) -> Tuple[SimulatedGame, bytes]:
+    """
+    Simulate an uploaded game and encode it for storage.
+
+    Args:
+        seed: Game seed
+        initial_state: State before the first tick
+        inputs: (tick, direction) changes; the last one wins if a tick repeats
+        tick_count: Number of ticks the game ran
+        keyframe_interval: Ticks per seekable chunk
+
+    Returns:
+        (simulation result, encoded replay)
+
+    Raises:
+        ReplayError: If the initial state is not a valid game on the board
+            (the checks applied when a game starts), or an input lies
+            outside the game
+    """
+    if not initial_state.snake:
+        raise ReplayError("Initial state has no snake")
+    try:
+        encode_game_state(initial_state)
+    except ValueError as e:
+        raise ReplayError(f"Invalid initial state: {e}")
+
+    by_tick: Dict[int, Direction] = {}
+    for tick, direction in inputs:
+        if tick >= tick_count:
+            raise ReplayError(f"Input at tick {tick} is after the end of the game")
+        by_tick[tick] = Direction(direction)
+
+    game = simulate(seed, initial_state, by_tick, tick_count, keyframe_interval)
+    data = encode_replay(seed, initial_state.mode, keyframe_interval, game.chunks)
+    return game, data
+
+
+def encode_replay(seed: int, mode: GameMode, keyframe_interval: int, chunks: List[Tuple[int, bytes]]) -> bytes:
+    """Serialise simulated chunks into the stored replay format."""
+    out = bytearray(_HEADER.pack(
+        MAGIC, FORMAT_VERSION, _MODES.index(GameMode(mode)), seed & 0xFFFFFFFF, keyframe_interval
+    ))
+    for start_tick, body in chunks:
+        compressed = zlib.compress(body, 9)
+        out += _CHUNK_HEADER.pack(start_tick, len(compressed)) + compressed
+    return bytes(out)
+
+
+class ReplayReader:
+    """Random access over a stored replay."""
+
+    def __init__(self, data: bytes):
+        if len(data) < _HEADER.size:
+            raise ReplayError("Replay data is truncated")
+        magic, version, mode, seed, interval = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ReplayError("Not a replay in a supported format")
+
+        self.data = data
+        self.mode = _MODES[mode]
+        self.seed = seed
+        self.keyframe_interval = interval
+
+        # Chunk index from the record headers; no decompression needed
+        self.chunks: List[Tuple[int, int, int]] = []  # (start_tick, offset, size)
+        pos = _HEADER.size
+        while pos < len(data):
+            start_tick, size = _CHUNK_HEADER.unpack_from(data, pos)
+            pos += _CHUNK_HEADER.size
+            self.chunks.append((start_tick, pos, size))
+            pos += size
+
+    @property
+    def keyframe_ticks(self) -> List[int]:
+        return [start_tick for start_tick, _, _ in self.chunks]
+
+    def _chunk_index(self, tick: int) -> int:
+        index = 0
+        for i, (start_tick, _, _) in enumerate(self.chunks):
+            if start_tick > tick:
+                break
+            index = i
+        return index
+
+    def _events(self, index: int) -> Tuple[GameState, Iterator[Tuple[int, int, Optional[int]]]]:
+        start_tick, offset, size = self.chunks[index]
+        body = zlib.decompress(self.data[offset:offset + size])
+        (keyframe_size,) = _KEYFRAME_SIZE.unpack_from(body)
+        pos = _KEYFRAME_SIZE.size
+        keyframe = decode_game_state(body[pos:pos + keyframe_size])
+        pos += keyframe_size
+
+        def events():
+            nonlocal pos
+            while pos < len(body):
+                tick_offset, pos = _read_varint(body, pos)
+                kind = body[pos]
+                pos += 1
+                cell = None
+                if kind == FOOD_EVENT:
+                    (cell,) = _CELL.unpack_from(body, pos)
+                    pos += _CELL.size
+                yield start_tick + tick_offset, kind, cell
+
+        return keyframe, events()
+
+    def read_range(self, from_tick: int, to_tick: int):
+        """
+        Events needed to show ticks ``from_tick`` up to (excluding) ``to_tick``.
+
+        Returns:
+            (keyframe_tick, keyframe_state, inputs, food) where inputs is a
+            list of (tick, Direction) and food a list of (tick, Position),
+            starting at the keyframe at or before ``from_tick``
+        """
+        if not self.chunks:
+            raise ReplayError("Replay has no chunks")
+
+        first = self._chunk_index(from_tick)
+        keyframe_tick = self.chunks[first][0]
+        keyframe, _ = self._events(first)
+        inputs: List[Tuple[int, Direction]] = []
+        food: List[Tuple[int, Position]] = []
+
+        for index in range(first, len(self.chunks)):
+            if self.chunks[index][0] >= to_tick:
+                break
+            _, events = self._events(index)
+            for tick, kind, cell in events:
+                if tick >= to_tick:
+                    break
+                if kind == FOOD_EVENT:
+                    y, x = divmod(cell, GRID_SIZE)
+                    food.append((tick, Position.model_construct(x=x, y=y)))
+                else:
+                    inputs.append((tick, _DIRECTIONS[kind]))
+
+        return keyframe_tick, keyframe, inputs, food
@@ -1,90 +1,152 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.config import settings
 from app.models import LoginRequest, SignupRequest, AuthResponse, User
-from app.database import (
+from app.async_database import (
     authenticate_user, create_user, get_user_by_email, 
-    get_user_by_username, user_model_to_pydantic
+    get_user_by_id, get_user_by_username
 )
-from app.db_session import get_db
+from app.database import user_model_to_pydantic
+from app.db_session import get_async_db
+from app.security import PasswordHashingBusy, create_access_token, read_access_token
+from app.cache import MemoryCache
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
-# Simple in-memory session management for demo purposes
-# In a real app, use JWT or proper session handling
-current_user_id: int | None = None
+# Cookie carrying the access token for browser clients
+ACCESS_TOKEN_COOKIE = "snake_session"
+
+# Resolved users by ID, so authenticated requests skip the users table
+identity_cache = MemoryCache(
+    ttl=settings.IDENTITY_CACHE_TTL_SECONDS,
+    max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES,
+)
+
+
+def _hashing_busy() -> HTTPException:
+    # Returned when the password hashing pool is saturated; a new instance per
+    # raise so tracebacks don't pile up on a shared exception
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please try again",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _logged_in(response: Response, user: User) -> AuthResponse:
+    # Issue a token as both a cookie and a bearer token in the body
+    token = create_access_token(int(user.id))
+    response.set_cookie(
+        ACCESS_TOKEN_COOKIE,
+        token,
+        max_age=settings.ACCESS_TOKEN_TTL_SECONDS,
+        httponly=True,
+        samesite="lax",
+        secure=settings.SESSION_COOKIE_SECURE,
+    )
+    identity_cache.set(user.id, user.model_dump_json().encode())
+    return AuthResponse(success=True, user=user, token=token)
+
+
+def request_token(request: Request) -> Optional[str]:
+    """The access token from the Authorization header, or else the session cookie."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    return request.cookies.get(ACCESS_TOKEN_COOKIE)
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user with email and password.
     
     Args:
         request: Login credentials
+        response: Response (for the session cookie)
         db: Database session
         
     Returns:
-        Authentication response with user data
+        Authentication response with user data and access token
+        
+    Raises:
+        HTTPException: 503 if the password hashing queue is full
     """
-    global current_user_id
-    
-    user = authenticate_user(db, request.email, request.password)
+    try:
+        user = await authenticate_user(db, request.email, request.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
     
     if not user:
         return AuthResponse(success=False, error="User not found")
     
-    current_user_id = user.id
-    return AuthResponse(success=True, user=user_model_to_pydantic(user))
+    return _logged_in(response, user_model_to_pydantic(user))
 
 
 @router.post("/signup", response_model=AuthResponse)
-async def signup(request: SignupRequest, db: Session = Depends(get_db)):
+async def signup(request: SignupRequest, response: Response, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account.
     
     Args:
         request: Signup information
+        response: Response (for the session cookie)
         db: Database session
         
     Returns:
-        Authentication response with user data
+        Authentication response with user data and access token
+        
+    Raises:
+        HTTPException: 503 if the password hashing queue is full
     """
-    global current_user_id
-    
     # Check if email already exists
-    if get_user_by_email(db, request.email):
+    if await get_user_by_email(db, request.email):
         return AuthResponse(success=False, error="Email already registered")
     
     # Check if username already exists
-    if get_user_by_username(db, request.username):
+    if await get_user_by_username(db, request.username):
         return AuthResponse(success=False, error="Username already taken")
     
     # Create new user
-    new_user = create_user(db, request.username, request.email, request.password)
+    try:
+        new_user = await create_user(db, request.username, request.email, request.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
     
-    current_user_id = new_user.id
-    return AuthResponse(success=True, user=user_model_to_pydantic(new_user))
+    return _logged_in(response, user_model_to_pydantic(new_user))
 
 
 @router.post("/logout")
-async def logout():
+async def logout(response: Response):
     """
     Logout current user.
     
+    Clears the session cookie. Tokens are stateless, so a bearer token the
+    client kept stays valid until it expires; clients should discard it.
+    
+    Args:
+        response: Response (for clearing the session cookie)
+        
     Returns:
         Success message
     """
-    global current_user_id
-    current_user_id = None
+    response.delete_cookie(ACCESS_TOKEN_COOKIE, httponly=True, samesite="lax", secure=settings.SESSION_COOKIE_SECURE)
     return {"message": "Logout successful"}
 
 
 @router.get("/me", response_model=User)
-async def get_current_user(db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Get current authenticated user.
     
+    The user is identified by the signed access token in the Authorization
+    header (``Bearer <token>``) or the session cookie. Verifying the token
+    needs no database access, and resolved users are kept in the identity
+    cache, so most authenticated requests never query the users table.
+    
     Args:
+        request: Request (for the access token)
         db: Database session
         
     Returns:
@@ -93,18 +155,21 @@ async def get_current_user(db: Session = Depends(get_db)):
     Raises:
         HTTPException: If not authenticated or user not found
     """
-    global current_user_id
-    
-    if not current_user_id:
+    token = request_token(request)
+    user_id = read_access_token(token) if token else None
+    if user_id is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    user = db.query(UserModel).filter(UserModel.id == current_user_id).first()
+    cached = identity_cache.get(str(user_id))
+    if cached is not None:
+        return User.model_validate_json(cached)
+    
+    user = await get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     
-    return user_model_to_pydantic(user)
-
+    current = user_model_to_pydantic(user)
+    identity_cache.set(current.id, current.model_dump_json().encode())
+    return current
 
-# Import UserModel for the query (needed at the end to avoid circular import)
-from app.db_models import UserModel
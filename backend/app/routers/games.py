@@ -0,0 +1,212 @@
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.config import settings
+from app.models import (
+    ActivePlayer, EndGameRequest, EntryStatus, GamePatchesRequest, GameTicksRequest, LeaderboardEntry,
+    StartGameRequest
+)
+from app.async_database import create_active_player, end_active_player
+from app.database import active_player_model_to_pydantic, leaderboard_model_to_pydantic
+from app.db_session import get_async_db
+from app.game_state_codec import encode_game_state
+from app.live_games import PatchRejected, live_games, record_game_state
+from app.score_verification import score_verifier, verification_job
+from app.routers.auth import get_current_user
+
+router = APIRouter(prefix="/games", tags=["Games"])
+
+
+def _game_id(game_id: str) -> int:
+    try:
+        return int(game_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+
+def _snapshot_required(error: PatchRejected) -> HTTPException:
+    # The client resends its current state as a snapshot with a newer seq
+    return HTTPException(status_code=409, detail={"message": str(error), "seq": error.seq})
+
+
+@router.post("", response_model=ActivePlayer, status_code=201)
+async def start_game(
+    request: StartGameRequest,
+    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Start a game session, making the game visible to spectators.
+    
+    Args:
+        request: Game mode and initial state
+        user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        The session; its id is used to upload ticks and end the game
+    
+    Raises:
+        HTTPException: If the state is not on the board or is for another mode
+    """
+    if request.gameState.mode.value != request.mode.value:
+        raise HTTPException(status_code=400, detail="Game state mode does not match the game mode")
+    try:
+        game_state = encode_game_state(request.gameState)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    player = await create_active_player(
+        db,
+        user_id=int(user.id),
+        username=user.username,
+        score=request.gameState.score,
+        mode=request.mode,
+        game_state=game_state
+    )
+    live_games.track(player)
+    return active_player_model_to_pydantic(player)
+
+
+@router.post("/{game_id}/ticks", response_model=bool)
+async def upload_ticks(
+    game_id: str,
+    request: GameTicksRequest,
+    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload the game states since the last upload, oldest first.
+    
+    Clients batch their ticks (e.g. every 500 ms) rather than sending one
+    request per move. Only the latest state is kept: spectators and the
+    database see the game as of the end of each batch. With a sequence
+    number, the upload is a snapshot that later patches continue from.
+    
+    Args:
+        game_id: Game session ID
+        request: Batch of game states
+        user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        True if successful
+    
+    Raises:
+        HTTPException: If the user has no such game, a state is invalid (400)
+            or the snapshot is older than the game (409)
+    """
+    latest = request.ticks[-1]
+    try:
+        found = await record_game_state(db, _game_id(game_id), int(user.id), latest.score, latest, request.seq)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PatchRejected as e:
+        raise _snapshot_required(e)
+    
+    if not found:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return True
+
+
+@router.post("/{game_id}/patches", response_model=bool)
+async def upload_patches(
+    game_id: str,
+    request: GamePatchesRequest,
+    user = Depends(get_current_user)
+):
+    """
+    Upload patches to the game state, in sequence order.
+    
+    A patch carries the new head cells and how many cells left the tail,
+    plus only the fields that changed, so its size does not grow with the
+    snake. Patches apply to the state this worker holds in memory; when one
+    is out of order or does not fit, or the game is held elsewhere, the
+    response is 409 with the last sequence number applied and the client
+    sends a snapshot to /ticks.
+    
+    Args:
+        game_id: Game session ID
+        request: Patches
+        user: Current authenticated user
+        
+    Returns:
+        True if every patch was applied
+        
+    Raises:
+        HTTPException: If the user has no such game (404) or a snapshot is
+            required (409)
+    """
+    player_id = _game_id(game_id)
+    game = live_games.held(player_id)
+    if game is None:
+        raise _snapshot_required(PatchRejected("Game state not held here"))
+    if game.user_id != int(user.id):
+        raise HTTPException(status_code=404, detail="Game not found")
+    
+    try:
+        live_games.patch(player_id, request.patches)
+    except PatchRejected as e:
+        raise _snapshot_required(e)
+    return True
+
+
+@router.post("/{game_id}/end", response_model=Optional[LeaderboardEntry])
+async def end_game(
+    game_id: str,
+    request: EndGameRequest,
+    response: Response,
+    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    End a game session and submit its final score.
+    
+    The session is removed and the leaderboard entry written in a single
+    transaction, so a finished game never shows up both as live and on the
+    leaderboard, or on neither. Scores are verified as for
+    POST /leaderboard: with a recording the entry is pending and the
+    response is 202 with the entry's status URL in the Location header.
+    Buffered score ingestion does not apply.
+    
+    Args:
+        game_id: Game session ID
+        request: Final score and optional recording
+        response: Response (for the pending status code and headers)
+        user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        The leaderboard entry, or None for a game that ended at zero
+    
+    Raises:
+        HTTPException: If the user has no such game, a required recording
+            is missing or the verification queue is full
+    """
+    player_id = _game_id(game_id)
+    status = EntryStatus.UNVERIFIED
+    
+    verify = score_verifier.running and request.recording is not None and request.score > 0
+    if verify:
+        if score_verifier.full:
+            raise HTTPException(
+                status_code=503,
+                detail="Score verification is busy",
+                headers={"Retry-After": "1"}
+            )
+        status = EntryStatus.PENDING
+    elif score_verifier.running and settings.SCORE_VERIFICATION == "required" and request.score > 0:
+        raise HTTPException(status_code=400, detail="A game recording is required")
+    
+    found, entry = await end_active_player(db, player_id, int(user.id), request.score, status)
+    if not found:
+        raise HTTPException(status_code=404, detail="Game not found")
+    live_games.finish(player_id)
+    
+    if entry is None:
+        return None
+    if verify:
+        score_verifier.submit(verification_job(entry, request.recording))
+        response.status_code = 202
+        response.headers["Location"] = f"/api/leaderboard/entries/{entry.id}"
+    return leaderboard_model_to_pydantic(entry)
@@ -1,57 +1,310 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models import LeaderboardEntry, SubmitScoreRequest, GameMode
+import base64
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
+from app.config import settings
+from app.models import (
+    LeaderboardEntry, SubmitScoreRequest, GameMode, EntryStatus, LeaderboardWindow,
+    PlayerRank, RankedLeaderboardEntry
+)
+from app.leaderboard_windows import configured_season, read_key
+from app.content_versions import content_versions, conditional_get, LEADERBOARD
+from app.cache import cache_key, cached_response, cache_response
+from app.db_models import GameModeEnum
+from app.async_database import (
+    get_top_leaderboard, get_leaderboard, create_leaderboard_entry, clear_leaderboard,
+    get_leaderboard_entry, get_best_scores, get_window_leaderboard, get_player_rank,
+    get_players_around, get_user_by_username
+)
 from app.database import (
-    get_leaderboard, create_leaderboard_entry, 
-    leaderboard_model_to_pydantic
+    leaderboard_model_to_pydantic, leaderboard_model_to_dict, best_score_model_to_dict, ranked_player_to_dict
 )
-from app.db_session import get_db
+from app.db_session import get_async_db
+from app.negotiation import negotiate, negotiated_response
+from app.score_ingest import score_ingestor
+from app.score_verification import score_verifier, verification_job
 from app.routers.auth import get_current_user
 
 router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
 
 
+def encode_cursor(score: int, entry_id: int) -> str:
+    """Opaque keyset cursor for the entry a page ended with."""
+    return base64.urlsafe_b64encode(f"{score}:{entry_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[int, int]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        score, entry_id = raw.split(":")
+        return int(score), int(entry_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
 @router.get("", response_model=List[LeaderboardEntry])
 async def get_leaderboard_endpoint(
+    request: Request,
+    response: Response,
     mode: Optional[GameMode] = None,
-    db: Session = Depends(get_db)
+    window: LeaderboardWindow = LeaderboardWindow.ALL,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get leaderboard entries.
     
+    The all-time leaderboard is paginated with keyset cursors: when more
+    entries may follow, the X-Next-Cursor response header holds the cursor
+    to pass for the next page.
+    
+    The day, week and season windows are read from precomputed rollups and
+    list each player once, with their best score in the window.
+    
+    Responses carry an ETag that changes whenever the mode's leaderboard
+    does; a request whose If-None-Match matches it gets a 304 without the
+    database being read. They are JSON or MessagePack, compressed when
+    large, as the client negotiates (see app.negotiation).
+    
     Args:
+        request: Request (for If-None-Match, Accept and Accept-Encoding)
+        response: Response (for the caching and next-page cursor headers)
         mode: Optional game mode filter
+        window: Time window (all-time by default)
+        limit: Page size
+        cursor: Cursor from a previous page's X-Next-Cursor header
         db: Database session
         
     Returns:
         List of leaderboard entries ordered by score
+        
+    Raises:
+        HTTPException: If the cursor is invalid or the season window is
+            requested but no season is configured
+    """
+    if window != LeaderboardWindow.ALL:
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="Cursors are only supported for the all-time leaderboard")
+        if window == LeaderboardWindow.SEASON and configured_season() is None:
+            raise HTTPException(status_code=404, detail="No season is configured")
+    
+    mode_enum = GameModeEnum(mode.value) if mode else None
+    representation = negotiate(request, response)
+    etag = content_versions.etag(
+        LEADERBOARD, mode_enum, read_key(window, datetime.utcnow()), limit, cursor, representation.tag
+    )
+    not_modified = conditional_get(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    key = cache_key(LEADERBOARD, mode_enum, etag)
+    cached = await cached_response(key, response)
+    if cached:
+        return cached
+    
+    if window != LeaderboardWindow.ALL:
+        best_scores = await get_window_leaderboard(db, window, mode=mode, limit=limit)
+        return await cache_response(
+            key, [best_score_model_to_dict(best) for best in best_scores], response, representation
+        )
+    
+    if cursor is None:
+        entries = await get_top_leaderboard(db, mode=mode, limit=limit)
+    else:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        entries = await get_leaderboard(db, mode=mode, limit=limit, after=after)
+    
+    if len(entries) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(entries[-1].score, entries[-1].id)
+    return await cache_response(key, [leaderboard_model_to_dict(entry) for entry in entries], response, representation)
+
+
+async def _ranked_user_id(username: Optional[str], request: Request, db: AsyncSession) -> int:
+    # A named player, or the current user when no name is given
+    if username is None:
+        return int((await get_current_user(request, db)).id)
+    user = await get_user_by_username(db, username)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user.id
+
+
+@router.get("/rank", response_model=PlayerRank)
+async def get_rank_endpoint(
+    request: Request,
+    mode: GameMode,
+    username: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a player's rank among all players by personal best.
+    
+    Args:
+        request: Request (identifies the current user)
+        mode: Game mode
+        username: Player (default: the current user)
+        db: Database session
+        
+    Returns:
+        Rank, number of ranked players and percentile
+        
+    Raises:
+        HTTPException: If the player is unknown or has no score in the mode
+    """
+    found = await get_player_rank(db, await _ranked_user_id(username, request, db), mode)
+    if found is None:
+        raise HTTPException(status_code=404, detail="No score in this mode")
+    
+    rank, total, player = found
+    return PlayerRank(
+        username=player.username,
+        mode=mode,
+        score=player.score,
+        rank=rank,
+        totalPlayers=total,
+        percentile=round(100 * (total - rank + 1) / total, 2)
+    )
+
+
+@router.get("/around", response_model=List[RankedLeaderboardEntry])
+async def get_around_endpoint(
+    request: Request,
+    mode: GameMode,
+    username: Optional[str] = None,
+    k: int = Query(5, ge=0, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the players ranked directly above and below a player.
+    
+    Args:
+        request: Request (identifies the current user; Accept and
+            Accept-Encoding select the format)
+        mode: Game mode
+        username: Player (default: the current user)
+        k: Number of players on each side
+        db: Database session
+        
+    Returns:
+        Up to 2k + 1 personal bests in rank order, including the player's
+        
+    Raises:
+        HTTPException: If the player is unknown or has no score in the mode
+    """
+    found = await get_players_around(db, await _ranked_user_id(username, request, db), mode, k)
+    if found is None:
+        raise HTTPException(status_code=404, detail="No score in this mode")
+    
+    first_rank, players = found
+    return negotiated_response(request, [
+        ranked_player_to_dict(player, mode, first_rank + i)
+        for i, player in enumerate(players)
+    ])
+
+
+@router.get("/players", response_model=List[LeaderboardEntry])
+async def get_player_leaderboard_endpoint(
+    request: Request,
+    response: Response,
+    mode: Optional[GameMode] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the per-player leaderboard: each player's best score, once.
+    
+    Args:
+        request: Request (for Accept and Accept-Encoding)
+        response: Response
+        mode: Optional game mode filter
+        db: Database session
+        
+    Returns:
+        List of personal bests ordered by score
     """
-    entries = get_leaderboard(db, mode=mode, limit=20)
-    return [leaderboard_model_to_pydantic(entry) for entry in entries]
+    mode_enum = GameModeEnum(mode.value) if mode else None
+    representation = negotiate(request, response)
+    key = cache_key(
+        LEADERBOARD, mode_enum, content_versions.etag(LEADERBOARD, mode_enum, "players", representation.tag)
+    )
+    cached = await cached_response(key, response)
+    if cached:
+        return cached
+    
+    best_scores = await get_best_scores(db, mode=mode, limit=20)
+    return await cache_response(key, [best_score_model_to_dict(best) for best in best_scores], response, representation)
 
 
 @router.post("", response_model=bool)
 async def submit_score(
     request: SubmitScoreRequest,
+    response: Response,
     user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Submit a new score to the leaderboard.
     
+    When score verification is enabled and the request carries a game
+    recording, the entry is stored as pending and only shown once the
+    recording has been re-simulated to the same score; the response is then
+    202 with the entry's status URL in the Location header.
+    
+    When buffered ingestion is enabled the score is queued for the next
+    batch write unless the request asks for a durable write (or the buffer
+    is full), in which case it is committed before responding.
+    
     Args:
         request: Score submission data
+        response: Response (for the pending status code and headers)
         user: Current authenticated user
         db: Database session
         
     Returns:
         True if successful
+        
+    Raises:
+        HTTPException: If a required recording is missing or the
+            verification queue is full
     """
     # Convert user.id from string to int
     user_id = int(user.id)
     
-    create_leaderboard_entry(
+    if score_verifier.running:
+        if request.recording is not None:
+            if score_verifier.full:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Score verification is busy",
+                    headers={"Retry-After": "1"}
+                )
+            entry = await create_leaderboard_entry(
+                db,
+                user_id=user_id,
+                username=user.username,
+                score=request.score,
+                mode=request.mode,
+                status=EntryStatus.PENDING
+            )
+            score_verifier.submit(verification_job(entry, request.recording))
+            response.status_code = 202
+            response.headers["Location"] = f"/api/leaderboard/entries/{entry.id}"
+            return True
+        if settings.SCORE_VERIFICATION == "required":
+            raise HTTPException(status_code=400, detail="A game recording is required")
+    
+    # Buffered ingestion: the entry is written with the next batch
+    if not request.durable and score_ingestor.submit(
+        user_id, user.username, request.score, request.mode
+    ):
+        return True
+    
+    await create_leaderboard_entry(
         db,
         user_id=user_id,
         username=user.username,
@@ -62,10 +315,34 @@ async def submit_score(
     return True
 
 
+@router.get("/entries/{entry_id}", response_model=LeaderboardEntry)
+async def get_leaderboard_entry_endpoint(entry_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get a single leaderboard entry, including its verification status.
+    
+    Args:
+        entry_id: Leaderboard entry ID
+        db: Database session
+        
+    Returns:
+        Leaderboard entry
+        
+    Raises:
+        HTTPException: If the entry is not found
+    """
+    try:
+        entry = await get_leaderboard_entry(db, int(entry_id))
+    except ValueError:
+        entry = None
+    if not entry:
+        raise HTTPException(status_code=404, detail="Leaderboard entry not found")
+    return leaderboard_model_to_pydantic(entry)
+
+
 @router.delete("", response_model=int)
 async def clear_leaderboard_endpoint(
     user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Clear all leaderboard entries.
@@ -78,5 +355,4 @@ async def clear_leaderboard_endpoint(
     Returns:
         Number of deleted entries
     """
-    from app.database import clear_leaderboard
-    return clear_leaderboard(db)
+    return await clear_leaderboard(db)
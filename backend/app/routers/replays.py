@@ -0,0 +1,178 @@
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.config import settings
+from app.models import ReplayInfo, ReplayRange, ReplayInput, FoodSpawn, UploadReplayRequest
+from app.async_database import get_leaderboard_entry, create_replay, get_replay
+from app.database import replay_model_to_pydantic
+from app.db_session import get_async_db
+from app.replay import ReplayError, ReplayReader
+from app.score_verification import score_verifier
+from app.routers.auth import get_current_user
+
+router = APIRouter(prefix="/replays", tags=["Replays"])
+
+# Most chunks returned by a single range request
+MAX_RANGE_CHUNKS = 16
+
+
+def _parse_id(entry_id: str) -> int:
+    try:
+        return int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Leaderboard entry not found")
+
+
+@router.post("", response_model=ReplayInfo)
+async def upload_replay(
+    request: UploadReplayRequest,
+    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Upload the replay of one of the current user's leaderboard entries.
+
+    The game is re-simulated from the seed, initial state and inputs on
+    the score verification pool (within SCORE_VERIFY_CPU_SECONDS of CPU
+    time), and stored compressed with periodic keyframes.
+
+    Args:
+        request: Seed, initial state, tick count and direction changes
+        user: Current authenticated user
+        db: Database session
+
+    Returns:
+        Stored replay metadata
+
+    Raises:
+        HTTPException: If the entry is missing, not the user's, already has
+            a replay, or the upload is invalid
+    """
+    entry = await get_leaderboard_entry(db, _parse_id(request.entryId))
+    if not entry:
+        raise HTTPException(status_code=404, detail="Leaderboard entry not found")
+    if entry.user_id != int(user.id):
+        raise HTTPException(status_code=403, detail="Not your leaderboard entry")
+    if await get_replay(db, entry.id):
+        raise HTTPException(status_code=409, detail="Entry already has a replay")
+    if request.tickCount > settings.REPLAY_MAX_TICKS:
+        raise HTTPException(status_code=400, detail="Replay is too long")
+    if request.initialState.mode.value != entry.mode.value:
+        raise HTTPException(status_code=400, detail="Replay mode does not match the entry")
+
+    # Simulation is CPU-bound and untrusted: run it on the verification
+    # pool, out of this process and under its CPU-time cap
+    try:
+        tick_count, final_score, data = await score_verifier.build_replay(
+            request.seed,
+            request.initialState,
+            [(i.tick, i.direction) for i in request.inputs],
+            request.tickCount,
+        )
+    except ReplayError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    replay = await create_replay(
+        db,
+        entry_id=entry.id,
+        user_id=entry.user_id,
+        seed=request.seed,
+        mode=request.initialState.mode,
+        tick_count=tick_count,
+        final_score=final_score,
+        data=data
+    )
+    return replay_model_to_pydantic(replay)
+
+
+@router.get("/{entry_id}", response_model=ReplayInfo)
+async def get_replay_info(entry_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Get replay metadata for a leaderboard entry.
+
+    Args:
+        entry_id: Leaderboard entry ID
+        db: Database session
+
+    Returns:
+        Replay metadata including the keyframe ticks available for seeking
+
+    Raises:
+        HTTPException: If the entry has no replay
+    """
+    replay = await get_replay(db, _parse_id(entry_id))
+    if not replay:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    return replay_model_to_pydantic(replay)
+
+
+@router.get("/{entry_id}/range", response_model=ReplayRange)
+async def get_replay_range(
+    entry_id: str,
+    from_tick: int = 0,
+    to_tick: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream part of a replay.
+
+    Returns the keyframe at or before from_tick plus every direction change
+    and food spawn up to to_tick, so a viewer can seek without replaying
+    from the start.
+
+    Args:
+        entry_id: Leaderboard entry ID
+        from_tick: First tick to show
+        to_tick: Tick to stop before (default: one keyframe interval later)
+        db: Database session
+
+    Returns:
+        Keyframe and events for the range
+
+    Raises:
+        HTTPException: If the entry has no readable replay or the range is
+            invalid
+    """
+    replay = await get_replay(db, _parse_id(entry_id))
+    if not replay:
+        raise HTTPException(status_code=404, detail="Replay not found")
+
+    try:
+        reader = ReplayReader(replay.data)
+        if to_tick is None:
+            to_tick = from_tick + reader.keyframe_interval
+        if from_tick < 0 or to_tick <= from_tick:
+            raise HTTPException(status_code=400, detail="Invalid tick range")
+        to_tick = min(to_tick, from_tick + MAX_RANGE_CHUNKS * reader.keyframe_interval)
+
+        keyframe_tick, keyframe, inputs, food = reader.read_range(from_tick, to_tick)
+    except ReplayError as e:
+        # Stored before every replay had a keyframe, or otherwise unreadable
+        raise HTTPException(status_code=404, detail=f"Replay cannot be read: {e}")
+    return ReplayRange(
+        keyframeTick=keyframe_tick,
+        keyframe=keyframe,
+        inputs=[ReplayInput(tick=tick, direction=direction) for tick, direction in inputs],
+        food=[FoodSpawn(tick=tick, position=position) for tick, position in food]
+    )
+
+
+@router.get("/{entry_id}/raw")
+async def download_replay(entry_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Download the encoded replay (format described in app.replay).
+
+    Args:
+        entry_id: Leaderboard entry ID
+        db: Database session
+
+    Returns:
+        Replay bytes
+
+    Raises:
+        HTTPException: If the entry has no replay
+    """
+    replay = await get_replay(db, _parse_id(entry_id))
+    if not replay:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    return Response(content=replay.data, media_type="application/octet-stream")
@@ -1,36 +1,63 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import List, Optional
 from app.models import ActivePlayer, GameState
-from app.database import get_active_players, active_player_model_to_pydantic
-from app.db_session import get_db
-from app.db_models import ActivePlayerModel
+from app.db_session import get_async_db, get_async_session_factory
+from app.content_versions import content_versions, conditional_get, ACTIVE_PLAYERS
+from app.cache import cache_key, cached_response, cache_response
+from app.negotiation import negotiate, negotiated_response
+from app.live_games import live_games
+from app.spectator_stream import spectator_hub
 
 router = APIRouter(prefix="/spectator", tags=["Spectator"])
 
 
 @router.get("/active", response_model=List[ActivePlayer])
-async def get_active_players_endpoint(db: Session = Depends(get_db)):
+async def get_active_players_endpoint(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get all active players.
     
+    Served from the live game store (app.live_games). Supports conditional
+    GETs: a request whose If-None-Match matches the current ETag gets a 304.
+    Bandwidth-bound clients can ask for MessagePack and compression (see
+    app.negotiation).
+    
     Args:
+        request: Request (for If-None-Match, Accept and Accept-Encoding)
+        response: Response (for the caching headers)
         db: Database session
         
     Returns:
         List of active players with their game states
     """
-    players = get_active_players(db)
-    return [active_player_model_to_pydantic(player) for player in players]
+    await live_games.refresh(db)
+    representation = negotiate(request, response)
+    etag = content_versions.etag(ACTIVE_PLAYERS, None, live_games.tag, representation.tag)
+    not_modified = conditional_get(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    key = cache_key(ACTIVE_PLAYERS, None, etag)
+    cached = await cached_response(key, response)
+    if cached:
+        return cached
+    
+    return await cache_response(key, [game.to_dict() for game in live_games.games()], response, representation)
 
 
 @router.get("/player/{player_id}", response_model=GameState)
-async def get_player_game_state(player_id: str, db: Session = Depends(get_db)):
+async def get_player_game_state(player_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Get game state for a specific player.
     
     Args:
         player_id: Player ID
+        request: Request (for Accept and Accept-Encoding)
         db: Database session
         
     Returns:
@@ -45,10 +72,47 @@ async def get_player_game_state(player_id: str, db: Session = Depends(get_db)):
     except ValueError:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    player = db.query(ActivePlayerModel).filter(ActivePlayerModel.id == player_id_int).first()
+    await live_games.refresh(db)
+    game = live_games.get(player_id_int)
     
-    if not player:
+    if not game:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    # Deserialize game state from JSON
-    return GameState(**player.game_state)
+    return negotiated_response(request, game.game_state_dict())
+
+
+@router.websocket("/ws")
+async def spectator_stream(
+    websocket: WebSocket,
+    player_id: Optional[str] = None,
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+):
+    """
+    Stream live game frames to a spectator.
+    
+    Sends one snapshot followed by per-tick deltas (see app.spectator_stream
+    for the frame format). Connect with ?player_id=<id> to watch a single
+    game, or without it to watch the whole lobby.
+    
+    Args:
+        websocket: WebSocket connection
+        player_id: Optional player to watch
+        session_factory: Async session factory used by the stream hub
+    """
+    await websocket.accept()
+    subscriber = await spectator_hub.subscribe(player_id, session_factory)
+    
+    async def send_frames():
+        while True:
+            await websocket.send_text(await subscriber.queue.get())
+    
+    sender = asyncio.create_task(send_frames())
+    try:
+        # Spectators do not send anything; this waits for the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        spectator_hub.unsubscribe(subscriber)
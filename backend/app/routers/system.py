@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from typing import Dict
+from app.cache import response_cache
+
+router = APIRouter(tags=["System"])
+
+
+@router.get("/cache/stats", response_model=Dict[str, object])
+def get_cache_stats():
+    """
+    Get response cache counters for the worker serving the request.
+    
+    Runs on the threadpool, as counting the entries may read the cache file.
+    
+    Returns:
+        Hits, misses, sets, invalidations, errors, hit ratio, backend name
+        and number of cached entries
+    """
+    return response_cache.stats()
@@ -0,0 +1,170 @@
+"""
+Write-behind score ingestion.
+
+When ``SCORE_INGEST_MODE`` is ``"buffered"``, score submissions are appended to
+a bounded in-process buffer and a background task writes them with one
+multi-row INSERT and one commit per batch. A batch is flushed once
+``SCORE_INGEST_BATCH_SIZE`` submissions are waiting or every
+``SCORE_INGEST_FLUSH_INTERVAL_MS``, whichever comes first, and the buffer is
+drained on shutdown.
+
+A batch whose commit fails goes back to the front of the buffer and is
+retried on the next flush. After ``SCORE_INGEST_MAX_ATTEMPTS`` failures it is
+written row by row instead, so one bad row cannot block the queue; rows that
+still fail are logged and dropped. Once a batch is committed it is never
+retried: a failure while updating the indexes afterwards is only logged.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app import database
+from app.config import settings
+from app.db_models import GameModeEnum
+from app.models import GameMode
+
+logger = logging.getLogger(__name__)
+
+
+def _write_batch(db: Session, batch: List[dict]) -> None:
+    entries = database.insert_leaderboard_entries(db, batch)
+    # Committed: failing from here on must not put the rows back in the buffer
+    try:
+        database.publish_leaderboard_entries(entries)
+    except Exception:
+        logger.exception("Failed to publish %d written scores", len(entries))
+
+
+class ScoreIngestor:
+    """Bounded buffer of pending scores with a batching background flusher."""
+
+    def __init__(self, batch_size: int, flush_interval: float, buffer_size: int, max_attempts: int = 5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self.max_attempts = max(max_attempts, 1)
+        self._buffer: List[dict] = []
+        self._failures = 0  # Consecutive failed writes of the batch at the front
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flusher is accepting submissions."""
+        return self._task is not None
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered submissions not yet written."""
+        return len(self._buffer)
+
+    async def start(self, session_factory: async_sessionmaker) -> None:
+        """Start the background flusher on the running event loop."""
+        if self._task is not None:
+            return
+        self._session_factory = session_factory
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    def submit(self, user_id: int, username: str, score: int, mode: GameMode) -> bool:
+        """
+        Buffer a score for the next batch.
+
+        Returns:
+            False if the ingestor is not running or the buffer is full; the
+            caller should then write the score directly.
+        """
+        if self._task is None or self._stopping or len(self._buffer) >= self.buffer_size:
+            return False
+
+        self._buffer.append({
+            "user_id": user_id,
+            "username": username,
+            "score": score,
+            "mode": GameModeEnum(mode.value),
+            "created_at": datetime.utcnow(),
+        })
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """Write everything currently buffered. Returns the number of rows written."""
+        written = 0
+        async with self._flush_lock:
+            while self._buffer:
+                batch = self._buffer[:self.batch_size]
+                del self._buffer[:self.batch_size]
+                try:
+                    await self._write(batch)
+                except Exception:
+                    self._failures += 1
+                    if self._failures < self.max_attempts:
+                        # Not committed: keep the batch for the next attempt
+                        self._buffer[:0] = batch
+                        logger.exception(
+                            "Failed to flush %d buffered scores (attempt %d of %d)",
+                            len(batch), self._failures, self.max_attempts
+                        )
+                        break
+                    logger.exception("Failed to flush %d buffered scores; writing them one by one", len(batch))
+                    self._failures = 0
+                    written += await self._write_each(batch)
+                    continue
+                self._failures = 0
+                written += len(batch)
+        return written
+
+    async def _write(self, batch: List[dict]) -> None:
+        async with self._session_factory() as db:
+            await db.run_sync(_write_batch, batch)
+
+    async def _write_each(self, batch: List[dict]) -> int:
+        # Isolate the rows that cannot be written
+        written = 0
+        for row in batch:
+            try:
+                await self._write([row])
+            except Exception:
+                logger.exception("Dropped buffered score %r", row)
+                continue
+            written += 1
+        return written
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write any remaining scores."""
+        if self._task is None:
+            return
+        # Let an in-progress batch finish rather than cancelling it mid-write
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+
+# Global ingestor instance
+score_ingestor = ScoreIngestor(
+    batch_size=settings.SCORE_INGEST_BATCH_SIZE,
+    flush_interval=settings.SCORE_INGEST_FLUSH_INTERVAL_MS / 1000,
+    buffer_size=settings.SCORE_INGEST_BUFFER_SIZE,
+    max_attempts=settings.SCORE_INGEST_MAX_ATTEMPTS,
+)
@@ -0,0 +1,267 @@
+"""
+Background score verification.
+
+When ``SCORE_VERIFICATION`` is enabled, a score submitted with a game
+recording is stored as a PENDING (hidden) leaderboard entry and queued here.
+A background task takes up to ``SCORE_VERIFY_WORKERS * SCORE_VERIFY_BATCH_SIZE``
+queued recordings at a time, splits them into one batch per worker and
+re-simulates them in a process pool (``app.engine.verify``), then marks the
+entries VERIFIED (storing the replay) or REJECTED.
+
+The queue lives in memory, so entries still pending when a process dies
+cannot be verified any more (their recordings are not stored). Entries pending
+for longer than ``SCORE_VERIFY_PENDING_TIMEOUT_SECONDS`` are marked REJECTED
+at startup and by a sweep here every ``SCORE_VERIFY_PENDING_TIMEOUT_SECONDS``
+(whether or not the queue is busy), and must be resubmitted.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app import database
+from app.config import settings
+from app.db_models import LeaderboardEntryModel
+from app.engine.verify import (
+    REJECTED, VerificationJob, VerificationResult, build_replay_limited, reject, verify_batch
+)
+from app.models import Direction, GameRecording, GameState
+from app.replay import ReplayError
+
+logger = logging.getLogger(__name__)
+
+
+def verification_job(entry: LeaderboardEntryModel, recording: GameRecording) -> VerificationJob:
+    """Build the job for a pending entry from the submitted recording."""
+    return VerificationJob(
+        entry_id=entry.id,
+        user_id=entry.user_id,
+        score=entry.score,
+        mode=entry.mode.value,
+        seed=recording.seed,
+        tick_count=recording.tickCount,
+        initial_state=recording.initialState.model_dump(mode="json"),
+        inputs=[(i.tick, i.direction.value) for i in recording.inputs],
+    )
+
+
+class ScoreVerifier:
+    """Queue of pending recordings verified in batches on a process pool."""
+
+    def __init__(
+        self,
+        workers: int,
+        batch_size: int,
+        cpu_seconds: float,
+        queue_size: int,
+        max_ticks: int,
+        keyframe_interval: int,
+        pending_timeout: float = 600,
+    ):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.cpu_seconds = cpu_seconds
+        self.queue_size = queue_size
+        self.max_ticks = max_ticks
+        self.keyframe_interval = keyframe_interval
+        self.pending_timeout = pending_timeout
+        self._queue: List[VerificationJob] = []
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        """Whether recordings are being accepted."""
+        return self._task is not None and not self._stopping
+
+    @property
+    def full(self) -> bool:
+        """Whether the queue has no room for another recording."""
+        return len(self._queue) >= self.queue_size
+
+    @property
+    def pending(self) -> int:
+        """Number of queued recordings not yet picked up by a worker."""
+        return len(self._queue)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Workers are spawned rather than forked from the threaded server
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def start(self, session_factory: async_sessionmaker) -> None:
+        """Start the worker pool and the background task on the running event loop."""
+        if self._task is not None:
+            return
+        self._session_factory = session_factory
+        self._stopping = False
+        self._executor = self._new_executor()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        self._sweep_task = asyncio.create_task(self._sweep())
+
+    def submit(self, job: VerificationJob) -> bool:
+        """
+        Queue a recording for verification.
+
+        Returns:
+            False if the verifier is not running or the queue is full
+        """
+        if not self.running or self.full:
+            return False
+        self._queue.append(job)
+        self._wakeup.set()
+        return True
+
+    async def build_replay(
+        self,
+        seed: int,
+        initial_state: GameState,
+        inputs: List[Tuple[int, Direction]],
+        tick_count: int
+    ) -> Tuple[int, int, bytes]:
+        """
+        Build an uploaded replay on the worker pool, under the verification CPU cap.
+
+        Available whether or not score verification is enabled; the pool is
+        created on first use.
+
+        Returns:
+            (ticks simulated, final score, encoded replay)
+
+        Raises:
+            ReplayError: If the upload is invalid, uses up its CPU time or
+                kills its worker
+        """
+        if self._executor is None:
+            self._executor = self._new_executor()
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, build_replay_limited, seed, initial_state.model_dump(mode="json"),
+                [(tick, Direction(direction).value) for tick, direction in inputs],
+                tick_count, self.cpu_seconds, self.keyframe_interval,
+            )
+        except BrokenProcessPool:
+            if self._executor is executor:
+                logger.warning("Score verification pool broke; restarting it")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+            raise ReplayError("Replay could not be simulated")
+
+    async def _verify(self, jobs: List[VerificationJob]) -> List[VerificationResult]:
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, verify_batch, jobs,
+                self.cpu_seconds, self.max_ticks, self.keyframe_interval,
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory); replace the pool once
+            if self._executor is executor:
+                logger.warning("Score verification pool broke; restarting it")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+            if len(jobs) == 1:
+                return [reject(jobs[0], "Verification failed")]
+            # Retry one by one so only the job that kills a worker is rejected
+            results = []
+            for job in jobs:
+                results += await self._verify([job])
+            return results
+
+    async def _process(self, jobs: List[VerificationJob]) -> None:
+        # One batch per worker so the round is spread across all cores
+        n_batches = min(self.workers, len(jobs))
+        batches = [jobs[i::n_batches] for i in range(n_batches)]
+        results = [
+            result
+            for batch_results in await asyncio.gather(*(self._verify(batch) for batch in batches))
+            for result in batch_results
+        ]
+
+        for result in results:
+            if result.status == REJECTED:
+                logger.info("Rejected score for entry %d: %s", result.entry_id, result.reason)
+        async with self._session_factory() as db:
+            await db.run_sync(database.apply_verification_results, results)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                if self._stopping:
+                    return
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            jobs = self._queue[:self.workers * self.batch_size]
+            del self._queue[:len(jobs)]
+            try:
+                await self._process(jobs)
+            except Exception:
+                logger.exception("Failed to record %d score verifications", len(jobs))
+                if self._stopping:
+                    return
+                # Keep the jobs for the next attempt
+                self._queue[:0] = jobs
+                await asyncio.sleep(1)
+
+    async def _sweep(self) -> None:
+        # Runs on its own timer so a queue that never drains cannot starve it
+        while True:
+            await asyncio.sleep(self.pending_timeout)
+            await self.reject_stale()
+
+    async def reject_stale(self) -> int:
+        """Reject entries left pending by a process that died. Returns how many."""
+        try:
+            async with self._session_factory() as db:
+                rejected = await db.run_sync(database.reject_stale_pending_entries, self.pending_timeout)
+        except Exception:
+            logger.exception("Failed to reject stale pending scores")
+            return 0
+        if rejected:
+            logger.warning("Rejected %d scores whose verification was lost", rejected)
+        return rejected
+
+    async def stop(self) -> None:
+        """Stop accepting recordings, finish the queued ones and shut down the pool."""
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            try:
+                await self._sweep_task
+            except asyncio.CancelledError:
+                pass
+            self._sweep_task = None
+        if self._task is not None:
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global verifier instance
+score_verifier = ScoreVerifier(
+    workers=settings.SCORE_VERIFY_WORKERS,
+    batch_size=settings.SCORE_VERIFY_BATCH_SIZE,
+    cpu_seconds=settings.SCORE_VERIFY_CPU_SECONDS,
+    queue_size=settings.SCORE_VERIFY_QUEUE_SIZE,
+    max_ticks=settings.REPLAY_MAX_TICKS,
+    keyframe_interval=settings.REPLAY_KEYFRAME_INTERVAL,
+    pending_timeout=settings.SCORE_VERIFY_PENDING_TIMEOUT_SECONDS,
+)
@@ -1,8 +1,22 @@
 """
-Security utilities for password hashing and verification.
+Security utilities for password hashing and verification, and signed access tokens.
 """
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
 import bcrypt
 
+from app.config import DEFAULT_SECRET_KEY, settings
+
+logger = logging.getLogger(__name__)
+
 
 def hash_password(password: str) -> str:
     """
@@ -16,7 +30,7 @@ def hash_password(password: str) -> str:
     """
     # Convert password to bytes and hash it
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     # Return as string for storage
     return hashed.decode('utf-8')
@@ -36,3 +50,157 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
+
+
+# ============================================================================
+# Offloaded Hashing
+# ============================================================================
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool and its wait queue are full."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded worker pool instead of the event loop thread.
+
+    At most ``workers`` hashes run concurrently and at most ``queue_size``
+    more wait for a worker; anything beyond that is rejected immediately
+    with PasswordHashingBusy so callers can shed load.
+    """
+
+    def __init__(self, workers: int, queue_size: int, executor: str = "thread"):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self.executor_kind = executor
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of hashing jobs running or waiting."""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                # bcrypt releases the GIL, so threads hash in parallel
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_pending:
+            raise PasswordHashingBusy("Password hashing queue is full")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the worker pool."""
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the worker pool."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global hasher instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+)
+
+
+# ============================================================================
+# Access Tokens
+# ============================================================================
+
+def check_secret_key() -> None:
+    """
+    Refuse to run in production with the placeholder SECRET_KEY.
+    
+    Anyone can sign tokens for any user with the published default key, so
+    it is only tolerated (with a warning) when DEBUG is on.
+    
+    Raises:
+        RuntimeError: If SECRET_KEY is unset or the default and DEBUG is off
+    """
+    if settings.SECRET_KEY and settings.SECRET_KEY != DEFAULT_SECRET_KEY:
+        return
+    if not settings.DEBUG:
+        raise RuntimeError("SECRET_KEY must be set to a private random value when DEBUG is off")
+    logger.warning("SECRET_KEY is the development default; access tokens can be forged")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def create_access_token(user_id: int, ttl_seconds: Optional[int] = None) -> str:
+    """
+    Create a signed, expiring access token for a user.
+    
+    The token is ``<payload>.<signature>``: a base64url JSON payload with the
+    user ID and expiry time, and its HMAC-SHA256 under SECRET_KEY. Any worker
+    sharing the secret can verify it without a database lookup.
+    
+    Args:
+        user_id: User ID
+        ttl_seconds: Lifetime (default: ACCESS_TOKEN_TTL_SECONDS)
+        
+    Returns:
+        Access token
+    """
+    ttl = ttl_seconds if ttl_seconds is not None else settings.ACCESS_TOKEN_TTL_SECONDS
+    payload = _b64encode(json.dumps(
+        {"sub": user_id, "exp": int(time.time()) + ttl}, separators=(",", ":")
+    ).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def read_access_token(token: str) -> Optional[int]:
+    """
+    Verify an access token.
+    
+    Args:
+        token: Token from create_access_token
+        
+    Returns:
+        The user ID, or None if the token is malformed, forged or expired
+    """
+    if not token.isascii():
+        return None  # compare_digest only takes ASCII strings
+    payload, _, signature = token.partition(".")
+    if not signature or not hmac.compare_digest(signature, _sign(payload)):
+        return None
+    try:
+        claims = json.loads(_b64decode(payload))
+        if claims["exp"] <= time.time():
+            return None
+        return int(claims["sub"])
+    except (ValueError, KeyError, TypeError):
+        return None
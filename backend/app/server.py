@@ -0,0 +1,203 @@
+"""
+Pre-fork production server.
+
+Usage:
+    python -m app.server --host 0.0.0.0 --port 8000 --workers 4
+
+The supervisor imports the app, runs the database setup once, binds the
+listening socket and forks the workers, which share the socket and the
+counters in app.shared_state. Workers that die are replaced; SIGTERM or
+SIGINT stops them all gracefully.
+
+Per-worker state stays correct across workers:
+
+- logins are signed tokens, verified by any worker (app.routers.auth);
+- ETags and response cache keys come from the shared content versions;
+- each worker's leaderboard and rank indexes catch up on the other
+  workers' writes (app.index_sync);
+- each worker keeps the games started on it in memory and writes them to
+  active_players behind; spectators see other workers' games as of their
+  last write, and a game ended or updated through another worker is
+  released by the one holding it (app.live_games), so no sticky routing is
+  needed.
+"""
+import argparse
+import fcntl
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Set for the workers once the supervisor has run the database setup
+SETUP_DONE_ENV = "SNAKE_GLORY_SETUP_DONE"
+
+# A worker that dies sooner than this after starting is restarted after a pause
+MIN_WORKER_LIFETIME = 5.0
+
+
+@contextmanager
+def setup_lock():
+    """Hold an exclusive lock shared by every process on the host."""
+    with open(settings.SETUP_LOCK_PATH, "a") as lock_file:
+        fcntl.lockf(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+
+def setup_database() -> None:
+    """Create and upgrade the schema, seed it, and run the startup backfills."""
+    from app.db_session import create_tables, SessionLocal
+    from app.database import (
+        init_db, repack_active_player_game_states, backfill_best_scores, reject_stale_pending_entries
+    )
+
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        # Seed initial data if database is empty
+        init_db(db)
+
+        # Convert any active players still stored as JSON
+        repack_active_player_game_states(db)
+
+        # Fill personal bests the first time they are needed
+        backfill_best_scores(db)
+
+        # Give up on verifications lost when the previous server stopped
+        reject_stale_pending_entries(db)
+    finally:
+        db.close()
+
+
+def run_setup_once() -> None:
+    """
+    Run the database setup unless the supervisor already has.
+
+    Processes started some other way (e.g. several plain uvicorn processes)
+    take turns under the setup lock; the setup is idempotent.
+    """
+    if os.environ.get(SETUP_DONE_ENV) == "1":
+        return
+    with setup_lock():
+        setup_database()
+
+
+class Supervisor:
+    """Forks and supervises uvicorn workers sharing one listening socket."""
+
+    def __init__(self, host: str, port: int, workers: int, log_level: str = "info"):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.log_level = log_level
+        self._children: Dict[int, float] = {}  # pid -> start time
+        self._stopping = False
+        self._socket: Optional[socket.socket] = None
+
+    def _bind(self) -> socket.socket:
+        family = socket.AF_INET6 if ":" in self.host else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid:
+            self._children[pid] = time.monotonic()
+            return
+
+        # Worker: serve until told to stop, then exit without running the
+        # supervisor's cleanup
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            import uvicorn
+            from app.main import app
+
+            config = uvicorn.Config(app, log_level=self.log_level, proxy_headers=True)
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        """Set up the database, start the workers and supervise them until stopped."""
+        # Import the app once so the workers share its pages, and create the
+        # shared counters before forking
+        from app.main import app  # noqa: F401
+        from app.db_session import engine
+
+        run_setup_once()
+        os.environ[SETUP_DONE_ENV] = "1"
+        # No database connection may cross the fork
+        engine.dispose()
+
+        self._socket = self._bind()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        logger.info("Serving on %s:%d with %d workers", self.host, self.port, self.workers)
+        for _ in range(self.workers):
+            self._spawn()
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            started = self._children.pop(pid, None)
+            if self._stopping or started is None:
+                continue
+
+            logger.warning("Worker %d exited (status %d); restarting it", pid, status)
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(1)  # Do not spin on a worker that cannot start
+            if not self._stopping:
+                self._spawn()
+
+        self._socket.close()
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API with several worker processes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="Worker processes (default: SERVER_WORKERS)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
+    # Fail before forking rather than in every worker
+    from app.security import check_secret_key
+    check_secret_key()
+    return Supervisor(args.host, args.port, max(args.workers, 1), args.log_level).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Counters shared by the worker processes of one server.
+
+The counters live in an anonymous shared memory mapping created when this
+module is imported. ``python -m app.server`` imports the app before forking
+its workers, so every worker maps the same memory; a single-process server
+simply has its own. Increments take a POSIX record lock (released by the
+kernel if a worker dies holding it) plus a thread lock; reads are plain
+aligned 8-byte loads.
+
+Processes started independently (e.g. ``uvicorn --workers``) do not share
+counters; use the supervisor for multi-worker serving.
+"""
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from typing import Dict, List
+
+from app.db_models import GameModeEnum
+
+_COUNTER = struct.Struct("<Q")
+_EPOCH_SIZE = 8
+
+
+class SharedCounters:
+    """A fixed set of named 64-bit counters in shared memory."""
+
+    def __init__(self, names: List[str]):
+        self._slots: Dict[str, int] = {
+            name: _EPOCH_SIZE + i * _COUNTER.size for i, name in enumerate(names)
+        }
+        self._memory = mmap.mmap(-1, _EPOCH_SIZE + len(names) * _COUNTER.size)
+        self._memory[:_EPOCH_SIZE] = os.urandom(_EPOCH_SIZE)
+        self._lock_file = tempfile.TemporaryFile()
+        self._thread_lock = threading.Lock()
+
+    @property
+    def epoch(self) -> str:
+        """Random ID of this set of counters (they all start at zero)."""
+        return self._memory[:_EPOCH_SIZE].hex()
+
+    def get(self, name: str) -> int:
+        return _COUNTER.unpack_from(self._memory, self._slots[name])[0]
+
+    def increment(self, name: str) -> int:
+        """Add one to a counter and return the new value."""
+        offset = self._slots[name]
+        with self._thread_lock:
+            fcntl.lockf(self._lock_file, fcntl.LOCK_EX)
+            try:
+                value = _COUNTER.unpack_from(self._memory, offset)[0] + 1
+                _COUNTER.pack_into(self._memory, offset, value)
+            finally:
+                fcntl.lockf(self._lock_file, fcntl.LOCK_UN)
+        return value
+
+    def reset(self) -> None:
+        """Zero every counter under a new epoch."""
+        with self._thread_lock:
+            self._memory[:_EPOCH_SIZE] = os.urandom(_EPOCH_SIZE)
+            self._memory[_EPOCH_SIZE:] = bytes(len(self._memory) - _EPOCH_SIZE)
+
+
+# Content versions (see app.content_versions) and leaderboard index changes
+# (see app.index_sync)
+COUNTER_NAMES = [
+    f"{resource}:{mode.value}"
+    for resource in ("leaderboard", "active_players")
+    for mode in GameModeEnum
+] + ["index_appends", "index_resets"]
+
+# Global shared counters
+shared_counters = SharedCounters(COUNTER_NAMES)
@@ -0,0 +1,227 @@
+"""
+Live spectator stream with delta-encoded game frames.
+
+A single hub reads the live game store (app.live_games) once per tick and
+fans the changes out to every connected spectator, so the load does not grow
+with the number of viewers. Each connection receives one full snapshot followed by
+compact frames:
+
+    {"type": "snapshot", "players": [<ActivePlayer>, ...]}
+    {"type": "join", "player": <ActivePlayer>}
+    {"type": "leave", "id": "12"}
+    {"type": "delta", "id": "12", "head": [[x, y], ...], "drop": 1,
+     "food": [x, y], "score": 40, "status": "playing", "direction": "UP",
+     "speed": 144}
+    {"type": "replace", "player": <ActivePlayer>}
+
+A delta only carries the keys that changed. ``head`` lists the new head
+cells, newest first, and ``drop`` is how many cells were removed from the
+tail. When a change cannot be expressed that way (e.g. a restarted game)
+the full player is re-sent as ``replace``.
+"""
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.live_games import live_games
+from app.models import ActivePlayer, GameState
+
+logger = logging.getLogger(__name__)
+
+# Longest run of coalesced moves encoded as a delta before falling back to "replace"
+MAX_DELTA_MOVES = 16
+
+# Frames buffered per spectator before it is resynchronised with a snapshot
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Returned by diff_game_state when the change needs a full state
+REPLACE = object()
+
+
+def _cells(state: GameState) -> List[Tuple[int, int]]:
+    return [(p.x, p.y) for p in state.snake]
+
+
+def diff_game_state(old: GameState, new: GameState):
+    """
+    Compute the delta between two states of the same game.
+
+    Returns:
+        None if nothing changed, REPLACE if the snake cannot be described as
+        new head cells plus tail removal, or the delta dict otherwise
+    """
+    delta = {}
+
+    old_snake = _cells(old)
+    new_snake = _cells(new)
+    if old_snake != new_snake:
+        # Find the fewest new head cells such that the rest of the new snake
+        # is the front of the old one (and shares at least one cell with it)
+        for moves in range(1, min(len(new_snake), MAX_DELTA_MOVES) + 1):
+            kept = len(new_snake) - moves
+            if kept == 0 and old_snake:
+                return REPLACE
+            if kept <= len(old_snake) and new_snake[moves:] == old_snake[:kept]:
+                delta["head"] = [list(cell) for cell in new_snake[:moves]]
+                if len(old_snake) > kept:
+                    delta["drop"] = len(old_snake) - kept
+                break
+        else:
+            return REPLACE
+
+    if (old.food.x, old.food.y) != (new.food.x, new.food.y):
+        delta["food"] = [new.food.x, new.food.y]
+    if old.score != new.score:
+        delta["score"] = new.score
+    if old.status != new.status:
+        delta["status"] = new.status.value
+    if old.direction != new.direction:
+        delta["direction"] = new.direction.value
+    if old.speed != new.speed:
+        delta["speed"] = new.speed
+
+    return delta or None
+
+
+def _encode(frame: dict) -> str:
+    return json.dumps(frame, separators=(",", ":"))
+
+
+class Subscriber:
+    """A connected spectator and its pending outgoing frames."""
+
+    __slots__ = ("player_id", "queue")
+
+    def __init__(self, player_id: Optional[str]):
+        self.player_id = player_id  # None watches the whole lobby
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def wants(self, player_id: str) -> bool:
+        return self.player_id is None or self.player_id == player_id
+
+
+class SpectatorHub:
+    """Polls active players once per tick and broadcasts frames to subscribers."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._subscribers: Set[Subscriber] = set()
+        self._players: Dict[str, ActivePlayer] = {}
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._joining = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def subscribe(
+        self,
+        player_id: Optional[str],
+        session_factory: async_sessionmaker
+    ) -> Subscriber:
+        """Register a spectator and queue its initial snapshot."""
+        if self._task is None:
+            self._session_factory = session_factory
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+        self._joining += 1
+        try:
+            await self._ready.wait()
+        except BaseException:
+            self._joining -= 1
+            self._maybe_stop()
+            raise
+        self._joining -= 1
+
+        subscriber = Subscriber(player_id)
+        self._subscribers.add(subscriber)
+        subscriber.queue.put_nowait(self._snapshot(subscriber))
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a spectator; the hub stops polling when nobody is watching."""
+        self._subscribers.discard(subscriber)
+        self._maybe_stop()
+
+    def _maybe_stop(self) -> None:
+        if not self._subscribers and not self._joining and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._players = {}
+
+    def _snapshot(self, subscriber: Subscriber) -> str:
+        players = [
+            player.model_dump(mode="json")
+            for player_id, player in self._players.items()
+            if subscriber.wants(player_id)
+        ]
+        return _encode({"type": "snapshot", "players": players})
+
+    async def _load(self) -> Dict[str, ActivePlayer]:
+        async with self._session_factory() as db:
+            await live_games.refresh(db)
+        return {player.id: player for player in live_games.players()}
+
+    async def _run(self) -> None:
+        try:
+            self._players = await self._load()
+        except Exception:
+            logger.exception("Spectator stream initial load failed")
+        self._ready.set()
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception:
+                logger.exception("Spectator stream poll failed")
+
+    async def poll(self) -> None:
+        """Load the current players and broadcast what changed since the last poll."""
+        current = await self._load()
+        frames = []
+
+        for player_id, player in current.items():
+            previous = self._players.get(player_id)
+            if previous is None:
+                frames.append((player_id, {"type": "join", "player": player.model_dump(mode="json")}))
+                continue
+
+            delta = diff_game_state(previous.gameState, player.gameState)
+            if delta is REPLACE:
+                frames.append((player_id, {"type": "replace", "player": player.model_dump(mode="json")}))
+            elif delta:
+                frames.append((player_id, {"type": "delta", "id": player_id, **delta}))
+
+        for player_id in self._players.keys() - current.keys():
+            frames.append((player_id, {"type": "leave", "id": player_id}))
+
+        self._players = current
+        if frames:
+            self._broadcast([(player_id, _encode(frame)) for player_id, frame in frames])
+
+    def _broadcast(self, messages: List[Tuple[str, str]]) -> None:
+        for subscriber in self._subscribers:
+            wanted = [message for player_id, message in messages if subscriber.wants(player_id)]
+            if not wanted:
+                continue
+
+            queue = subscriber.queue
+            if queue.maxsize - queue.qsize() < len(wanted):
+                # Too slow to keep up: drop its backlog and start it over
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._snapshot(subscriber))
+            else:
+                for message in wanted:
+                    queue.put_nowait(message)
+
+# Global hub instance
+spectator_hub = SpectatorHub(settings.SPECTATOR_STREAM_INTERVAL_MS / 1000)
@@ -0,0 +1,445 @@
+"""
+Microbenchmarks for the functions in app.database and the model converters.
+
+Usage (from backend/):
+    python -m benchmarks.bench_database [--sizes 1000,10000,100000]
+        [--min-time 0.5] [--repeat 3] [--postgres-url URL]
+        [--output FILE] [--baseline FILE] [--threshold 20]
+
+Runs every case against a new SQLite file and, when a PostgreSQL URL is
+given (--postgres-url or BENCH_POSTGRES_URL) and reachable, against that
+database too, inside a temporary schema that is dropped afterwards.
+
+Cases: create_user and authenticate_user (bcrypt at BCRYPT_ROUNDS); at each
+table size, the leaderboard reads (get_leaderboard's first page and a keyset
+page from the middle, get_top_leaderboard, get_best_scores,
+get_window_leaderboard, get_player_rank and get_players_around) with the
+rollups and in-memory indexes rebuilt for the seeded entries; score writes
+through create_leaderboard_entry and create_leaderboard_entries (rollups,
+indexes and version bumps included); the active player functions, including
+end_active_player and save_live_games; and the user, leaderboard entry and
+active player ``*_model_to_pydantic`` converters.
+
+For each case it reports operations per second (best of --repeat rounds of
+at least --min-time seconds) and, from tracemalloc, the bytes allocated at
+the peak of a call and the bytes still held after it. With --baseline, a
+case whose ops/sec fell or whose allocations grew by more than --threshold
+percent against the baseline report fails the run (exit status 1).
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database import (
+    active_player_model_to_pydantic, authenticate_user, create_active_player, create_leaderboard_entries,
+    create_leaderboard_entry, create_user, delete_active_player, end_active_player, get_active_player,
+    get_active_players, get_best_scores, get_leaderboard, get_player_rank, get_players_around,
+    get_top_leaderboard, get_window_leaderboard, leaderboard_model_to_pydantic, rebuild_best_scores,
+    rebuild_leaderboard_index, rebuild_window_scores, save_live_games, update_active_player,
+    user_model_to_pydantic
+)
+from app.db_models import ActivePlayerModel, Base, GameModeEnum, LeaderboardEntryModel, UserModel
+from app.game_state_codec import encode_game_state
+from app.models import GameMode, GameState, LeaderboardWindow
+
+PASSWORD = "bench-password"
+
+# Active players present while the active player cases run
+ACTIVE_PLAYERS = 100
+
+# Accounts the seeded entries are spread over (the per-player boards and ranks)
+PLAYERS = 1000
+
+# Rows per create_leaderboard_entries call
+ENTRY_BATCH = 100
+
+# Seeded entries are one second apart from here
+SEED_START = datetime(2026, 1, 1)
+
+# Calls sampled by tracemalloc per case
+ALLOCATION_SAMPLES = 20
+
+STATE = GameState(
+    snake=[{"x": i % 20, "y": i // 20} for i in range(30)], food={"x": 5, "y": 5},
+    direction="RIGHT", score=270, status="playing", mode="walls", speed=120
+)
+
+
+class Case(NamedTuple):
+    """A benchmarked call; ``prepare(n)`` makes the arguments of n calls, one per call."""
+
+    name: str
+    call: Callable[[object], object]
+    prepare: Optional[Callable[[int], List[object]]] = None
+
+
+class Result(NamedTuple):
+    calls: int
+    ops_per_sec: float
+    alloc_bytes: float  # Peak traced memory during a call, above what was held before it
+    retained_bytes: float  # Traced memory still held after a call
+
+
+# ============================================================================
+# Databases
+# ============================================================================
+
+def sqlite_engine(workdir: str) -> Engine:
+    path = os.path.join(workdir, "bench.db")
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def postgres_engine(url: str, schema: str) -> Optional[Engine]:
+    """An engine whose connections use a new schema, or None if the server is unreachable."""
+    try:
+        admin = create_engine(url)
+        with admin.begin() as connection:
+            connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+        admin.dispose()
+    except Exception as e:
+        print(f"PostgreSQL skipped: {e}", file=sys.stderr)
+        return None
+    return create_engine(url, connect_args={"options": f"-csearch_path={schema}"})
+
+
+def drop_postgres_schema(url: str, schema: str) -> None:
+    admin = create_engine(url)
+    with admin.begin() as connection:
+        connection.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+    admin.dispose()
+
+
+# ============================================================================
+# Cases
+# ============================================================================
+
+def seed_players(db: Session) -> List[UserModel]:
+    """Add PLAYERS accounts with Core inserts (no password hashing)."""
+    db.execute(insert(UserModel), [
+        {"username": f"player{i}", "email": f"player{i}@example.com", "password_hash": "-"}
+        for i in range(PLAYERS)
+    ])
+    db.commit()
+    return db.query(UserModel).filter(UserModel.password_hash == "-").all()
+
+
+def seed_entries(db: Session, players: List[UserModel], start: int, count: int, rng: random.Random) -> None:
+    """
+    Add ``count`` leaderboard entries with Core inserts, then rebuild what
+    the writes would have maintained: personal bests, window rollups and the
+    in-memory indexes.
+    """
+    for offset in range(start, start + count, 10_000):
+        rows = []
+        for i in range(offset, min(offset + 10_000, start + count)):
+            player = rng.choice(players)
+            rows.append({
+                "user_id": player.id, "username": player.username, "score": rng.randrange(100_000),
+                "mode": rng.choice(list(GameModeEnum)), "created_at": SEED_START + timedelta(seconds=i),
+            })
+        db.execute(insert(LeaderboardEntryModel), rows)
+        db.commit()
+    rebuild_best_scores(db)
+    rebuild_window_scores(db, seeded_until(start + count))
+    rebuild_leaderboard_index(db)
+
+
+def seeded_until(size: int) -> datetime:
+    # "Now" for the window boards: just after the last seeded entry
+    return SEED_START + timedelta(seconds=size)
+
+
+def user_cases(db: Session) -> List[Case]:
+    numbers = itertools.count()
+    user = create_user(db, "bench-login", "bench-login@example.com", PASSWORD)
+
+    def new_user(_):
+        number = next(numbers)
+        return create_user(db, f"bench{number}", f"bench{number}@example.com", PASSWORD)
+
+    return [
+        Case("create_user", new_user),
+        Case("authenticate_user", lambda _: authenticate_user(db, user.email, PASSWORD)),
+    ]
+
+
+def leaderboard_read_cases(db: Session, size: int, player: UserModel) -> List[Case]:
+    now = seeded_until(size)
+    cases = [
+        Case(f"get_leaderboard[{size}]", lambda _: get_leaderboard(db, GameMode.WALLS, 20)),
+        Case(f"get_top_leaderboard[{size}]", lambda _: get_top_leaderboard(db, GameMode.WALLS, 20)),
+        Case(f"get_best_scores[{size}]", lambda _: get_best_scores(db, GameMode.WALLS, 20)),
+        Case(
+            f"get_window_leaderboard[{size}]",
+            lambda _: get_window_leaderboard(db, LeaderboardWindow.DAY, GameMode.WALLS, 20, now)
+        ),
+        Case(f"get_player_rank[{size}]", lambda _: get_player_rank(db, player.id, GameMode.WALLS)),
+        Case(f"get_players_around[{size}]", lambda _: get_players_around(db, player.id, GameMode.WALLS)),
+    ]
+    # A keyset page from the middle, when the table has a middle
+    page = get_leaderboard(db, GameMode.WALLS, limit=max(size // 4, 1))
+    if page:
+        after = (page[-1].score, page[-1].id)
+        cases.insert(1, Case(
+            f"get_leaderboard_after[{size}]", lambda _: get_leaderboard(db, GameMode.WALLS, 20, after)
+        ))
+    return cases
+
+
+def leaderboard_write_cases(db: Session, players: List[UserModel], rng: random.Random) -> List[Case]:
+    def entry_row(_=None) -> dict:
+        player = rng.choice(players)
+        return {
+            "user_id": player.id, "username": player.username, "score": rng.randrange(100_000),
+            "mode": GameModeEnum.WALLS,
+        }
+
+    def create_one(row):
+        return create_leaderboard_entry(db, row["user_id"], row["username"], row["score"], GameMode.WALLS)
+
+    return [
+        Case("create_leaderboard_entry", create_one, prepare=lambda n: [entry_row() for _ in range(n)]),
+        Case(
+            f"create_leaderboard_entries[{ENTRY_BATCH}]",
+            lambda rows: create_leaderboard_entries(db, rows),
+            prepare=lambda n: [[entry_row() for _ in range(ENTRY_BATCH)] for _ in range(n)]
+        ),
+    ]
+
+
+def active_player_cases(db: Session, user: UserModel) -> List[Case]:
+    def create(_=None):
+        return create_active_player(db, user.id, user.username, 270, GameMode.WALLS, STATE)
+
+    # The reads run first, while exactly ACTIVE_PLAYERS sessions exist
+    player_ids = [create().id for _ in range(ACTIVE_PLAYERS)]
+    player_id = player_ids[0]
+    packed = encode_game_state(STATE)
+
+    def live_game_rows(n: int) -> List[List[dict]]:
+        # One write-behind flush of every game per call, each newer than the last
+        now = datetime.utcnow()
+        return [
+            [
+                {"player_id": game_id, "mode": "walls", "score": 280, "game_state": packed, "updated_at": now + timedelta(microseconds=i)}
+                for game_id in player_ids
+            ]
+            for i in range(n)
+        ]
+
+    return [
+        Case("get_active_players", lambda _: get_active_players(db)),
+        Case("get_active_player", lambda _: get_active_player(db, player_id)),
+        Case("update_active_player", lambda _: update_active_player(db, player_id, 280, STATE)),
+        Case(
+            f"save_live_games[{ACTIVE_PLAYERS}]",
+            lambda rows: save_live_games(db, rows),
+            prepare=live_game_rows
+        ),
+        Case("create_active_player", create),
+        Case(
+            "delete_active_player",
+            lambda created_id: delete_active_player(db, created_id),
+            prepare=lambda n: [create().id for _ in range(n)]
+        ),
+        Case(
+            "end_active_player",
+            lambda created_id: end_active_player(db, created_id, user.id, 270),
+            prepare=lambda n: [create().id for _ in range(n)]
+        ),
+    ]
+
+
+def converter_cases(db: Session) -> List[Case]:
+    db.expire_all()
+    user = db.query(UserModel).first()
+    entry = db.query(LeaderboardEntryModel).first()
+    player = db.query(ActivePlayerModel).first()
+    return [
+        Case("user_model_to_pydantic", lambda _: user_model_to_pydantic(user)),
+        Case("leaderboard_model_to_pydantic", lambda _: leaderboard_model_to_pydantic(entry)),
+        Case("active_player_model_to_pydantic", lambda _: active_player_model_to_pydantic(player)),
+    ]
+
+
+# ============================================================================
+# Measurement
+# ============================================================================
+
+def call_args(case: Case, calls: int) -> List[object]:
+    # Prepared outside the timed and traced sections
+    return case.prepare(calls) if case.prepare else [None] * calls
+
+
+def run_calls(case: Case, calls: int) -> float:
+    args = call_args(case, calls)
+    started = time.perf_counter()
+    for arg in args:
+        case.call(arg)
+    return time.perf_counter() - started
+
+
+def measure(case: Case, min_time: float, repeat: int) -> Result:
+    # Double the calls per round until a round lasts min_time
+    calls = 1
+    while run_calls(case, calls) < min_time:
+        calls *= 2
+    best = min(run_calls(case, calls) for _ in range(repeat))
+
+    samples = min(calls, ALLOCATION_SAMPLES)
+    args = call_args(case, samples)
+    peaks, retained = [], []
+    tracemalloc.start()
+    try:
+        for arg in args:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            case.call(arg)
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(current - before)
+    finally:
+        tracemalloc.stop()
+
+    return Result(calls, calls / best, sum(peaks) / samples, sum(retained) / samples)
+
+
+def run_backend(engine: Engine, sizes: List[int], min_time: float, repeat: int) -> Dict[str, dict]:
+    """Run every case against one database; returns results by case name."""
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine, autoflush=False)()
+    results: Dict[str, dict] = {}
+
+    def report(case: Case) -> None:
+        case.call(call_args(case, 1)[0])  # Warm up
+        result = measure(case, min_time, repeat)
+        results[case.name] = result._asdict()
+        print(
+            f"  {case.name:<40}{result.ops_per_sec:>12.1f} ops/s"
+            f"{result.alloc_bytes:>12.0f} B peak{result.retained_bytes:>10.0f} B held",
+            file=sys.stderr
+        )
+
+    try:
+        for case in user_cases(db):
+            report(case)
+
+        user = db.query(UserModel).first()
+        players = seed_players(db)
+        rng = random.Random(1)
+        seeded = 0
+        for size in sorted(sizes):
+            seed_entries(db, players, seeded, size - seeded, rng)
+            seeded = size
+            for case in leaderboard_read_cases(db, size, players[0]):
+                report(case)
+
+        for case in leaderboard_write_cases(db, players, rng):
+            report(case)
+        for case in active_player_cases(db, user):
+            report(case)
+        for case in converter_cases(db):
+            report(case)
+    finally:
+        db.close()
+        engine.dispose()
+    return results
+
+
+# ============================================================================
+# Reporting
+# ============================================================================
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=Path(__file__).resolve().parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(baseline: dict, report: dict, threshold: float) -> List[str]:
+    """Cases slower, or allocating more, than the baseline by more than threshold percent."""
+    found = []
+    for backend, cases in report["results"].items():
+        for name, result in cases.items():
+            before = baseline.get("results", {}).get(backend, {}).get(name)
+            if before is None:
+                continue
+            if result["ops_per_sec"] < before["ops_per_sec"] * (1 - threshold / 100):
+                found.append(f"{backend} {name}: {before['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} ops/s")
+            # A few hundred bytes of noise are not a regression
+            if result["alloc_bytes"] > max(before["alloc_bytes"] * (1 + threshold / 100), before["alloc_bytes"] + 512):
+                found.append(f"{backend} {name}: {before['alloc_bytes']:.0f} -> {result['alloc_bytes']:.0f} B peak")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated leaderboard table sizes")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per measured round")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured rounds; the best one counts")
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"), help="PostgreSQL to run against too")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results of an earlier run to check against")
+    parser.add_argument("--threshold", type=float, default=20, help="Allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "sizes": sizes,
+            "min_time_s": args.min_time,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="snake-bench-") as workdir:
+        print("sqlite", file=sys.stderr)
+        report["results"]["sqlite"] = run_backend(sqlite_engine(workdir), sizes, args.min_time, args.repeat)
+
+    if args.postgres_url:
+        schema = f"bench_{os.getpid()}"
+        engine = postgres_engine(args.postgres_url, schema)
+        if engine is not None:
+            print("postgresql", file=sys.stderr)
+            try:
+                report["results"]["postgresql"] = run_backend(engine, sizes, args.min_time, args.repeat)
+            finally:
+                drop_postgres_schema(args.postgres_url, schema)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(json.load(f), report, args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
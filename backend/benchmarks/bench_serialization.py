@@ -0,0 +1,123 @@
+"""
+Cost per entry of building and encoding list responses.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--sizes 20,100,1000] [--repeat 5]
+
+Compares, for leaderboard entries and for active players with a 60-cell
+snake:
+
+- response_model: validated Pydantic models, validated again and encoded
+  the way FastAPI handles a route's response_model (what the endpoints did
+  originally);
+- pydantic_dump: validated models encoded by their TypeAdapter (the cached
+  responses before app.fast_json);
+- trusted_orjson: JSON-ready dicts encoded with orjson (app.fast_json).
+
+Prints microseconds per entry, best of --repeat runs.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from app.database import leaderboard_model_to_dict, leaderboard_model_to_pydantic
+from app.db_models import EntryStatusEnum, GameModeEnum, LeaderboardEntryModel
+from app.fast_json import dumps
+from app.live_games import LiveGame
+from app.models import ActivePlayer, GameMode, GameState, LeaderboardEntry
+
+ENTRIES = TypeAdapter(List[LeaderboardEntry])
+PLAYERS = TypeAdapter(List[ActivePlayer])
+
+
+def make_entries(count: int) -> List[LeaderboardEntryModel]:
+    start = datetime(2026, 1, 1)
+    return [
+        LeaderboardEntryModel(
+            id=i, user_id=i, username=f"player{i}", score=10_000 - i, mode=GameModeEnum.WALLS,
+            status=EntryStatusEnum.VERIFIED, created_at=start + timedelta(minutes=i)
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def make_games(count: int) -> List[LiveGame]:
+    state = GameState(
+        snake=[{"x": i % 20, "y": i // 20} for i in range(60)], food={"x": 5, "y": 5},
+        direction="RIGHT", score=600, status="playing", mode="walls", speed=120
+    )
+    games = []
+    for i in range(1, count + 1):
+        game = LiveGame(i, i, f"player{i}", GameMode.WALLS)
+        game.apply(600, state, datetime(2026, 1, 1))
+        games.append(game)
+    return games
+
+
+def as_response_model(adapter: TypeAdapter, content: list) -> bytes:
+    # FastAPI validates the returned value against the response model,
+    # converts it to JSON-compatible Python and JSONResponse encodes that
+    validated = adapter.validate_python(content, from_attributes=True)
+    data = adapter.dump_python(validated, mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def validated_player(game: LiveGame) -> ActivePlayer:
+    return ActivePlayer(
+        id=str(game.id), username=game.username, score=game.score, mode=game.mode,
+        gameState=GameState(**game.game_state().model_dump())
+    )
+
+
+def fresh_dict(game: LiveGame) -> dict:
+    game._json = None  # Measure the conversion, not the per-game cache
+    return game.to_dict()
+
+
+def cases(size: int) -> Dict[str, Callable[[], bytes]]:
+    entries = make_entries(size)
+    games = make_games(size)
+    return {
+        "leaderboard/response_model": lambda: as_response_model(
+            ENTRIES, [leaderboard_model_to_pydantic(e) for e in entries]
+        ),
+        "leaderboard/pydantic_dump": lambda: ENTRIES.dump_json([leaderboard_model_to_pydantic(e) for e in entries]),
+        "leaderboard/trusted_orjson": lambda: dumps([leaderboard_model_to_dict(e) for e in entries]),
+        "spectator/response_model": lambda: as_response_model(PLAYERS, [validated_player(g) for g in games]),
+        "spectator/pydantic_dump": lambda: PLAYERS.dump_json([validated_player(g) for g in games]),
+        "spectator/trusted_orjson": lambda: dumps([fresh_dict(g) for g in games]),
+    }
+
+
+def best_time(func: Callable[[], bytes], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="20,100,1000", help="Comma-separated entry counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"{'case':<30}" + "".join(f"{size:>12}" for size in sizes) + "   (us per entry)")
+    results: Dict[str, List[float]] = {}
+    for size in sizes:
+        for name, func in cases(size).items():
+            func()  # Warm up
+            results.setdefault(name, []).append(best_time(func, args.repeat) / size * 1e6)
+    for name, per_entry in results.items():
+        print(f"{name:<30}" + "".join(f"{value:>12.2f}" for value in per_entry))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+HTTP load-testing harness.
+
+Usage (from backend/):
+    python -m loadtest [--scenario mixed] [--duration 30] [--concurrency 50]
+    python -m loadtest.compare BASE.json NEW.json
+
+Seeds a database, starts the pre-fork server (app.server) against it, drives
+a scenario's request mix with concurrent virtual users and writes RPS and
+latency percentiles per endpoint to a JSON report (see loadtest.run).
+"""
@@ -0,0 +1,78 @@
+"""
+Compare two load test reports.
+
+Usage (from backend/):
+    python -m loadtest.compare BASE.json NEW.json [--threshold 10]
+
+Prints RPS and p50/p95/p99 per endpoint with the change from BASE to NEW.
+Exits with status 1 if an endpoint present in both reports lost more than
+--threshold percent of its RPS or its p99 grew by more than that, so it can
+gate a change in CI. Runs are only comparable with the same scenario,
+concurrency, workers and machine.
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(base: float, new: float) -> Optional[float]:
+    """Percent change from base to new (None if base is zero)."""
+    return (new - base) / base * 100 if base else None
+
+
+def regressions(base: dict, new: dict, threshold: float) -> List[str]:
+    """Endpoints whose RPS fell or p99 rose by more than threshold percent."""
+    found = []
+    for name, summary in new["endpoints"].items():
+        before = base["endpoints"].get(name)
+        if before is None:
+            continue
+        rps = change(before["rps"], summary["rps"])
+        p99 = change(before["p99_ms"], summary["p99_ms"])
+        if rps is not None and rps < -threshold:
+            found.append(f"{name}: rps {rps:+.1f}%")
+        if p99 is not None and p99 > threshold:
+            found.append(f"{name}: p99 {p99:+.1f}%")
+    return found
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two load test reports")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=10, help="Allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    for key in ("scenario", "concurrency", "workers", "database"):
+        if base["meta"].get(key) != new["meta"].get(key):
+            print(f"warning: {key} differs ({base['meta'].get(key)} vs {new['meta'].get(key)})", file=sys.stderr)
+
+    names = list(dict.fromkeys([*base["endpoints"], *new["endpoints"]]))
+    rows = [(name, base["endpoints"].get(name), new["endpoints"].get(name)) for name in names]
+    rows.append(("total", base["totals"], new["totals"]))
+    for name, before, after in rows:
+        cells = []
+        for metric in METRICS:
+            if before is None or after is None:
+                cells.append(f"{metric} {(after or before)[metric]} ({'new' if before is None else 'gone'})")
+                continue
+            delta = change(before[metric], after[metric])
+            cells.append(f"{metric} {before[metric]} -> {after[metric]}" + (f" ({delta:+.1f}%)" if delta is not None else ""))
+        print(f"{name}\n    " + "\n    ".join(cells))
+
+    found = regressions(base, new, args.threshold)
+    for line in found:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""
+Run a load test against a freshly started server.
+
+Usage (from backend/):
+    python -m loadtest [--scenario mixed] [--duration 30] [--warmup 5]
+                       [--concurrency 50] [--workers 2] [--think-ms 0]
+                       [--database-url URL] [--users 1000] [--entries 20000]
+                       [--output FILE]
+
+Steps:
+
+1. seed the database (loadtest.seed); without --database-url a new SQLite
+   file in a temporary directory is used. A PostgreSQL URL must point at a
+   disposable database: the seed data is written to it;
+2. start ``python -m app.server`` on a free port with the given workers and
+   wait until it answers;
+3. run --concurrency virtual users (loadtest.scenarios) for --warmup plus
+   --duration seconds, recording only after the warm-up;
+4. stop the server and write the report (loadtest.stats) to --output,
+   by default ``loadtest/results/<time>-<commit>-<scenario>.json``.
+
+Extra server settings are passed through the environment as usual, e.g.
+``RESPONSE_CACHE_BACKEND=sqlite python -m loadtest``. Compare two reports
+with ``python -m loadtest.compare``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.scenarios import SCENARIOS, VirtualUser
+from loadtest.stats import Recorder
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# How long the server may take to start answering
+STARTUP_TIMEOUT = 60.0
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def git_commit() -> Dict[str, object]:
+    """The commit under test, and whether the tree has uncommitted changes."""
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "."))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def server_env(database_url: str, workdir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    env["DEBUG"] = "false"  # SQL echo would dominate the measurements
+    env.setdefault("SECRET_KEY", secrets.token_urlsafe(32))  # Required with DEBUG off
+    env.setdefault("SETUP_LOCK_PATH", os.path.join(workdir, "setup.lock"))
+    env.setdefault("RESPONSE_CACHE_PATH", os.path.join(workdir, "response_cache.db"))
+    return env
+
+
+def seed_database(env: Dict[str, str], users: int, entries: int) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "loadtest.seed", "--users", str(users), "--entries", str(entries)],
+        cwd=BACKEND_DIR, env=env, check=True
+    )
+
+
+def start_server(env: Dict[str, str], port: int, workers: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.server", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with status {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/leaderboard", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    stop_server(server)
+    raise RuntimeError("Server did not start in time")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    if server.poll() is None:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+async def drive(
+    base_url: str,
+    weights: Dict[str, int],
+    concurrency: int,
+    users: int,
+    warmup: float,
+    duration: float,
+    think_time: float,
+    seed: int
+) -> dict:
+    """Run the virtual users; returns the report without its metadata."""
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        start = time.monotonic()
+        deadline = start + warmup + duration
+        virtual_users = [
+            VirtualUser(client, recorder, (seed + i) % users, random.Random(seed + i))
+            for i in range(concurrency)
+        ]
+        tasks = [asyncio.create_task(user.run(weights, deadline, think_time)) for user in virtual_users]
+
+        await asyncio.sleep(max(start + warmup - time.monotonic(), 0))
+        recorder.recording = True
+        measured_from = time.monotonic()
+        await asyncio.gather(*tasks)
+        recorder.recording = False
+        return recorder.report(time.monotonic() - measured_from, {})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the API and report latency per endpoint")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds run before measuring")
+    parser.add_argument("--concurrency", type=int, default=50, help="Virtual users")
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes")
+    parser.add_argument("--think-ms", type=float, default=0, help="Mean pause between a user's requests")
+    parser.add_argument("--database-url", help="Database to seed and serve (default: new SQLite file)")
+    parser.add_argument("--users", type=int, default=1000, help="Seeded accounts")
+    parser.add_argument("--entries", type=int, default=20000, help="Seeded leaderboard entries")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the virtual users")
+    parser.add_argument("--output", help="Report file (default: loadtest/results/...)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="snake-loadtest-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'loadtest.db')}"
+    env = server_env(database_url, workdir)
+
+    print(f"Seeding {args.users} users and {args.entries} entries...", file=sys.stderr)
+    seed_database(env, args.users, args.entries)
+
+    port = free_port()
+    server = start_server(env, port, args.workers)
+    started_at = datetime.now(timezone.utc)
+    try:
+        print(
+            f"Running '{args.scenario}' with {args.concurrency} users for {args.warmup:g}+{args.duration:g}s...",
+            file=sys.stderr
+        )
+        report = asyncio.run(drive(
+            f"http://127.0.0.1:{port}", SCENARIOS[args.scenario], args.concurrency, args.users,
+            args.warmup, args.duration, args.think_ms / 1000, args.seed
+        ))
+    finally:
+        stop_server(server)
+
+    revision = git_commit()
+    report["meta"] = {
+        **revision,
+        "started_at": started_at.isoformat(),
+        "scenario": args.scenario,
+        "weights": SCENARIOS[args.scenario],
+        "database": database_url.split(":", 1)[0].split("+", 1)[0],
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "think_ms": args.think_ms,
+        "warmup_s": args.warmup,
+        "duration_s": args.duration,
+        "seeded_users": args.users,
+        "seeded_entries": args.entries,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+    }
+
+    if args.output:
+        output = Path(args.output)
+    else:
+        stamp = started_at.strftime("%Y%m%dT%H%M%SZ")
+        output = RESULTS_DIR / f"{stamp}-{(revision['commit'] or 'unknown')[:8]}-{args.scenario}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n")
+
+    print_summary(report)
+    print(f"Report written to {output}", file=sys.stderr)
+    return 0
+
+
+def print_summary(report: dict) -> None:
+    rows = [("endpoint", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms")]
+    for name, summary in [*report["endpoints"].items(), ("total", report["totals"])]:
+        rows.append((name, *(str(summary[key]) for key in rows[0][1:])))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(width) if i == 0 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths))))
@@ -0,0 +1,148 @@
+"""
+Request mixes driven by the virtual users.
+
+Each virtual user logs in as one of the seeded accounts, then repeatedly picks
+an action at random, weighted by the scenario:
+
+- login: POST /api/auth/login (bcrypt; a burst of these queues on the
+  password hashing pool);
+- leaderboard: GET /api/leaderboard for a random mode and window, revalidated
+  with If-None-Match like the frontend's polling;
+- spectator: GET /api/spectator/active, revalidated the same way;
+- game_ticks: POST /api/games/{id}/ticks with the user's game (started on
+  first use), which keeps the spectator view changing;
+- submit_score: POST /api/leaderboard.
+"""
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from loadtest.seed import PASSWORD, user_email
+from loadtest.stats import Recorder
+
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "mixed": {"leaderboard": 45, "spectator": 30, "game_ticks": 15, "submit_score": 7, "login": 3},
+    "login-burst": {"login": 1},
+    "leaderboard": {"leaderboard": 1},
+    "spectator": {"spectator": 4, "game_ticks": 1},
+    "submit": {"submit_score": 1},
+}
+
+MODES = ("pass-through", "walls")
+WINDOWS = ("all", "all", "all", "day", "week")
+GRID_SIZE = 20
+
+
+def game_state(step: int, mode: str, score: int) -> dict:
+    """A plausible state: a snake of 3 + score/10 cells moving right along a row."""
+    length = min(3 + score // 10, GRID_SIZE)
+    row, head = divmod(step, GRID_SIZE)
+    return {
+        "snake": [{"x": (head - i) % GRID_SIZE, "y": row % GRID_SIZE} for i in range(length)],
+        "food": {"x": (head + 5) % GRID_SIZE, "y": (row + 3) % GRID_SIZE},
+        "direction": "RIGHT",
+        "score": score,
+        "status": "playing",
+        "mode": mode,
+        "speed": 150,
+    }
+
+
+class VirtualUser:
+    """One simulated client: a seeded account, its token, ETags and game."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, account: int, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.account = account
+        self.rng = rng
+        self.token: Optional[str] = None
+        self.etags: Dict[str, str] = {}
+        self.game_id: Optional[str] = None
+        self.mode = rng.choice(MODES)
+        self.step = 0
+        self.score = 0
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """Send a request and record its latency under ``endpoint``."""
+        if self.token:
+            kwargs.setdefault("headers", {})["Authorization"] = f"Bearer {self.token}"
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(endpoint, 0, (time.perf_counter() - start) * 1000)
+            return None
+        self.recorder.record(endpoint, response.status_code, (time.perf_counter() - start) * 1000)
+        return response
+
+    async def run(self, weights: Dict[str, int], deadline: float, think_time: float) -> None:
+        """Perform actions until the deadline (time.monotonic())."""
+        await self.login()
+        actions: List[str] = list(weights)
+        counts = [weights[action] for action in actions]
+        while time.monotonic() < deadline:
+            action = self.rng.choices(actions, counts)[0]
+            await getattr(self, action)()
+            if think_time:
+                await asyncio.sleep(self.rng.uniform(0, 2 * think_time))
+
+    # Actions
+
+    async def login(self) -> None:
+        response = await self.request(
+            "POST /api/auth/login", "POST", "/api/auth/login",
+            json={"email": user_email(self.account), "password": PASSWORD}
+        )
+        if response is not None and response.status_code == 200:
+            self.token = response.json().get("token") or self.token
+
+    async def poll(self, endpoint: str, url: str, params: Optional[dict] = None) -> None:
+        key = url + repr(sorted((params or {}).items()))
+        headers = {"If-None-Match": self.etags[key]} if key in self.etags else {}
+        response = await self.request(endpoint, "GET", url, params=params, headers=headers)
+        if response is not None and "etag" in response.headers:
+            self.etags[key] = response.headers["etag"]
+
+    async def leaderboard(self) -> None:
+        params = {"window": self.rng.choice(WINDOWS)}
+        mode = self.rng.choice(MODES + (None,))
+        if mode:
+            params["mode"] = mode
+        await self.poll("GET /api/leaderboard", "/api/leaderboard", params)
+
+    async def spectator(self) -> None:
+        await self.poll("GET /api/spectator/active", "/api/spectator/active")
+
+    async def game_ticks(self) -> None:
+        if self.game_id is None:
+            self.step = self.score = 0
+            response = await self.request(
+                "POST /api/games", "POST", "/api/games",
+                json={"mode": self.mode, "gameState": game_state(0, self.mode, 0)}
+            )
+            if response is not None and response.status_code == 201:
+                self.game_id = response.json()["id"]
+            return
+
+        # A 500 ms batch at the initial speed is about three moves
+        ticks = []
+        for _ in range(3):
+            self.step += 1
+            if self.rng.random() < 0.1:
+                self.score += 10
+            ticks.append(game_state(self.step, self.mode, self.score))
+        response = await self.request(
+            "POST /api/games/{id}/ticks", "POST", f"/api/games/{self.game_id}/ticks", json={"ticks": ticks}
+        )
+        if response is not None and response.status_code == 404:
+            self.game_id = None  # Expired; start another
+
+    async def submit_score(self) -> None:
+        await self.request(
+            "POST /api/leaderboard", "POST", "/api/leaderboard",
+            json={"score": int(self.rng.paretovariate(1.5) * 20) * 10, "mode": self.rng.choice(MODES)}
+        )
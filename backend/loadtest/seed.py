@@ -0,0 +1,84 @@
+"""
+Seed a database for a load test.
+
+Usage (from backend/, with DATABASE_URL set):
+    python -m loadtest.seed --users 1000 --entries 20000
+
+Run by loadtest.run in a subprocess, so the app's engine is created for the
+load test's database. Users are named ``load<N>`` with email
+``load<N>@loadtest.example.com`` and share PASSWORD (hashed once); their
+entries spread over the last 30 days so the day, week and all-time boards all
+have data. Seeding an already seeded database adds nothing.
+"""
+import argparse
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import insert, select
+
+from app.database import create_leaderboard_entries
+from app.db_models import GameModeEnum, UserModel
+from app.db_session import SessionLocal, create_tables
+from app.security import hash_password
+
+PASSWORD = "loadtest-password"
+
+# Entries written per transaction
+CHUNK_SIZE = 1000
+
+
+def user_email(index: int) -> str:
+    return f"load{index}@loadtest.example.com"
+
+
+def seed(users: int, entries: int, rng: random.Random) -> None:
+    """Create the load test users and their leaderboard entries."""
+    create_tables()
+    db = SessionLocal()
+    try:
+        if db.scalar(select(UserModel.id).where(UserModel.email == user_email(0))) is not None:
+            return
+
+        password_hash = hash_password(PASSWORD)
+        db.execute(insert(UserModel), [
+            {"username": f"load{i}", "email": user_email(i), "password_hash": password_hash}
+            for i in range(users)
+        ])
+        db.commit()
+        accounts = db.execute(
+            select(UserModel.id, UserModel.username).where(UserModel.email.like("%@loadtest.example.com"))
+        ).all()
+
+        now = datetime.utcnow()
+        modes = list(GameModeEnum)
+        for start in range(0, entries, CHUNK_SIZE):
+            rows = []
+            for _ in range(min(CHUNK_SIZE, entries - start)):
+                user_id, username = rng.choice(accounts)
+                rows.append({
+                    "user_id": user_id,
+                    "username": username,
+                    "score": int(rng.paretovariate(1.5) * 20) * 10,
+                    "mode": rng.choice(modes),
+                    "created_at": now - timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+                })
+            create_leaderboard_entries(db, rows)
+    finally:
+        db.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Seed a database for a load test")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args(argv)
+
+    seed(args.users, args.entries, random.Random(args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
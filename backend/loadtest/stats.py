@@ -0,0 +1,80 @@
+"""
+Per-endpoint latency recording and the JSON report.
+
+Report format (all latencies in milliseconds):
+
+    {
+      "meta": {"commit": "...", "scenario": "mixed", "database": "sqlite", ...},
+      "totals": {"requests": 12000, "errors": 3, "rps": 400.0, "p50_ms": ..., ...},
+      "endpoints": {
+        "GET /api/leaderboard": {"requests": 5400, "errors": 0, "rps": 180.0,
+                                 "p50_ms": 2.1, "p95_ms": 6.3, "p99_ms": 11.8,
+                                 "mean_ms": 2.7, "max_ms": 40.2,
+                                 "status": {"200": 1200, "304": 4200}},
+        ...
+      }
+    }
+
+Errors are failed requests (no response) and responses with status 400 or
+above; 304s count as successes.
+"""
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list (0.0 if empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    """RPS and latency distribution of one endpoint (or of all of them)."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+class Recorder:
+    """Collects request outcomes per endpoint while ``recording`` is set."""
+
+    def __init__(self):
+        self.recording = False
+        self._latencies: Dict[str, List[float]] = defaultdict(list)
+        self._statuses: Dict[str, Counter] = defaultdict(Counter)
+        self._errors: Counter = Counter()
+
+    def record(self, endpoint: str, status: int, latency_ms: float) -> None:
+        """Record a response (status 0: the request failed)."""
+        if not self.recording:
+            return
+        self._latencies[endpoint].append(latency_ms)
+        self._statuses[endpoint][str(status) if status else "failed"] += 1
+        if status == 0 or status >= 400:
+            self._errors[endpoint] += 1
+
+    def report(self, elapsed: float, meta: dict) -> dict:
+        """The JSON report of everything recorded over ``elapsed`` seconds."""
+        endpoints = {}
+        for endpoint in sorted(self._latencies):
+            summary = summarize(self._latencies[endpoint], self._errors[endpoint], elapsed)
+            summary["status"] = dict(sorted(self._statuses[endpoint].items()))
+            endpoints[endpoint] = summary
+
+        everything = [latency for latencies in self._latencies.values() for latency in latencies]
+        return {
+            "meta": meta,
+            "totals": summarize(everything, sum(self._errors.values()), elapsed),
+            "endpoints": endpoints,
+        }
@@ -2,20 +2,29 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import StaticPool, NullPool
 
+from app.config import settings
 from app.main import app
 from app.db_models import Base
-from app.db_session import get_db
-from app.database import init_db
+from app.db_session import get_db, get_async_db, get_async_session_factory
+from app.database import init_db, rebuild_leaderboard_index
+from app.cache import response_cache
+from app.routers.auth import identity_cache
+from app.live_games import live_games
 
 
-# Create test database engine (in-memory SQLite)
-TEST_DATABASE_URL = "sqlite:///:memory:"
+# Create test database engines (temporary SQLite file shared by the sync
+# fixtures and the async session used by the routers)
+TEST_DATABASE_PATH = os.path.join(tempfile.mkdtemp(), "test.db")
+TEST_DATABASE_URL = f"sqlite:///{TEST_DATABASE_PATH}"
+TEST_ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{TEST_DATABASE_PATH}"
 
 engine = create_engine(
     TEST_DATABASE_URL,
@@ -25,6 +34,18 @@ engine = create_engine(
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each TestClient runs its own event loop, so async connections are not pooled
+async_engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+# The test client talks plain HTTP, which would drop a Secure session cookie
+settings.SESSION_COOKIE_SECURE = False
+# Startup refuses the default key when DEBUG is off
+settings.SECRET_KEY = "test-secret-key"
+
 
 def override_get_db():
     """Override database dependency for tests."""
@@ -35,6 +56,12 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    """Override async database dependency for tests."""
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test."""
@@ -54,14 +81,31 @@ def db_session():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def async_session_factory(db_session):
+    """Async session factory bound to the test database."""
+    return TestingAsyncSessionLocal
+
+
 @pytest.fixture
 def client(db_session):
     """Create a test client with database override."""
-    # Override the get_db dependency
+    # Override the database dependencies
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_session_factory] = lambda: TestingAsyncSessionLocal
     
     with TestClient(app, base_url="http://test/api") as test_client:
+        # Startup loads the index from the app database; point it at the test one
+        rebuild_leaderboard_index(db_session)
+        # Tests seed tables directly, bypassing cache invalidation
+        response_cache.clear()
+        identity_cache.clear()
+        live_games.clear()
+        # Startup pointed the live game flusher at the app database
+        live_games._session_factory = TestingAsyncSessionLocal
         yield test_client
+        live_games.clear()
     
     # Clear overrides after test
     app.dependency_overrides.clear()
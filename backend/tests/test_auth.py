@@ -42,3 +42,82 @@ def test_login_invalid_credentials(client):
     assert response.status_code == 200
     assert response.json()["success"] == False
     assert response.json()["error"] == "User not found"
+
+def test_login_rejected_when_hashing_queue_full(client, monkeypatch):
+    from app.security import password_hasher
+
+    client.post("/auth/signup", json={
+        "username": "busy", "email": "busy@example.com", "password": "password123"
+    })
+
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post("/auth/login", json={
+        "email": "busy@example.com", "password": "password123"
+    })
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+def test_bearer_token_is_verified_without_session_state(client):
+    from app.security import create_access_token, read_access_token
+
+    response = client.post("/auth/signup", json={
+        "username": "bearer", "email": "bearer@example.com", "password": "password123"
+    })
+    token = response.json()["token"]
+    assert read_access_token(token) == int(response.json()["user"]["id"])
+
+    # Each request carries its own identity: no cookie, only the header
+    client.cookies.clear()
+    assert client.get("/auth/me").status_code == 401
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["username"] == "bearer"
+
+    signature = token.partition(".")[2]
+    forged = create_access_token(999).partition(".")[0] + "." + signature
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {forged}"}).status_code == 401
+    expired = create_access_token(int(response.json()["id"]), ttl_seconds=-1)
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {expired}"}).status_code == 401
+
+
+def test_malformed_token_is_rejected(client):
+    from app.security import read_access_token
+
+    client.cookies.clear()
+    for token in ("garbage", "a.b", ".sig", "%%%.%%%", "a.\u00e9", "\u00e9.\u00e9"):
+        assert read_access_token(token) is None
+    # Header values reach the app as latin-1; non-ASCII ones are not a 500
+    for header in (b"Bearer a.\xc3\xa9", b"Bearer \xff.\xff", b"Bearer a.b"):
+        assert client.get("/auth/me", headers={"Authorization": header}).status_code == 401
+
+
+def test_identity_cache_skips_user_lookup(client, monkeypatch):
+    import app.routers.auth as auth
+
+    token = client.post("/auth/signup", json={
+        "username": "cachedid", "email": "cachedid@example.com", "password": "password123"
+    }).json()["token"]
+
+    async def no_lookup(db, user_id):
+        raise AssertionError("user was looked up")
+
+    monkeypatch.setattr(auth, "get_user_by_id", no_lookup)
+    response = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.json()["email"] == "cachedid@example.com"
+
+
+def test_default_secret_key_refused_without_debug(monkeypatch):
+    import pytest
+    from app.config import DEFAULT_SECRET_KEY, settings
+    from app.security import check_secret_key
+
+    monkeypatch.setattr(settings, "SECRET_KEY", DEFAULT_SECRET_KEY)
+    monkeypatch.setattr(settings, "DEBUG", False)
+    with pytest.raises(RuntimeError):
+        check_secret_key()
+
+    monkeypatch.setattr(settings, "DEBUG", True)
+    check_secret_key()  # Tolerated for development, with a warning
+
+    monkeypatch.setattr(settings, "SECRET_KEY", "a-private-key")
+    monkeypatch.setattr(settings, "DEBUG", False)
+    check_secret_key()
@@ -0,0 +1,73 @@
+from app.database import (
+    create_leaderboard_entries, create_leaderboard_entry, get_best_scores, rebuild_best_scores
+)
+from app.db_models import EntryStatusEnum, GameModeEnum, UserBestScoreModel, UserModel
+from app.models import EntryStatus, GameMode
+
+
+def _users(db_session, count):
+    users = [UserModel(username=f"best{i}", email=f"best{i}@test.com", password_hash="hash") for i in range(count)]
+    db_session.add_all(users)
+    db_session.commit()
+    return users
+
+
+def _bests(db_session):
+    return {
+        (row.user_id, row.mode): (row.score, row.leaderboard_entry_id)
+        for row in db_session.query(UserBestScoreModel).all()
+    }
+
+
+def test_entries_maintain_personal_bests(db_session):
+    alice, bob = _users(db_session, 2)
+
+    first = create_leaderboard_entry(db_session, alice.id, alice.username, 100, GameMode.WALLS)
+    create_leaderboard_entry(db_session, alice.id, alice.username, 50, GameMode.WALLS)
+    create_leaderboard_entry(db_session, alice.id, alice.username, 100, GameMode.WALLS)  # Tie keeps the first
+    create_leaderboard_entry(db_session, alice.id, alice.username, 900, GameMode.WALLS, EntryStatus.PENDING)
+    other_mode = create_leaderboard_entry(db_session, alice.id, alice.username, 70, GameMode.PASS_THROUGH)
+
+    # Buffered batches can hold several scores for the same player
+    rows = [
+        {"user_id": bob.id, "username": bob.username, "score": score, "mode": GameModeEnum.WALLS}
+        for score in (30, 300, 200)
+    ]
+    batch = create_leaderboard_entries(db_session, rows)
+
+    assert _bests(db_session) == {
+        (alice.id, GameModeEnum.WALLS): (100, first.id),
+        (alice.id, GameModeEnum.PASS_THROUGH): (70, other_mode.id),
+        (bob.id, GameModeEnum.WALLS): (300, batch[1].id),
+    }
+
+    # Rebuilding from the entries gives the same table
+    incremental = _bests(db_session)
+    assert rebuild_best_scores(db_session) == 3
+    assert _bests(db_session) == incremental
+
+
+def test_best_scores_one_row_per_player(db_session):
+    alice, bob, carol = _users(db_session, 3)
+    for user, scores in ((alice, (500, 400)), (bob, (450, 460)), (carol, (10,))):
+        for i, score in enumerate(scores):
+            mode = GameMode.WALLS if i == 0 else GameMode.PASS_THROUGH
+            create_leaderboard_entry(db_session, user.id, user.username, score, mode)
+
+    overall = get_best_scores(db_session, limit=2)
+    assert [(row.username, row.score) for row in overall] == [("best0", 500), ("best1", 460)]
+
+    walls = get_best_scores(db_session, mode=GameMode.WALLS)
+    assert [row.score for row in walls] == [500, 450, 10]
+    assert all(row.status == EntryStatusEnum.UNVERIFIED for row in walls)
+
+
+def test_player_leaderboard_endpoint(client):
+    client.post("/auth/signup", json={"username": "repeat", "email": "repeat@example.com", "password": "password123"})
+    for score in (100, 300, 200):
+        client.post("/leaderboard", json={"score": score, "mode": "walls"})
+
+    assert len([e for e in client.get("/leaderboard").json() if e["username"] == "repeat"]) == 3
+
+    players = [e for e in client.get("/leaderboard/players").json() if e["username"] == "repeat"]
+    assert [e["score"] for e in players] == [300]
@@ -0,0 +1,85 @@
+import os
+import tempfile
+
+from app.cache import MemoryCache, SQLiteCache, cache_key, response_cache
+from app.content_versions import LEADERBOARD
+from app.db_models import GameModeEnum
+
+
+def test_memory_cache_lru_and_ttl():
+    cache = MemoryCache(ttl=60, max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")  # Evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+
+    cache.ttl = 0
+    cache.set("d", b"4")
+    assert cache.get("d") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["backend"]) == (2, 2, "memory")
+
+
+def test_invalidation_by_mode():
+    cache = MemoryCache(ttl=60, max_entries=10)
+    walls = cache_key(LEADERBOARD, GameModeEnum.WALLS, 20)
+    pass_through = cache_key(LEADERBOARD, GameModeEnum.PASS_THROUGH, 20)
+    overall = cache_key(LEADERBOARD, None, 20)
+    for key in (walls, pass_through, overall):
+        cache.set(key, b"[]")
+
+    cache.invalidate(LEADERBOARD, [GameModeEnum.WALLS])
+    assert cache.get(walls) is None
+    assert cache.get(overall) is None
+    assert cache.get(pass_through) == b"[]"
+
+
+def test_sqlite_cache_is_shared_between_workers():
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    worker_a, worker_b = SQLiteCache(path, ttl=60), SQLiteCache(path, ttl=60)
+    key = cache_key(LEADERBOARD, GameModeEnum.WALLS, 20)
+
+    worker_a.set(key, b"[1]")
+    assert worker_b.get(key) == b"[1]"
+    worker_b.invalidate(LEADERBOARD, [GameModeEnum.WALLS])
+    assert worker_a.get(key) is None
+
+    worker_a.ttl = -1
+    worker_a.set(key, b"[2]")
+    assert worker_b.get(key) is None
+    worker_a.close()
+    worker_b.close()
+
+
+def test_leaderboard_reads_are_cached_and_invalidated(client):
+    client.post("/auth/signup", json={"username": "cached", "email": "cached@example.com", "password": "password123"})
+    client.post("/leaderboard", json={"score": 10, "mode": "walls"})
+    response_cache.reset_stats()
+
+    first = client.get("/leaderboard?mode=walls&limit=1")
+    second = client.get("/leaderboard?mode=walls&limit=1")
+    assert second.json() == first.json()
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    client.post("/leaderboard", json={"score": 30, "mode": "walls"})
+    assert [e["score"] for e in client.get("/leaderboard?mode=walls&limit=1").json()] == [30]
+
+    stats = client.get("/cache/stats").json()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_sqlite_invalidation_from_write_paths_does_not_wait():
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    cache = SQLiteCache(path, ttl=60)
+    key = cache_key(LEADERBOARD, GameModeEnum.WALLS, 20)
+    cache.set(key, b"[1]")
+
+    cache.invalidate_in_background(LEADERBOARD, [GameModeEnum.WALLS])
+    cache.close()  # Waits for the background deletes
+    assert cache.get(key) is None
+    assert cache.stats()["invalidations"] == 1
+    cache.close()
@@ -0,0 +1,65 @@
+from app.content_versions import ContentVersions, etag_matches, LEADERBOARD
+from app.shared_state import COUNTER_NAMES, SharedCounters
+from app.database import create_active_player, delete_active_player
+from app.db_models import GameModeEnum, UserModel
+from app.models import GameMode
+
+
+def test_etags_follow_per_mode_versions():
+    versions = ContentVersions(SharedCounters(COUNTER_NAMES))
+    walls = versions.etag(LEADERBOARD, GameModeEnum.WALLS)
+    overall = versions.etag(LEADERBOARD)
+
+    versions.bump(LEADERBOARD, [GameModeEnum.PASS_THROUGH])
+    assert versions.etag(LEADERBOARD, GameModeEnum.WALLS) == walls
+    assert versions.etag(LEADERBOARD) != overall
+    assert versions.etag(LEADERBOARD, GameModeEnum.WALLS, 50) != walls
+
+    assert etag_matches(f'"other", W/{walls}', walls)
+    assert etag_matches("*", walls)
+    assert not etag_matches(None, walls)
+
+
+def test_leaderboard_conditional_get(client):
+    client.post("/auth/signup", json={"username": "poller", "email": "poller@example.com", "password": "password123"})
+    client.post("/leaderboard", json={"score": 10, "mode": "walls"})
+
+    first = client.get("/leaderboard?mode=walls")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "no-cache"
+
+    cached = client.get("/leaderboard?mode=walls", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    # Another mode's scores leave this board's ETag alone
+    client.post("/leaderboard", json={"score": 20, "mode": "pass-through"})
+    assert client.get("/leaderboard?mode=walls", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/leaderboard?mode=walls&limit=5", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/leaderboard", json={"score": 30, "mode": "walls"})
+    changed = client.get("/leaderboard?mode=walls", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert [e["score"] for e in changed.json()] == [30, 10]
+
+
+def test_active_players_conditional_get(client, db_session):
+    user = UserModel(username="watched", email="watched@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+
+    etag = client.get("/spectator/active").headers["ETag"]
+    assert client.get("/spectator/active", headers={"If-None-Match": etag}).status_code == 304
+
+    player = create_active_player(db_session, user.id, user.username, 0, GameMode.WALLS, {
+        "snake": [], "score": 0, "food": {"x": 1, "y": 1}, "direction": "UP",
+        "status": "playing", "mode": "walls", "speed": 150,
+    })
+    response = client.get("/spectator/active", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [p["username"] for p in response.json()] == ["watched"]
+
+    etag = response.headers["ETag"]
+    delete_active_player(db_session, player.id)
+    assert client.get("/spectator/active", headers={"If-None-Match": etag}).status_code == 200
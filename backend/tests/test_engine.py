@@ -0,0 +1,100 @@
+import random
+
+import numpy as np
+
+from app.engine.batch import BatchEngine, DIRECTIONS, GAME_OVER, NO_CHANGE
+from app.engine.rules import create_initial_state, generate_food, move_snake
+from app.models import Direction, GameMode, GameState, GameStatus, Position
+
+
+def _playing(snake, direction="RIGHT", mode="walls", food=(0, 0), score=0, speed=150):
+    return GameState(
+        snake=[{"x": x, "y": y} for x, y in snake],
+        food={"x": food[0], "y": food[1]},
+        direction=direction, score=score, status="playing", mode=mode, speed=speed
+    )
+
+
+def test_move_snake_matches_frontend_rules():
+    # Plain move
+    state = move_snake(_playing([(10, 10), (9, 10), (8, 10)]))
+    assert [(p.x, p.y) for p in state.snake] == [(11, 10), (10, 10), (9, 10)]
+
+    # Reversing is ignored
+    state = move_snake(_playing([(10, 10), (9, 10)]), Direction.LEFT)
+    assert state.direction == Direction.RIGHT
+
+    # Walls mode: leaving the board ends the game without moving
+    state = move_snake(_playing([(19, 5), (18, 5)]))
+    assert state.status == GameStatus.GAME_OVER
+    assert [(p.x, p.y) for p in state.snake] == [(19, 5), (18, 5)]
+
+    # Pass-through mode wraps around
+    state = move_snake(_playing([(19, 5), (18, 5)], mode="pass-through"))
+    assert (state.snake[0].x, state.snake[0].y) == (0, 5)
+
+    # Eating grows the snake, scores and speeds up
+    state = move_snake(_playing([(10, 10), (9, 10)], food=(11, 10)), rng=random.Random(1))
+    assert len(state.snake) == 3
+    assert (state.score, state.speed) == (10, 148)
+    assert (state.food.x, state.food.y) not in {(p.x, p.y) for p in state.snake}
+
+    # Chasing the tail is allowed because the tail moves away
+    state = move_snake(_playing([(1, 1), (2, 1), (2, 2), (1, 2)], direction="DOWN"))
+    assert state.status == GameStatus.PLAYING
+
+
+def test_generate_food_avoids_snake():
+    rng = random.Random(7)
+    snake = [Position(x=x, y=y) for x in range(20) for y in range(20) if (x, y) != (4, 4)]
+    assert generate_food(snake, rng) == Position(x=4, y=4)
+
+
+def test_initial_state():
+    state = create_initial_state(GameMode.PASS_THROUGH, random.Random(3))
+    assert state.status == GameStatus.IDLE
+    assert [(p.x, p.y) for p in state.snake] == [(10, 10), (9, 10), (8, 10)]
+
+
+def test_batch_engine_matches_scalar_rules():
+    n_games, ticks = 24, 150
+    modes = [GameMode.WALLS if i % 2 else GameMode.PASS_THROUGH for i in range(n_games)]
+    engine = BatchEngine(n_games, modes=modes, seed=42)
+    rng = np.random.default_rng(0)
+
+    def toward_food(state):
+        head, food = state.snake[0], state.food
+        if food.x != head.x:
+            return Direction.RIGHT if food.x > head.x else Direction.LEFT
+        return Direction.DOWN if food.y > head.y else Direction.UP
+
+    states = [engine.to_game_state(game) for game in range(n_games)]
+    for _ in range(ticks):
+        # Mostly steer towards the food so games grow, with random turns mixed in
+        codes = rng.integers(-1, 4, size=n_games).astype(np.int8)
+        for game, state in enumerate(states):
+            if rng.random() < 0.7:
+                codes[game] = DIRECTIONS.index(toward_food(state))
+        engine.step(codes)
+
+        for game in range(n_games):
+            direction = None if codes[game] == NO_CHANGE else DIRECTIONS[codes[game]]
+            # The batch engine's food draw stands in for the scalar one
+            expected = move_snake(
+                states[game], direction, food_generator=lambda _: engine.to_game_state(game).food
+            )
+            actual = engine.to_game_state(game)
+            assert actual.model_dump() == expected.model_dump()
+            states[game] = actual
+
+    assert (engine.status == GAME_OVER).any()
+    assert (engine.score >= 50).any()
+
+
+def test_batch_engine_load_round_trip():
+    engine = BatchEngine(2, seed=1)
+    state = _playing([(5, 5), (5, 6), (6, 6)], direction="UP", mode="pass-through", food=(9, 9), score=30)
+    engine.load(1, state)
+
+    assert engine.to_game_state(1).model_dump() == state.model_dump()
+    assert engine.occupied[1].sum() == 3
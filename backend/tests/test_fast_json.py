@@ -0,0 +1,40 @@
+import json
+from datetime import datetime
+
+from app.database import (
+    leaderboard_model_to_dict, leaderboard_model_to_pydantic, ranked_player_to_dict, ranked_player_to_pydantic
+)
+from app.db_models import EntryStatusEnum, GameModeEnum, LeaderboardEntryModel
+from app.fast_json import FastJSONResponse, dumps
+from app.live_games import LiveGame
+from app.models import GameMode, GameState
+from app.rank_index import RankedPlayer
+
+
+def test_trusted_converters_match_the_response_models():
+    entry = LeaderboardEntryModel(
+        id=7, user_id=1, username="fast", score=120, mode=GameModeEnum.WALLS,
+        status=EntryStatusEnum.VERIFIED, created_at=datetime(2026, 3, 1, 12, 30)
+    )
+    assert json.loads(dumps([leaderboard_model_to_dict(entry)])) == [
+        leaderboard_model_to_pydantic(entry).model_dump(mode="json")
+    ]
+
+    player = RankedPlayer(1, "fast", 120, 7, EntryStatusEnum.VERIFIED, datetime(2026, 3, 1))
+    assert json.loads(dumps(ranked_player_to_dict(player, GameMode.WALLS, 3))) == (
+        ranked_player_to_pydantic(player, GameMode.WALLS, 3).model_dump(mode="json")
+    )
+
+    game = LiveGame(4, 1, "fast", GameMode.PASS_THROUGH)
+    game.apply(30, GameState(
+        snake=[{"x": 3, "y": 2}, {"x": 2, "y": 2}], food={"x": 19, "y": 0}, direction="RIGHT",
+        score=30, status="playing", mode="pass-through", speed=140
+    ), datetime.utcnow())
+    assert json.loads(dumps(game.to_dict())) == game.to_active_player().model_dump(mode="json")
+
+
+def test_fast_json_response_encodes_models_too():
+    response = FastJSONResponse({"state": GameState(
+        snake=[], food={"x": 1, "y": 1}, direction="UP", score=0, status="idle", mode="walls", speed=150
+    )})
+    assert json.loads(response.body)["state"]["food"] == {"x": 1, "y": 1}
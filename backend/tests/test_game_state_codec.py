@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.database import get_active_player, repack_active_player_game_states
+from app.db_models import UserModel
+from app.game_state_codec import decode_game_state, encode_game_state, is_legacy_json
+from app.models import GameState
+
+
+def _state(length=3):
+    return GameState(
+        snake=[{"x": 19 - i, "y": 7} for i in range(length)],
+        food={"x": 0, "y": 19},
+        direction="LEFT",
+        score=1230,
+        status="paused",
+        mode="pass-through",
+        speed=88
+    )
+
+
+def test_round_trip():
+    state = _state(length=20)
+    encoded = encode_game_state(state)
+
+    assert len(encoded) == 12 + 2 * 20
+    assert decode_game_state(encoded).model_dump() == state.model_dump()
+
+
+def test_encode_accepts_dicts_and_rejects_off_grid_positions():
+    state = _state()
+    assert encode_game_state(state.model_dump(mode="json")) == encode_game_state(state)
+
+    off_grid = state.model_dump(mode="json")
+    off_grid["snake"][0] = {"x": 20, "y": 0}
+    with pytest.raises(ValueError):
+        encode_game_state(off_grid)
+
+
+def test_legacy_json_rows_are_read_and_repacked(db_session):
+    user = UserModel(username="legacy", email="legacy@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+
+    state = _state()
+    db_session.execute(
+        text(
+            "INSERT INTO active_players (user_id, username, score, mode, game_state, created_at, updated_at) "
+            "VALUES (:user_id, 'legacy', 0, 'WALLS', :state, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+        ),
+        {"user_id": user.id, "state": json.dumps(state.model_dump(mode="json"))}
+    )
+    db_session.commit()
+
+    player_id = db_session.execute(text("SELECT id FROM active_players")).scalar()
+    assert get_active_player(db_session, player_id).game_state.model_dump() == state.model_dump()
+
+    assert repack_active_player_game_states(db_session) == 1
+    raw = db_session.execute(text("SELECT game_state FROM active_players")).scalar()
+    assert not is_legacy_json(raw)
+    assert repack_active_player_game_states(db_session) == 0
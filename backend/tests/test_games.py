@@ -0,0 +1,110 @@
+from app.db_models import ActivePlayerModel, LeaderboardEntryModel
+
+
+def game_state(head_x, score=0):
+    return {
+        "snake": [{"x": head_x, "y": 1}, {"x": head_x - 1, "y": 1}], "score": score,
+        "food": {"x": 5, "y": 5}, "direction": "RIGHT", "status": "playing", "mode": "walls", "speed": 150,
+    }
+
+
+def sign_up(client, username):
+    client.post("/auth/signup", json={"username": username, "email": f"{username}@example.com", "password": "password123"})
+
+
+def test_game_session_lifecycle(client, db_session):
+    sign_up(client, "runner")
+    started = client.post("/games", json={"mode": "walls", "gameState": game_state(2)})
+    assert started.status_code == 201
+    game_id = started.json()["id"]
+
+    ticks = [game_state(x, score=10 * (x - 2)) for x in range(3, 8)]
+    assert client.post(f"/games/{game_id}/ticks", json={"ticks": ticks}).json() is True
+
+    # Spectators see the end of the batch before anything is written
+    players = client.get("/spectator/active").json()
+    assert [(p["id"], p["score"]) for p in players] == [(game_id, 50)]
+    assert db_session.query(ActivePlayerModel).one().score == 0
+
+    ended = client.post(f"/games/{game_id}/end", json={"score": 50})
+    assert ended.status_code == 200
+    assert ended.json()["score"] == 50
+    assert client.get("/spectator/active").json() == []
+    assert [e["score"] for e in client.get("/leaderboard?mode=walls").json()] == [50]
+
+    db_session.expire_all()
+    assert db_session.query(ActivePlayerModel).count() == 0
+    assert client.post(f"/games/{game_id}/end", json={"score": 50}).status_code == 404
+
+
+def test_games_belong_to_their_player(client, db_session):
+    sign_up(client, "owner")
+    game_id = client.post("/games", json={"mode": "walls", "gameState": game_state(2)}).json()["id"]
+
+    sign_up(client, "intruder")
+    assert client.post(f"/games/{game_id}/ticks", json={"ticks": [game_state(3)]}).status_code == 404
+    assert client.post(f"/games/{game_id}/end", json={"score": 999}).status_code == 404
+    assert client.post("/games/nope/end", json={"score": 1}).status_code == 404
+
+
+def test_game_session_validation(client, db_session):
+    sign_up(client, "careless")
+    assert client.post("/games", json={"mode": "walls", "gameState": game_state(25)}).status_code == 400
+    mismatched = client.post("/games", json={"mode": "pass-through", "gameState": game_state(2)})
+    assert mismatched.status_code == 400
+    assert "mode" in mismatched.json()["detail"]
+
+    game_id = client.post("/games", json={"mode": "walls", "gameState": game_state(2)}).json()["id"]
+    assert client.post(f"/games/{game_id}/ticks", json={"ticks": []}).status_code == 422
+    assert client.post(f"/games/{game_id}/ticks", json={"ticks": [game_state(30)]}).status_code == 400
+
+    # A game ending at zero leaves no entry
+    ended = client.post(f"/games/{game_id}/end", json={"score": 0})
+    assert ended.status_code == 200
+    assert ended.json() is None
+    assert db_session.query(LeaderboardEntryModel).filter_by(username="careless").count() == 0
+
+
+def test_starting_a_game_requires_login(client):
+    assert client.post("/games", json={"mode": "walls", "gameState": game_state(2)}).status_code == 401
+
+
+def test_patches_apply_in_sequence(client, db_session):
+    sign_up(client, "patcher")
+    game_id = client.post("/games", json={"mode": "walls", "gameState": game_state(2)}).json()["id"]
+    url = f"/games/{game_id}/patches"
+
+    patches = [
+        {"seq": 1, "head": [[3, 1]], "drop": 1},
+        {"seq": 2, "head": [[4, 1]], "score": 10, "food": [8, 8]},
+    ]
+    assert client.post(url, json={"patches": patches}).json() is True
+    state = client.get(f"/spectator/player/{game_id}").json()
+    assert [(p["x"], p["y"]) for p in state["snake"]] == [(4, 1), (3, 1), (2, 1)]
+    assert (state["score"], state["food"]) == (10, {"x": 8, "y": 8})
+
+    # Out of order, or not continuing the snake: the client must resync
+    for patch in ({"seq": 5, "head": [[5, 1]], "drop": 1}, {"seq": 3, "head": [[9, 9]], "drop": 1}):
+        rejected = client.post(url, json={"patches": [patch]})
+        assert rejected.status_code == 409
+        assert rejected.json()["detail"]["seq"] == 2
+    assert client.get(f"/spectator/player/{game_id}").json() == state
+
+    # A snapshot resets the base the patches continue from
+    ticks = f"/games/{game_id}/ticks"
+    assert client.post(ticks, json={"ticks": [game_state(10)], "seq": 2}).status_code == 409
+    assert client.post(ticks, json={"ticks": [game_state(10)], "seq": 3}).json() is True
+    assert client.post(url, json={"patches": [{"seq": 4, "head": [[11, 1]], "drop": 1}]}).json() is True
+    assert client.get(f"/spectator/player/{game_id}").json()["snake"][0] == {"x": 11, "y": 1}
+
+
+def test_patches_need_the_game_in_memory(client, db_session):
+    from app.live_games import live_games
+
+    sign_up(client, "restarted")
+    game_id = client.post("/games", json={"mode": "walls", "gameState": game_state(2)}).json()["id"]
+    live_games.finish(int(game_id))
+
+    rejected = client.post(f"/games/{game_id}/patches", json={"patches": [{"seq": 1, "head": [[3, 1]], "drop": 1}]})
+    assert rejected.status_code == 409
+    assert rejected.json()["detail"]["seq"] is None
@@ -0,0 +1,117 @@
+import multiprocessing
+
+from app.database import get_player_rank, get_top_leaderboard, rebuild_leaderboard_index
+from app.db_models import GameModeEnum, LeaderboardEntryModel, UserModel
+from app.index_sync import APPENDS, RESETS, index_sync
+from app.models import GameMode
+from app.shared_state import COUNTER_NAMES, SharedCounters, shared_counters
+
+
+def _bump(counters, times):
+    for _ in range(times):
+        counters.increment("index_appends")
+
+
+def test_counters_are_shared_with_forked_workers():
+    counters = SharedCounters(COUNTER_NAMES)
+    workers = [
+        multiprocessing.get_context("fork").Process(target=_bump, args=(counters, 200))
+        for _ in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    _bump(counters, 200)
+    for worker in workers:
+        worker.join()
+    assert counters.get("index_appends") == 800
+
+
+def test_worker_catches_up_on_other_workers_writes(db_session, monkeypatch):
+    user = UserModel(username="elsewhere", email="elsewhere@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    rebuild_leaderboard_index(db_session)
+    monkeypatch.setattr(index_sync, "interval", 0)
+
+    # Another worker commits an entry and publishes it
+    db_session.add(LeaderboardEntryModel(
+        user_id=user.id, username=user.username, score=70, mode=GameModeEnum.WALLS
+    ))
+    db_session.commit()
+    assert not index_sync.due()
+    shared_counters.increment(APPENDS)
+    assert index_sync.due()
+
+    assert [entry.score for entry in get_top_leaderboard(db_session, GameMode.WALLS, 5)] == [70]
+    assert get_player_rank(db_session, user.id, GameMode.WALLS)[0] == 1
+    assert not index_sync.due()
+
+    # ... then clears the leaderboard
+    db_session.query(LeaderboardEntryModel).delete()
+    db_session.commit()
+    shared_counters.increment(RESETS)
+    assert get_top_leaderboard(db_session, GameMode.WALLS, 5) == []
+
+
+def test_catch_up_streams_in_batches(db_session, async_session_factory, monkeypatch):
+    import asyncio
+    from app.config import settings
+    from app.database import get_leaderboard
+    from app.leaderboard_index import leaderboard_index
+
+    user = UserModel(username="streamed", email="streamed@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    rebuild_leaderboard_index(db_session)
+    monkeypatch.setattr(index_sync, "interval", 0)
+    monkeypatch.setattr(settings, "DB_YIELD_PER", 2)
+
+    db_session.add_all([
+        LeaderboardEntryModel(user_id=user.id, username=user.username, score=score, mode=GameModeEnum.WALLS)
+        for score in (10, 50, 30, 40, 20)
+    ])
+    db_session.commit()
+    shared_counters.increment(APPENDS)
+
+    async def sync():
+        async with async_session_factory() as db:
+            await db.run_sync(index_sync.sync)
+
+    asyncio.run(sync())
+    assert [entry.score for entry in leaderboard_index.top(GameModeEnum.WALLS, 5)] == [50, 40, 30, 20, 10]
+
+    # Reads return plain rows and leave the session's identity map empty
+    db_session.expunge_all()
+    rows = get_leaderboard(db_session, GameMode.WALLS, 2)
+    assert [(row.username, row.score) for row in rows] == [("streamed", 50), ("streamed", 40)]
+    assert not isinstance(rows[0], LeaderboardEntryModel)
+    assert len(db_session.identity_map) == 0
+
+
+def test_outside_process_requests_a_reload(db_session, tmp_path, monkeypatch):
+    from app.content_versions import content_versions, LEADERBOARD
+    from app.index_reload import IndexReloadWatcher, request_reload
+
+    user = UserModel(username="offline", email="offline@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    rebuild_leaderboard_index(db_session)
+    monkeypatch.setattr(index_sync, "interval", 0)
+    watcher = IndexReloadWatcher(str(tmp_path / "reload"), interval=0)
+    assert not watcher.check()
+
+    # A maintenance command edits the table without touching the counters
+    db_session.add(LeaderboardEntryModel(
+        user_id=user.id, username=user.username, score=40, mode=GameModeEnum.PASS_THROUGH
+    ))
+    db_session.commit()
+    assert not index_sync.due()
+    version = content_versions.get(LEADERBOARD, GameModeEnum.PASS_THROUGH)
+    request_reload(str(tmp_path / "reload"))
+
+    assert watcher.check()
+    assert not watcher.check()
+    assert index_sync.due()
+    assert content_versions.get(LEADERBOARD, GameModeEnum.PASS_THROUGH) != version
+    assert [entry.score for entry in get_top_leaderboard(db_session, GameMode.PASS_THROUGH, 5)] == [40]
+    assert not index_sync.due()
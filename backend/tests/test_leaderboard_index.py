@@ -0,0 +1,58 @@
+from app.database import create_leaderboard_entry, clear_leaderboard, get_top_leaderboard
+from app.db_models import LeaderboardEntryModel, UserModel, GameModeEnum
+from app.leaderboard_index import LeaderboardIndex
+from app.models import GameMode
+
+
+def _seed_user(db_session):
+    user = UserModel(username="indexed", email="indexed@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_index_keeps_top_k_per_mode(db_session):
+    user = _seed_user(db_session)
+    index = LeaderboardIndex(capacity=3)
+    index.rebuild(db_session)
+
+    for score in [10, 50, 30, 40, 20]:
+        entry = LeaderboardEntryModel(
+            user_id=user.id, username=user.username, score=score, mode=GameModeEnum.WALLS
+        )
+        db_session.add(entry)
+        db_session.commit()
+        index.add(entry)
+
+    assert [e.score for e in index.top(GameModeEnum.WALLS)] == [50, 40, 30]
+    assert [e.score for e in index.top()] == [50, 40, 30]
+    assert index.top(GameModeEnum.PASS_THROUGH) == []
+
+
+def test_index_rebuild_picks_up_external_changes(db_session):
+    user = _seed_user(db_session)
+    index = LeaderboardIndex(capacity=5)
+    index.rebuild(db_session)
+
+    # Written behind the app's back
+    db_session.add(LeaderboardEntryModel(
+        user_id=user.id, username=user.username, score=999, mode=GameModeEnum.PASS_THROUGH
+    ))
+    db_session.commit()
+    assert index.top() == []
+
+    index.rebuild(db_session)
+    assert [e.score for e in index.top()] == [999]
+
+
+def test_write_through_from_create_and_clear(client, db_session):
+    user = _seed_user(db_session)
+
+    create_leaderboard_entry(db_session, user.id, user.username, 300, GameMode.WALLS)
+    create_leaderboard_entry(db_session, user.id, user.username, 700, GameMode.PASS_THROUGH)
+
+    assert [e.score for e in get_top_leaderboard(db_session)] == [700, 300]
+    assert [e.score for e in get_top_leaderboard(db_session, mode=GameMode.WALLS)] == [300]
+
+    clear_leaderboard(db_session)
+    assert get_top_leaderboard(db_session) == []
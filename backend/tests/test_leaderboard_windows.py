@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from app.config import settings
+from app.database import (
+    create_leaderboard_entries, get_window_leaderboard, rebuild_window_scores, rotate_window_scores
+)
+from app.db_models import GameModeEnum, LeaderboardWindowScoreModel, UserModel
+from app.leaderboard_windows import configured_season, open_spans, window_span
+from app.models import LeaderboardWindow
+
+
+def test_window_spans(monkeypatch):
+    at = datetime(2024, 12, 31, 23, 59)
+    assert window_span(LeaderboardWindow.DAY, at).key == "day:2024-12-31"
+    week = window_span(LeaderboardWindow.WEEK, at)
+    assert (week.key, week.start) == ("week:2025-W01", datetime(2024, 12, 30))
+
+    assert window_span(LeaderboardWindow.SEASON, at) is None
+    monkeypatch.setattr(settings, "LEADERBOARD_SEASON", "winter")
+    monkeypatch.setattr(settings, "LEADERBOARD_SEASON_START", "2024-12-01")
+    monkeypatch.setattr(settings, "LEADERBOARD_SEASON_END", "2025-03-01")
+    assert window_span(LeaderboardWindow.SEASON, at).key == "season:winter"
+    assert window_span(LeaderboardWindow.SEASON, datetime(2025, 3, 1)) is None
+
+
+def test_bad_season_config_is_ignored(monkeypatch):
+    at = datetime(2025, 1, 15)
+    monkeypatch.setattr(settings, "LEADERBOARD_SEASON", "winter")
+    monkeypatch.setattr(settings, "LEADERBOARD_SEASON_START", "2024-12-01T00:00:00+01:00")
+    monkeypatch.setattr(settings, "LEADERBOARD_SEASON_END", "2025-03-01T00:00:00Z")
+    assert window_span(LeaderboardWindow.SEASON, at).start == datetime(2024, 11, 30, 23)
+    assert configured_season() is configured_season()  # Parsed once
+
+    for start, end in (("", "2025-03-01"), ("december", "2025-03-01"), ("2025-03-01", "2024-12-01")):
+        monkeypatch.setattr(settings, "LEADERBOARD_SEASON_START", start)
+        monkeypatch.setattr(settings, "LEADERBOARD_SEASON_END", end)
+        assert configured_season() is None
+        assert [span.key[:4] for span in open_spans(at)] == ["day:", "week"]
+
+
+def test_window_rollups(db_session):
+    alice = UserModel(username="daily", email="daily@test.com", password_hash="hash")
+    bob = UserModel(username="weekly", email="weekly@test.com", password_hash="hash")
+    db_session.add_all([alice, bob])
+    db_session.commit()
+
+    def row(user, score, created_at):
+        return {
+            "user_id": user.id, "username": user.username, "score": score,
+            "mode": GameModeEnum.WALLS, "created_at": created_at,
+        }
+
+    create_leaderboard_entries(db_session, [
+        row(alice, 50, datetime(2024, 5, 8, 9)),   # Wednesday
+        row(alice, 80, datetime(2024, 5, 8, 18)),
+        row(bob, 300, datetime(2024, 5, 6, 12)),   # Monday, same week
+        row(bob, 999, datetime(2024, 4, 1, 12)),   # Long ago
+    ])
+
+    now = datetime(2024, 5, 8, 20)
+    day = get_window_leaderboard(db_session, LeaderboardWindow.DAY, now=now)
+    assert [(r.username, r.score) for r in day] == [("daily", 80)]
+    week = get_window_leaderboard(db_session, LeaderboardWindow.WEEK, now=now)
+    assert [(r.username, r.score) for r in week] == [("weekly", 300), ("daily", 80)]
+
+    # Rebuilding the open windows from the entries gives the same boards
+    assert rebuild_window_scores(db_session, now=now) == 3
+    assert [r.score for r in get_window_leaderboard(db_session, LeaderboardWindow.WEEK, now=now)] == [300, 80]
+
+    # Rotation drops windows closed longer than the retention period
+    rotate_window_scores(db_session, now=now)
+    db_session.commit()
+    keys = {r.window_key for r in db_session.query(LeaderboardWindowScoreModel).all()}
+    assert "day:2024-04-01" not in keys
+    assert "day:2024-05-08" in keys
+
+
+def test_windowed_leaderboard_endpoint(client):
+    client.post("/auth/signup", json={"username": "today", "email": "today@example.com", "password": "password123"})
+    for score in (120, 90):
+        client.post("/leaderboard", json={"score": score, "mode": "pass-through"})
+
+    response = client.get("/leaderboard?window=day&mode=pass-through")
+    assert response.status_code == 200
+    assert [(e["username"], e["score"]) for e in response.json()] == [("today", 120)]
+
+    assert client.get("/leaderboard?window=season").status_code == 404
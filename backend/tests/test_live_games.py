@@ -0,0 +1,136 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app.database import create_active_player, get_active_player, save_live_games
+from app.content_versions import content_versions, ACTIVE_PLAYERS
+from app.db_models import GameModeEnum, UserModel
+from app.game_state_codec import decode_game_state, encode_game_state
+from app.live_games import LiveGameStore, live_games, record_game_state
+from app.models import GameMode
+
+
+def game_state(snake, score=0, status="playing"):
+    return {
+        "snake": [{"x": x, "y": y} for x, y in snake], "score": score, "food": {"x": 5, "y": 5},
+        "direction": "RIGHT", "status": status, "mode": "walls", "speed": 150,
+    }
+
+
+def start_game(db_session, username="live"):
+    user = UserModel(username=username, email=f"{username}@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    return create_active_player(db_session, user.id, user.username, 0, GameMode.WALLS, game_state([(2, 1), (1, 1)]))
+
+
+def test_ticks_are_coalesced_into_one_write(db_session, async_session_factory):
+    player = start_game(db_session)
+    store = LiveGameStore(flush_interval=60)
+    store._session_factory = async_session_factory
+    game = store.track(player)
+    assert game.dirty is False
+
+    for x in range(3, 6):
+        store.update(player.id, x * 10, game_state([(x, 1), (x - 1, 1)], score=x * 10))
+
+    # Nothing reaches the database until the flush
+    db_session.expire_all()
+    assert get_active_player(db_session, player.id).score == 0
+    assert store.players()[0].gameState.snake[0].x == 5
+
+    versions = {mode: content_versions.get(ACTIVE_PLAYERS, mode) for mode in GameModeEnum}
+    assert asyncio.run(store.flush()) == 1
+    assert asyncio.run(store.flush()) == 0
+    # Only the mode that changed gets a new version
+    assert content_versions.get(ACTIVE_PLAYERS, GameModeEnum.WALLS) != versions[GameModeEnum.WALLS]
+    assert content_versions.get(ACTIVE_PLAYERS, GameModeEnum.PASS_THROUGH) == versions[GameModeEnum.PASS_THROUGH]
+    db_session.expire_all()
+    stored = get_active_player(db_session, player.id)
+    assert stored.score == 50
+    assert stored.game_state == decode_game_state(encode_game_state(game_state([(5, 1), (4, 1)], score=50)))
+
+
+def test_older_state_does_not_overwrite_newer_row(db_session):
+    player = start_game(db_session)
+    row = {
+        "player_id": player.id, "mode": "walls", "score": 99,
+        "game_state": encode_game_state(game_state([(9, 9)], score=99)),
+        "updated_at": player.updated_at - timedelta(seconds=1),
+    }
+    version = content_versions.get(ACTIVE_PLAYERS, GameModeEnum.WALLS)
+    assert save_live_games(db_session, [row]) == 0
+    assert content_versions.get(ACTIVE_PLAYERS, GameModeEnum.WALLS) == version
+    assert get_active_player(db_session, player.id).score == 0
+
+
+def test_spectators_read_the_store(client, db_session):
+    player = start_game(db_session, "watched_live")
+    live_games.track(player)
+    etag = client.get("/spectator/active").headers["ETag"]
+
+    live_games.update(player.id, 30, game_state([(4, 1), (3, 1)], score=30))
+    response = client.get("/spectator/active", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["score"] == 30
+    assert client.get(f"/spectator/player/{player.id}").json()["snake"][0] == {"x": 4, "y": 1}
+
+    # Games that stop reporting expire from memory as well
+    assert live_games.expire(datetime.utcnow() + timedelta(hours=1)) == 1
+    assert live_games.finish(player.id) is None
+
+
+def test_updates_for_games_held_elsewhere_go_to_the_database(db_session, async_session_factory):
+    player = start_game(db_session)
+
+    async def record(player_id, user_id):
+        async with async_session_factory() as db:
+            return await record_game_state(db, player_id, user_id, 20, game_state([(3, 1), (2, 1)], score=20))
+
+    assert asyncio.run(record(player.id, player.user_id)) is True
+    assert asyncio.run(record(player.id, player.user_id + 1)) is False
+    assert asyncio.run(record(player.id + 1000, player.user_id)) is False
+    db_session.expire_all()
+    assert get_active_player(db_session, player.id).score == 20
+
+
+def test_patches_wrap_only_in_pass_through(db_session):
+    from app.live_games import LiveGame, PatchRejected
+    from app.models import GamePatch, GameState
+
+    for mode, allowed in ((GameMode.PASS_THROUGH, True), (GameMode.WALLS, False)):
+        game = LiveGame(1, 1, "wrapper", mode)
+        game.apply(0, GameState(**game_state([(0, 1), (1, 1)])), datetime.utcnow())
+        patch = GamePatch(seq=1, head=[(19, 1)], drop=1)
+        try:
+            game.apply_patch(patch, datetime.utcnow())
+        except PatchRejected:
+            assert not allowed
+            assert list(game.cells) == [20, 21]
+        else:
+            assert allowed
+            assert list(game.cells) == [39, 20]
+
+
+def test_store_lets_go_of_games_changed_through_other_workers(db_session, async_session_factory):
+    from app.database import delete_active_player, update_active_player
+
+    ended, moved = start_game(db_session, "ended_elsewhere"), start_game(db_session, "moved_elsewhere")
+    store = LiveGameStore(flush_interval=60)
+    store.track(ended)
+    store.track(moved)
+
+    async def refresh():
+        async with async_session_factory() as db:
+            await store.refresh(db)
+
+    asyncio.run(refresh())
+    assert store.held(ended.id) and store.held(moved.id)
+
+    # Another worker ends one game and receives a snapshot of the other
+    delete_active_player(db_session, ended.id)
+    update_active_player(db_session, moved.id, 70, encode_game_state(game_state([(7, 1), (6, 1)], score=70)))
+    asyncio.run(refresh())
+
+    assert store.held(ended.id) is None and store.get(ended.id) is None
+    assert store.held(moved.id) is None
+    assert store.get(moved.id).score == 70
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import msgpack
+
+from app.config import settings
+from app.db_models import ActivePlayerModel, GameModeEnum, UserModel
+from app.negotiation import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, _encoding, _media_type
+
+
+def test_accept_headers_pick_the_representation():
+    assert _media_type(None) == JSON_MEDIA_TYPE
+    assert _media_type("*/*") == JSON_MEDIA_TYPE
+    assert _media_type("application/msgpack") == MSGPACK_MEDIA_TYPE
+    assert _media_type("application/x-msgpack, */*") == MSGPACK_MEDIA_TYPE
+    assert _media_type("application/json, application/msgpack;q=0.5") == JSON_MEDIA_TYPE
+
+    assert _encoding(None) is None
+    assert _encoding("gzip, deflate") == "gzip"
+    assert _encoding("gzip;q=0, identity") is None
+    assert _encoding("*") is not None
+
+
+def _seed_game(db_session, snake_length):
+    user = UserModel(username="wide", email="wide@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    db_session.add(ActivePlayerModel(
+        user_id=user.id, username=user.username, score=0, mode=GameModeEnum.WALLS,
+        game_state={
+            "snake": [{"x": i % 20, "y": i // 20} for i in range(snake_length)],
+            "score": 0, "food": {"x": 19, "y": 19}, "direction": "RIGHT",
+            "status": "playing", "mode": "walls", "speed": 150
+        },
+        updated_at=datetime.utcnow()
+    ))
+    db_session.commit()
+
+
+def test_spectators_get_msgpack_and_compressed_bodies(client, db_session):
+    _seed_game(db_session, snake_length=200)
+
+    plain = client.get("/spectator/active", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["content-type"] == JSON_MEDIA_TYPE
+    assert "content-encoding" not in plain.headers
+    assert plain.headers["vary"].startswith("Accept, Accept-Encoding")
+
+    packed = client.get("/spectator/active", headers={"Accept": MSGPACK_MEDIA_TYPE, "Accept-Encoding": "identity"})
+    assert packed.headers["content-type"] == MSGPACK_MEDIA_TYPE
+    # The same document, with positions packed as [x, y]
+    [player] = plain.json()
+    state = player["gameState"]
+    assert msgpack.unpackb(packed.content) == [{**player, "gameState": {
+        **state,
+        "snake": [[cell["x"], cell["y"]] for cell in state["snake"]],
+        "food": [state["food"]["x"], state["food"]["y"]],
+    }}]
+    # 3 bytes per position rather than the 7 of a {"x", "y"} map
+    unpacked_size = len(msgpack.packb(plain.json()))
+    assert unpacked_size - len(packed.content) == 4 * (len(state["snake"]) + 1)
+    assert packed.headers["etag"] != plain.headers["etag"]
+    assert packed.headers["etag"] != plain.headers["etag"]
+
+    # Above the threshold the body is gzipped (httpx decodes it transparently)
+    for _ in range(2):  # Miss, then a cache hit with the same headers
+        zipped = client.get("/spectator/active", headers={"Accept-Encoding": "gzip"})
+        assert zipped.headers["content-encoding"] == "gzip"
+        assert int(zipped.headers["content-length"]) < len(zipped.content)
+        assert zipped.json() == plain.json()
+
+    # Revalidation keeps the representation's ETag
+    not_modified = client.get(
+        "/spectator/active", headers={"Accept-Encoding": "gzip", "If-None-Match": zipped.headers["etag"]}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.headers["vary"].startswith("Accept, Accept-Encoding")
+
+
+def test_small_bodies_are_not_compressed(client, db_session):
+    _seed_game(db_session, snake_length=1)
+    assert settings.COMPRESSION_MIN_BYTES > 200
+
+    response = client.get("/leaderboard", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.json() == []
@@ -0,0 +1,90 @@
+import random
+from datetime import datetime
+
+from app.db_models import EntryStatusEnum, GameModeEnum, LeaderboardEntryModel
+from app.rank_index import RankIndex, SortedKeyList
+
+
+def test_sorted_key_list_matches_sorted_list():
+    rng = random.Random(7)
+    keys = SortedKeyList(bucket_size=8)
+    expected = []
+    for i in range(500):
+        key = (-rng.randrange(100), i)
+        keys.add(key)
+        expected.append(key)
+        if i % 3 == 0:
+            victim = expected.pop(rng.randrange(len(expected)))
+            keys.remove(victim)
+    expected.sort()
+
+    assert len(keys) == len(expected)
+    assert keys.slice(0, len(keys)) == expected
+    assert keys.slice(40, 60) == expected[40:60]
+    for key in expected[::17]:
+        assert keys.index(key) == expected.index(key)
+
+
+def _entry(entry_id, user_id, score, status=EntryStatusEnum.UNVERIFIED):
+    return LeaderboardEntryModel(
+        id=entry_id, user_id=user_id, username=f"p{user_id}", score=score,
+        mode=GameModeEnum.WALLS, status=status, created_at=datetime(2024, 1, 1)
+    )
+
+
+def test_rank_index_keeps_personal_bests(db_session):
+    index = RankIndex(bucket_size=4)
+    index.rebuild(db_session)
+    index.add_many([_entry(i + 1, user_id, score) for i, (user_id, score) in enumerate(
+        [(1, 50), (2, 80), (3, 80), (1, 90), (4, 10), (2, 20)]
+    )])
+    index.add_many([_entry(99, 4, 1000, EntryStatusEnum.PENDING)])
+
+    # Player 2 beat player 3 to 80, so wins the tie
+    rank, total, player = index.rank(GameModeEnum.WALLS, 2)
+    assert (rank, total, player.score) == (2, 4, 80)
+    assert index.rank(GameModeEnum.WALLS, 1)[0] == 1
+    assert index.rank(GameModeEnum.WALLS, 4)[0] == 4
+    assert index.rank(GameModeEnum.PASS_THROUGH, 1) is None
+
+    first_rank, players = index.around(GameModeEnum.WALLS, 3, 1)
+    assert first_rank == 2
+    assert [player.user_id for player in players] == [2, 3, 4]
+
+
+def test_rank_and_around_endpoints(client):
+    for name, score in (("top", 300), ("mid", 200), ("low", 100)):
+        client.post("/auth/signup", json={"username": name, "email": f"{name}@example.com", "password": "password123"})
+        client.post("/leaderboard", json={"score": score, "mode": "walls"})
+
+    # Without a username, the current user ("low") is ranked
+    response = client.get("/leaderboard/rank?mode=walls")
+    assert response.status_code == 200
+    assert response.json() == {
+        "username": "low", "mode": "walls", "score": 100, "rank": 3, "totalPlayers": 3, "percentile": 33.33
+    }
+    assert client.get("/leaderboard/rank?mode=walls&username=top").json()["rank"] == 1
+    assert client.get("/leaderboard/rank?mode=pass-through").status_code == 404
+    assert client.get("/leaderboard/rank?mode=walls&username=nobody").status_code == 404
+
+    around = client.get("/leaderboard/around?mode=walls&username=mid&k=1").json()
+    assert [(e["username"], e["rank"]) for e in around] == [("top", 1), ("mid", 2), ("low", 3)]
+
+
+def test_leaderboard_cursor_pagination(client):
+    client.post("/auth/signup", json={"username": "pager", "email": "pager@example.com", "password": "password123"})
+    for score in (50, 40, 40, 30, 20):
+        client.post("/leaderboard", json={"score": score, "mode": "walls"})
+
+    pages, cursor = [], None
+    while True:
+        url = "/leaderboard?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url)
+        pages.append([e["score"] for e in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == [[50, 40], [40, 30], [20]]
+    assert client.get("/leaderboard?cursor=not-a-cursor").status_code == 400
+    assert client.get(f"/leaderboard?window=day&cursor={cursor or 'x'}").status_code == 400
@@ -0,0 +1,142 @@
+from app.engine.prng import food_rng
+from app.engine.rules import create_initial_state
+from app.models import Direction, GameMode, GameStatus
+from app.replay import ReplayReader, build_replay
+
+
+def _inputs():
+    # Zig-zag across the board so the game runs for a while in walls mode
+    turns = [Direction.DOWN, Direction.RIGHT, Direction.UP, Direction.RIGHT]
+    return [(tick, turns[(tick // 4) % 4]) for tick in range(0, 60, 4)]
+
+
+def test_mulberry32_matches_javascript():
+    rng = food_rng(12345, 3)
+    assert [rng.random() for _ in range(3)] == [
+        0.5033922765869647, 0.03756509954109788, 0.6600666732992977
+    ]
+
+
+def test_replay_round_trip_and_seek():
+    initial = create_initial_state(GameMode.PASS_THROUGH)
+    game, data = build_replay(7, initial, _inputs(), 200, keyframe_interval=32)
+
+    assert game.tick_count == 200
+    reader = ReplayReader(data)
+    assert (reader.seed, reader.mode) == (7, GameMode.PASS_THROUGH)
+    assert reader.keyframe_ticks == list(range(0, 200, 32))
+
+    # Reading everything gives back the uploaded inputs
+    _, keyframe, inputs, _ = reader.read_range(0, 200)
+    assert inputs == _inputs()
+    assert keyframe.status == GameStatus.PLAYING
+
+    # Seeking starts from the keyframe at or before the requested tick
+    keyframe_tick, keyframe, inputs, _ = reader.read_range(40, 50)
+    assert keyframe_tick == 32
+    assert all(32 <= tick < 50 for tick, _ in inputs)
+
+
+def test_upload_and_read_replay(client):
+    client.post("/auth/signup", json={"username": "player", "email": "player@example.com", "password": "password123"})
+    client.post("/leaderboard", json={"score": 0, "mode": "pass-through", "durable": True})
+    entry_id = client.get("/leaderboard").json()[0]["id"]
+
+    initial = create_initial_state(GameMode.PASS_THROUGH)
+    upload = {
+        "entryId": entry_id,
+        "seed": 7,
+        "tickCount": 100,
+        "initialState": initial.model_dump(mode="json"),
+        "inputs": [{"tick": tick, "direction": d.value} for tick, d in _inputs()],
+    }
+    response = client.post("/replays", json=upload)
+    assert response.status_code == 200
+    info = response.json()
+    assert info["tickCount"] == 100
+    assert info["keyframeTicks"][0] == 0
+
+    # One replay per entry
+    assert client.post("/replays", json=upload).status_code == 409
+
+    response = client.get(f"/replays/{entry_id}/range?from_tick=10&to_tick=20")
+    assert response.status_code == 200
+    assert response.json()["keyframeTick"] == 0
+
+    response = client.get(f"/replays/{entry_id}/raw")
+    assert response.content.startswith(b"SGRP")
+
+    assert client.get("/replays/999999").status_code == 404
+
+
+def test_upload_rejects_invalid_initial_state(client):
+    client.post("/auth/signup", json={"username": "player", "email": "player@example.com", "password": "password123"})
+    client.post("/leaderboard", json={"score": 0, "mode": "walls", "durable": True})
+    entry_id = client.get("/leaderboard").json()[0]["id"]
+
+    initial = create_initial_state(GameMode.WALLS).model_dump(mode="json")
+    for snake in ([], [{"x": 99, "y": 0}]):
+        upload = {
+            "entryId": entry_id,
+            "seed": 7,
+            "tickCount": 10,
+            "initialState": {**initial, "snake": snake},
+            "inputs": [],
+        }
+        response = client.post("/replays", json=upload)
+        assert response.status_code == 400
+
+
+def test_replay_of_zero_ticks_has_a_keyframe(client):
+    initial = create_initial_state(GameMode.WALLS)
+    game, data = build_replay(7, initial, [], 0, keyframe_interval=32)
+    assert game.tick_count == 0
+    keyframe_tick, keyframe, inputs, food = ReplayReader(data).read_range(0, 50)
+    assert (keyframe_tick, inputs, food) == (0, [], [])
+    assert keyframe.snake == initial.snake
+
+    client.post("/auth/signup", json={"username": "player", "email": "player@example.com", "password": "password123"})
+    client.post("/leaderboard", json={"score": 10, "mode": "walls", "durable": True})
+    entry_id = client.get("/leaderboard").json()[0]["id"]
+    upload = {
+        "entryId": entry_id, "seed": 7, "tickCount": 0,
+        "initialState": initial.model_dump(mode="json"), "inputs": [],
+    }
+    assert client.post("/replays", json=upload).status_code == 200
+    assert client.get(f"/replays/{entry_id}/range?from_tick=0&to_tick=50").status_code == 200
+
+
+def test_unreadable_replay_range_is_not_found(client, db_session):
+    from app.db_models import ReplayModel
+    from app.replay import encode_replay
+
+    user_id = client.post("/auth/signup", json={
+        "username": "player", "email": "player@example.com", "password": "password123"
+    }).json()["user"]["id"]
+    client.post("/leaderboard", json={"score": 10, "mode": "walls", "durable": True})
+    entry_id = client.get("/leaderboard").json()[0]["id"]
+    # A header without chunks, as stored before every replay had a keyframe
+    db_session.add(ReplayModel(
+        leaderboard_entry_id=int(entry_id), user_id=int(user_id), seed=7, mode="walls", tick_count=0, final_score=10,
+        data=encode_replay(7, GameMode.WALLS, 32, [])
+    ))
+    db_session.commit()
+    assert client.get(f"/replays/{entry_id}/range?from_tick=0&to_tick=50").status_code == 404
+
+
+def test_upload_is_capped_in_cpu_time(client, monkeypatch):
+    from app.score_verification import score_verifier
+
+    client.post("/auth/signup", json={"username": "player", "email": "player@example.com", "password": "password123"})
+    client.post("/leaderboard", json={"score": 10, "mode": "pass-through", "durable": True})
+    entry_id = client.get("/leaderboard").json()[0]["id"]
+
+    # A pass-through game without turns runs for every tick it claims
+    monkeypatch.setattr(score_verifier, "cpu_seconds", 0.05)
+    upload = {
+        "entryId": entry_id, "seed": 7, "tickCount": 100000,
+        "initialState": create_initial_state(GameMode.PASS_THROUGH).model_dump(mode="json"), "inputs": [],
+    }
+    response = client.post("/replays", json=upload)
+    assert response.status_code == 400
+    assert "CPU" in response.json()["detail"]
@@ -0,0 +1,120 @@
+import asyncio
+
+from app.db_models import LeaderboardEntryModel, UserModel
+from app.models import GameMode
+from app.score_ingest import ScoreIngestor
+
+
+def _seed_user(db_session):
+    user = UserModel(username="buffered", email="buffered@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_buffered_scores_flushed_on_stop(db_session, async_session_factory):
+    user = _seed_user(db_session)
+    ingestor = ScoreIngestor(batch_size=100, flush_interval=60, buffer_size=100)
+
+    async def run():
+        await ingestor.start(async_session_factory)
+        for score in range(5):
+            assert ingestor.submit(user.id, user.username, score, GameMode.WALLS)
+        assert ingestor.pending == 5
+        await ingestor.stop()
+
+    asyncio.run(run())
+
+    assert ingestor.pending == 0
+    assert db_session.query(LeaderboardEntryModel).count() == 5
+
+
+def test_full_batch_triggers_flush(db_session, async_session_factory):
+    user = _seed_user(db_session)
+    ingestor = ScoreIngestor(batch_size=3, flush_interval=60, buffer_size=100)
+
+    async def run():
+        await ingestor.start(async_session_factory)
+        for score in range(3):
+            ingestor.submit(user.id, user.username, score, GameMode.PASS_THROUGH)
+        for _ in range(50):
+            if ingestor.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        pending = ingestor.pending
+        await ingestor.stop()
+        return pending
+
+    assert asyncio.run(run()) == 0
+    assert db_session.query(LeaderboardEntryModel).count() == 3
+
+
+def test_submit_refused_when_buffer_full(db_session, async_session_factory):
+    user = _seed_user(db_session)
+    ingestor = ScoreIngestor(batch_size=10, flush_interval=60, buffer_size=2)
+
+    # Not started: callers fall back to a direct write
+    assert not ingestor.submit(user.id, user.username, 1, GameMode.WALLS)
+
+    async def run():
+        await ingestor.start(async_session_factory)
+        results = [ingestor.submit(user.id, user.username, s, GameMode.WALLS) for s in range(3)]
+        await ingestor.stop()
+        return results
+
+    assert asyncio.run(run()) == [True, True, False]
+
+
+def test_committed_batch_not_requeued_when_publishing_fails(db_session, async_session_factory, monkeypatch):
+    from app import database
+
+    user = _seed_user(db_session)
+    ingestor = ScoreIngestor(batch_size=10, flush_interval=60, buffer_size=100)
+
+    def broken_publish(entries):
+        raise RuntimeError("index update failed")
+
+    monkeypatch.setattr(database, "publish_leaderboard_entries", broken_publish)
+
+    async def run():
+        await ingestor.start(async_session_factory)
+        for score in range(3):
+            ingestor.submit(user.id, user.username, score, GameMode.WALLS)
+        written = await ingestor.flush()
+        await ingestor.stop()
+        return written
+
+    assert asyncio.run(run()) == 3
+    assert ingestor.pending == 0
+    assert db_session.query(LeaderboardEntryModel).count() == 3
+
+
+def test_failing_batch_split_after_max_attempts(db_session, async_session_factory, monkeypatch):
+    from app import database
+
+    user = _seed_user(db_session)
+    ingestor = ScoreIngestor(batch_size=10, flush_interval=60, buffer_size=100, max_attempts=2)
+    insert = database.insert_leaderboard_entries
+
+    def insert_rejecting_13(db, rows):
+        if any(row["score"] == 13 for row in rows):
+            raise ValueError("bad row")
+        return insert(db, rows)
+
+    monkeypatch.setattr(database, "insert_leaderboard_entries", insert_rejecting_13)
+
+    async def run():
+        await ingestor.start(async_session_factory)
+        for score in (10, 13, 20):
+            ingestor.submit(user.id, user.username, score, GameMode.WALLS)
+        first = await ingestor.flush()
+        pending = ingestor.pending
+        second = await ingestor.flush()
+        await ingestor.stop()
+        return first, pending, second
+
+    # Retried once with the batch kept, then written row by row
+    assert asyncio.run(run()) == (0, 3, 2)
+    assert ingestor.pending == 0
+    scores = sorted(entry.score for entry in db_session.query(LeaderboardEntryModel))
+    assert scores == [10, 20]
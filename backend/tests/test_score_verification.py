@@ -0,0 +1,147 @@
+import asyncio
+
+from app.database import create_leaderboard_entry, get_leaderboard
+from app.db_models import EntryStatusEnum, LeaderboardEntryModel, ReplayModel, UserModel
+from app.engine.verify import REJECTED, VERIFIED, VerificationJob, expected_initial_state, verify_job
+from app.models import EntryStatus, GameMode
+from app.replay import build_replay
+from app.score_verification import ScoreVerifier
+
+SEED = 99
+INPUTS = [(0, "DOWN"), (3, "LEFT"), (9, "UP"), (20, "RIGHT"), (33, "DOWN")]
+
+
+def _job(entry_id=1, user_id=1, score=None, tick_count=120, initial_state=None):
+    initial = expected_initial_state(GameMode.WALLS, SEED)
+    if score is None:
+        game, _ = build_replay(SEED, initial, INPUTS, tick_count, 64)
+        score = game.final_state.score
+    return VerificationJob(
+        entry_id=entry_id,
+        user_id=user_id,
+        score=score,
+        mode=GameMode.WALLS.value,
+        seed=SEED,
+        tick_count=tick_count,
+        initial_state=initial_state or initial.model_dump(mode="json"),
+        inputs=INPUTS,
+    )
+
+
+def test_verify_job():
+    result = verify_job(_job(), cpu_seconds=5, max_ticks=1000, keyframe_interval=64)
+    assert result.status == VERIFIED
+    assert result.replay.startswith(b"SGRP")
+
+    # Claimed score differs from the simulation
+    result = verify_job(_job(score=_job().score + 10), cpu_seconds=5, max_ticks=1000, keyframe_interval=64)
+    assert (result.status, result.replay) == (REJECTED, None)
+
+    # Games must start from the seed's initial state
+    tampered = expected_initial_state(GameMode.WALLS, SEED).model_dump(mode="json")
+    tampered["score"] = 500
+    assert verify_job(_job(initial_state=tampered), 5, 1000, 64).status == REJECTED
+
+    # Tick cap
+    assert verify_job(_job(score=0, tick_count=5000), 5, 1000, 64).status == REJECTED
+
+
+def test_verify_job_cpu_limit():
+    # Walls mode with no turns ends quickly, so use a long pass-through game
+    job = _job(score=0, tick_count=100000)._replace(mode=GameMode.PASS_THROUGH.value, inputs=[])
+    job = job._replace(initial_state=expected_initial_state(GameMode.PASS_THROUGH, SEED).model_dump(mode="json"))
+    result = verify_job(job, cpu_seconds=0.05, max_ticks=100000, keyframe_interval=256)
+    assert result.status == REJECTED
+    assert "CPU" in result.reason
+
+
+def test_verifier_marks_entries(db_session, async_session_factory):
+    user = UserModel(username="verified", email="verified@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+
+    honest = _job(user_id=user.id)
+    entries = [
+        create_leaderboard_entry(db_session, user.id, user.username, score, GameMode.WALLS, EntryStatus.PENDING)
+        for score in (honest.score, honest.score + 1000)
+    ]
+    # Pending entries are hidden
+    assert all(e.score != honest.score + 1000 for e in get_leaderboard(db_session))
+
+    verifier = ScoreVerifier(
+        workers=2, batch_size=4, cpu_seconds=5, queue_size=10, max_ticks=1000, keyframe_interval=64
+    )
+
+    async def run():
+        await verifier.start(async_session_factory)
+        for entry in entries:
+            assert verifier.submit(honest._replace(entry_id=entry.id, score=entry.score))
+        await verifier.stop()
+
+    asyncio.run(run())
+
+    db_session.expire_all()
+    statuses = [db_session.get(LeaderboardEntryModel, entry.id).status for entry in entries]
+    assert statuses == [EntryStatusEnum.VERIFIED, EntryStatusEnum.REJECTED]
+    assert db_session.query(ReplayModel).filter(ReplayModel.leaderboard_entry_id == entries[0].id).count() == 1
+
+
+def test_submit_with_recording_when_verification_off(client):
+    client.post("/auth/signup", json={"username": "rec", "email": "rec@example.com", "password": "password123"})
+    initial = expected_initial_state(GameMode.WALLS, SEED)
+    recording = {
+        "seed": SEED,
+        "tickCount": 10,
+        "initialState": initial.model_dump(mode="json"),
+        "inputs": [],
+    }
+    response = client.post("/leaderboard", json={"score": 40, "mode": "walls", "recording": recording})
+    assert response.status_code == 200
+
+    entry = next(e for e in client.get("/leaderboard?mode=walls").json() if e["username"] == "rec")
+    assert entry["status"] == "unverified"
+    assert client.get(f"/leaderboard/entries/{entry['id']}").json()["status"] == "unverified"
+
+
+def test_stale_pending_entries_rejected(db_session, async_session_factory):
+    from datetime import datetime, timedelta
+    from app.database import reject_stale_pending_entries
+
+    user = UserModel(username="lost", email="lost@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+
+    def pending(age):
+        entry = create_leaderboard_entry(db_session, user.id, user.username, 50, GameMode.WALLS, EntryStatus.PENDING)
+        entry.created_at = datetime.utcnow() - age
+        db_session.commit()
+        return entry.id
+
+    # Startup: entries older than the timeout lost their jobs in the restart
+    lost, recent = pending(timedelta(hours=1)), pending(timedelta(seconds=5))
+    assert reject_stale_pending_entries(db_session, max_age_seconds=600) == 1
+    db_session.expire_all()
+    assert db_session.get(LeaderboardEntryModel, lost).status == EntryStatusEnum.REJECTED
+    assert db_session.get(LeaderboardEntryModel, recent).status == EntryStatusEnum.PENDING
+
+    # A running verifier sweeps them periodically, even while busy
+    verifier = ScoreVerifier(
+        workers=1, batch_size=1, cpu_seconds=5, queue_size=10, max_ticks=1000, keyframe_interval=64,
+        pending_timeout=0.05
+    )
+
+    async def busy(jobs):
+        await asyncio.sleep(0.01)
+        verifier.submit(jobs[0])
+
+    verifier._process = busy
+
+    async def run():
+        await verifier.start(async_session_factory)
+        verifier.submit(_job(entry_id=recent))
+        await asyncio.sleep(0.3)
+        await verifier.stop()
+
+    asyncio.run(run())
+    db_session.expire_all()
+    assert db_session.get(LeaderboardEntryModel, recent).status == EntryStatusEnum.REJECTED
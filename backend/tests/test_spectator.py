@@ -68,3 +68,134 @@ def test_get_player_game_state(client, db_session):
 def test_get_nonexistent_player(client):
     response = client.get("/spectator/player/999999")
     assert response.status_code == 404
+
+def test_diff_game_state_encodes_moves():
+    from app.models import GameState
+    from app.spectator_stream import diff_game_state, REPLACE
+
+    def state(snake, score=0, food=(5, 5)):
+        return GameState(
+            snake=[{"x": x, "y": y} for x, y in snake],
+            food={"x": food[0], "y": food[1]},
+            direction="RIGHT", score=score, status="playing", mode="walls", speed=150
+        )
+
+    old = state([(3, 1), (2, 1), (1, 1)])
+    assert diff_game_state(old, old) is None
+
+    # Plain move: one new head, one tail cell dropped
+    moved = state([(4, 1), (3, 1), (2, 1)])
+    assert diff_game_state(old, moved) == {"head": [[4, 1]], "drop": 1}
+
+    # Ate food: the tail stays
+    grown = state([(4, 1), (3, 1), (2, 1), (1, 1)], score=10, food=(9, 9))
+    assert diff_game_state(old, grown) == {"head": [[4, 1]], "food": [9, 9], "score": 10}
+
+    # Unrelated snake (new game): needs the full state
+    assert diff_game_state(old, state([(10, 10), (9, 10), (8, 10)])) is REPLACE
+
+
+def test_spectator_websocket_streams_snapshot_and_delta(client, db_session):
+    from app.database import update_active_player
+    from app.spectator_stream import spectator_hub
+
+    user = UserModel(username="streamer", email="stream@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+
+    game_state = {
+        "snake": [{"x": 3, "y": 1}, {"x": 2, "y": 1}],
+        "score": 0,
+        "food": {"x": 5, "y": 5},
+        "direction": "RIGHT",
+        "status": "playing",
+        "mode": "walls",
+        "speed": 150
+    }
+    player = ActivePlayerModel(
+        user_id=user.id,
+        username=user.username,
+        score=0,
+        mode=GameModeEnum.WALLS,
+        game_state=game_state,
+        updated_at=datetime.utcnow()
+    )
+    db_session.add(player)
+    db_session.commit()
+
+    with client.websocket_connect(f"/api/spectator/ws?player_id={player.id}") as ws:
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["players"][0]["username"] == "streamer"
+
+        update_active_player(db_session, player.id, 0, {
+            **game_state, "snake": [{"x": 4, "y": 1}, {"x": 3, "y": 1}]
+        })
+        delta = ws.receive_json()
+        assert delta == {"type": "delta", "id": str(player.id), "head": [[4, 1]], "drop": 1}
+
+    assert spectator_hub.subscriber_count == 0
+
+
+def test_stale_active_players_expire(client, db_session, async_session_factory):
+    import asyncio
+    from datetime import timedelta
+    from app.active_player_reaper import ActivePlayerReaper
+    from app.database import get_active_player
+
+    user = UserModel(username="ghost", email="ghost@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+
+    def add_player(updated_at):
+        player = ActivePlayerModel(
+            user_id=user.id, username=user.username, score=0, mode=GameModeEnum.WALLS,
+            game_state={
+                "snake": [], "score": 0, "food": {"x": 1, "y": 1}, "direction": "UP",
+                "status": "playing", "mode": "walls", "speed": 150
+            },
+            updated_at=updated_at
+        )
+        db_session.add(player)
+        db_session.commit()
+        return player
+
+    live = add_player(datetime.utcnow())
+    ghost = add_player(datetime.utcnow() - timedelta(hours=1))
+
+    # Reads leave out expired sessions before they are deleted
+    assert [p["id"] for p in client.get("/spectator/active").json()] == [str(live.id)]
+    assert client.get(f"/spectator/player/{ghost.id}").status_code == 404
+
+    reaper = ActivePlayerReaper(interval=60)
+    reaper._session_factory = async_session_factory
+    assert asyncio.run(reaper.reap()) == 1
+    assert db_session.query(ActivePlayerModel).count() == 1
+    assert get_active_player(db_session, live.id) is not None
+
+
+def test_etag_changes_when_a_game_expires(client, db_session, monkeypatch):
+    from datetime import timedelta
+    from app.config import settings
+
+    user = UserModel(username="fading", email="fading@test.com", password_hash="hash")
+    db_session.add(user)
+    db_session.commit()
+    db_session.add(ActivePlayerModel(
+        user_id=user.id, username=user.username, score=0, mode=GameModeEnum.WALLS,
+        game_state={
+            "snake": [], "score": 0, "food": {"x": 1, "y": 1}, "direction": "UP",
+            "status": "playing", "mode": "walls", "speed": 150
+        },
+        updated_at=datetime.utcnow() - timedelta(minutes=10)
+    ))
+    db_session.commit()
+    monkeypatch.setattr(settings, "ACTIVE_PLAYER_TTL_SECONDS", 3600)
+    etag = client.get("/spectator/active").headers["ETag"]
+    assert client.get("/spectator/active", headers={"If-None-Match": etag}).status_code == 304
+
+    # The game expires with no write and no reaper run in between
+    monkeypatch.setattr(settings, "ACTIVE_PLAYER_TTL_SECONDS", 300)
+    response = client.get("/spectator/active", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
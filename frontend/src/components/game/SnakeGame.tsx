@@ -2,19 +2,14 @@ import { useSnakeGame } from '@/hooks/useSnakeGame';
 import { GameBoard } from './GameBoard';
 import { GameControls } from './GameControls';
 import { useAuthContext } from '@/contexts/AuthContext';
-import api from '@/services/api';
-import { useEffect } from 'react';
+import { useGameSession } from '@/hooks/useGameSession';
 
 export function SnakeGame() {
   const { gameState, startGame, pauseGame, resetGame, changeMode } = useSnakeGame('walls');
   const { isAuthenticated, user } = useAuthContext();
 
-  // Submit score when game ends
-  useEffect(() => {
-    if (gameState.status === 'game-over' && gameState.score > 0 && isAuthenticated) {
-      api.submitScore(gameState.score, gameState.mode);
-    }
-  }, [gameState.status, gameState.score, gameState.mode, isAuthenticated]);
+  // Let spectators watch the game and submit the score when it ends
+  useGameSession(gameState, isAuthenticated);
 
   return (
     <div className="flex flex-col lg:flex-row items-center lg:items-start gap-8 lg:gap-12">
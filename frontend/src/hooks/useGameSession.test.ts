@@ -0,0 +1,40 @@
+import { describe, it, expect } from 'vitest';
+import { diffGameState } from './useGameSession';
+import { GameState } from '@/types/game';
+
+const state = (snake: [number, number][], overrides: Partial<GameState> = {}): GameState => ({
+  snake: snake.map(([x, y]) => ({ x, y })),
+  food: { x: 5, y: 5 },
+  direction: 'RIGHT',
+  score: 0,
+  status: 'playing',
+  mode: 'walls',
+  speed: 150,
+  ...overrides,
+});
+
+describe('diffGameState', () => {
+  it('describes a move as a new head and a dropped tail', () => {
+    expect(diffGameState(state([[3, 1], [2, 1]]), state([[4, 1], [3, 1]]))).toEqual({
+      head: [[4, 1]],
+      drop: 1,
+    });
+  });
+
+  it('keeps the tail when the snake grows and sends only changed fields', () => {
+    const next = state([[4, 1], [3, 1], [2, 1]], { score: 10, food: { x: 9, y: 9 } });
+    expect(diffGameState(state([[3, 1], [2, 1]]), next)).toEqual({
+      head: [[4, 1]],
+      food: [9, 9],
+      score: 10,
+    });
+  });
+
+  it('returns an empty patch when nothing changed', () => {
+    expect(diffGameState(state([[3, 1]]), state([[3, 1]]))).toEqual({});
+  });
+
+  it('needs a snapshot when the snake was replaced', () => {
+    expect(diffGameState(state([[3, 1], [2, 1]]), state([[10, 10], [9, 10]]))).toBeNull();
+  });
+});
@@ -0,0 +1,155 @@
+import { useEffect, useRef } from 'react';
+import { GamePatch, GameState, GameStatus } from '@/types/game';
+import api from '@/services/api';
+
+// Game updates are buffered and uploaded in batches rather than once per move
+export const TICK_UPLOAD_INTERVAL_MS = 500;
+
+// Most updates sent in one upload (the server's limit)
+export const MAX_TICKS_PER_UPLOAD = 64;
+
+// Longest run of moves expressed as one patch before sending a snapshot instead
+const MAX_PATCH_MOVES = 16;
+
+type PatchBody = Omit<GamePatch, 'seq'>;
+
+function sameCells(a: GameState['snake'], b: GameState['snake']): boolean {
+  return a.length === b.length && a.every((p, i) => p.x === b[i].x && p.y === b[i].y);
+}
+
+// Patch turning one state into the next, or null if it takes a snapshot
+export function diffGameState(prev: GameState, next: GameState): PatchBody | null {
+  const patch: PatchBody = {};
+
+  if (!sameCells(prev.snake, next.snake)) {
+    let found = false;
+    // Fewest new head cells such that the rest of the new snake is the front of the old one
+    for (let moves = 1; moves <= Math.min(next.snake.length, MAX_PATCH_MOVES); moves++) {
+      const kept = next.snake.length - moves;
+      if (kept === 0 && prev.snake.length > 0) return null;
+      if (kept <= prev.snake.length && sameCells(next.snake.slice(moves), prev.snake.slice(0, kept))) {
+        patch.head = next.snake.slice(0, moves).map(p => [p.x, p.y] as [number, number]);
+        if (prev.snake.length > kept) {
+          patch.drop = prev.snake.length - kept;
+        }
+        found = true;
+        break;
+      }
+    }
+    if (!found) return null;
+  }
+
+  if (prev.food.x !== next.food.x || prev.food.y !== next.food.y) {
+    patch.food = [next.food.x, next.food.y];
+  }
+  if (prev.score !== next.score) patch.score = next.score;
+  if (prev.status !== next.status) patch.status = next.status;
+  if (prev.direction !== next.direction) patch.direction = next.direction;
+  if (prev.speed !== next.speed) patch.speed = next.speed;
+
+  return patch;
+}
+
+async function finishGame(session: Promise<string | null> | null, final: GameState) {
+  const gameId = session ? await session : null;
+  // Games abandoned by a reset or mode change are ended without a score
+  const score = final.status === 'game-over' ? final.score : 0;
+
+  if (!gameId) {
+    if (score > 0) {
+      await api.submitScore(score, final.mode);
+    }
+    return;
+  }
+  await api.endGame(gameId, score);
+}
+
+// Mirrors a game to the server so spectators can watch it, and submits its score when it ends
+export function useGameSession(gameState: GameState, enabled: boolean) {
+  const sessionRef = useRef<Promise<string | null> | null>(null);
+  const previousStatusRef = useRef<GameStatus>(gameState.status);
+  const lastStateRef = useRef<GameState | null>(null);
+  const seqRef = useRef(0);
+  const patchesRef = useRef<GamePatch[]>([]);
+  const snapshotRef = useRef(false);
+  const uploadingRef = useRef(false);
+
+  useEffect(() => {
+    const previous = previousStatusRef.current;
+    previousStatusRef.current = gameState.status;
+    if (!enabled) return;
+
+    const session = sessionRef.current;
+    if (gameState.status === 'idle' || gameState.status === 'game-over') {
+      if (previous !== gameState.status && (session || gameState.status === 'game-over')) {
+        sessionRef.current = null;
+        patchesRef.current = [];
+        finishGame(session, gameState);
+      }
+      return;
+    }
+
+    if (!session) {
+      // The session starts at sequence number 0 with this state
+      lastStateRef.current = gameState;
+      seqRef.current = 0;
+      patchesRef.current = [];
+      snapshotRef.current = false;
+      sessionRef.current = api
+        .startGame(gameState.mode, gameState)
+        .then(player => (player ? player.id : null));
+      return;
+    }
+
+    const previousState = lastStateRef.current;
+    lastStateRef.current = gameState;
+    if (snapshotRef.current || !previousState) return;
+
+    const patch = diffGameState(previousState, gameState);
+    if (patch === null || patchesRef.current.length >= MAX_TICKS_PER_UPLOAD) {
+      snapshotRef.current = true;
+      patchesRef.current = [];
+    } else if (Object.keys(patch).length > 0) {
+      seqRef.current += 1;
+      patchesRef.current.push({ seq: seqRef.current, ...patch });
+    }
+  }, [gameState, enabled]);
+
+  // Upload the buffered updates on a fixed interval, one upload at a time
+  useEffect(() => {
+    if (!enabled) return;
+
+    const timer = setInterval(async () => {
+      const session = sessionRef.current;
+      if (!session || uploadingRef.current) return;
+      if (!snapshotRef.current && patchesRef.current.length === 0) return;
+
+      uploadingRef.current = true;
+      try {
+        const gameId = await session;
+        if (!gameId || sessionRef.current !== session) return;
+
+        if (snapshotRef.current && lastStateRef.current) {
+          snapshotRef.current = false;
+          seqRef.current += 1;
+          if (!(await api.uploadTicks(gameId, [lastStateRef.current], seqRef.current))) {
+            snapshotRef.current = true;
+            patchesRef.current = [];
+          }
+          return;
+        }
+
+        const patches = patchesRef.current.splice(0);
+        if ((await api.uploadPatches(gameId, patches)) !== 'ok') {
+          // Later patches build on the ones that were not applied
+          snapshotRef.current = true;
+          patchesRef.current = [];
+        }
+      } finally {
+        uploadingRef.current = false;
+      }
+    }, TICK_UPLOAD_INTERVAL_MS);
+
+    return () => clearInterval(timer);
+  }, [enabled]);
+}
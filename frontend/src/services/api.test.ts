@@ -54,6 +54,33 @@ describe('API Service', () => {
       );
     });
 
+    it('stores the access token and sends it as a bearer token', async () => {
+      (global.fetch as any).mockResolvedValueOnce({
+        ok: true,
+        json: async () => ({
+          success: true,
+          user: { id: '1', username: 'TestUser', email: 'test@test.com' },
+          token: 'signed-token',
+        }),
+      });
+
+      await api.login('test@test.com', 'password123');
+      expect(localStorageMock.setItem).toHaveBeenCalledWith('snake_token', 'signed-token');
+
+      localStorageMock.getItem.mockImplementation((key: string) =>
+        key === 'snake_token' ? 'signed-token' : null
+      );
+      (global.fetch as any).mockResolvedValueOnce({ ok: true, json: async () => true });
+
+      await api.submitScore(10, 'walls');
+      expect(global.fetch).toHaveBeenLastCalledWith(
+        'http://localhost:8000/leaderboard',
+        expect.objectContaining({
+          headers: { 'Content-Type': 'application/json', Authorization: 'Bearer signed-token' },
+        })
+      );
+    });
+
     it('handles login failure', async () => {
       const mockResponse = {
         success: false,
@@ -149,7 +176,7 @@ describe('API Service', () => {
 
       const user = await api.getCurrentUser();
 
-      expect(global.fetch).toHaveBeenCalledWith('http://localhost:8000/auth/me');
+      expect(global.fetch).toHaveBeenCalledWith('http://localhost:8000/auth/me', { headers: {} });
       expect(user).toEqual(mockUser);
       expect(localStorageMock.setItem).toHaveBeenCalled();
     });
@@ -221,6 +248,83 @@ describe('API Service', () => {
     });
   });
 
+  describe('game sessions', () => {
+    const gameState = {
+      snake: [{ x: 5, y: 5 }],
+      food: { x: 10, y: 10 },
+      direction: 'RIGHT' as const,
+      score: 0,
+      status: 'playing' as const,
+      mode: 'walls' as const,
+      speed: 150,
+    };
+
+    it('starts a game, uploads ticks in batches and ends it', async () => {
+      (global.fetch as any)
+        .mockResolvedValueOnce({
+          ok: true,
+          json: async () => ({ id: '7', username: 'TestUser', score: 0, mode: 'walls', gameState }),
+        })
+        .mockResolvedValueOnce({ ok: true, json: async () => true })
+        .mockResolvedValueOnce({ ok: true, json: async () => ({ id: '1', score: 30 }) });
+
+      const player = await api.startGame('walls', gameState);
+      expect(player?.id).toBe('7');
+      expect(global.fetch).toHaveBeenLastCalledWith(
+        'http://localhost:8000/games',
+        expect.objectContaining({
+          method: 'POST',
+          body: JSON.stringify({ mode: 'walls', gameState }),
+        })
+      );
+
+      const ticks = [gameState, { ...gameState, score: 10 }];
+      expect(await api.uploadTicks('7', ticks)).toBe(true);
+      expect(global.fetch).toHaveBeenLastCalledWith(
+        'http://localhost:8000/games/7/ticks',
+        expect.objectContaining({ body: JSON.stringify({ ticks }) })
+      );
+
+      expect(await api.endGame('7', 30)).toBe(true);
+      expect(global.fetch).toHaveBeenLastCalledWith(
+        'http://localhost:8000/games/7/end',
+        expect.objectContaining({ body: JSON.stringify({ score: 30 }) })
+      );
+    });
+
+    it('asks for a snapshot when patches are rejected', async () => {
+      (global.fetch as any).mockResolvedValueOnce({
+        ok: false,
+        status: 409,
+        text: async () => '{"detail":{"seq":3}}',
+      });
+
+      const patches = [{ seq: 5, head: [[6, 5]] as [number, number][], drop: 1 }];
+      expect(await api.uploadPatches('7', patches)).toBe('resync');
+      expect(global.fetch).toHaveBeenLastCalledWith(
+        'http://localhost:8000/games/7/patches',
+        expect.objectContaining({ body: JSON.stringify({ patches }) })
+      );
+
+      (global.fetch as any).mockResolvedValueOnce({ ok: true, json: async () => true });
+      await api.uploadTicks('7', [gameState], 6);
+      expect(global.fetch).toHaveBeenLastCalledWith(
+        'http://localhost:8000/games/7/ticks',
+        expect.objectContaining({ body: JSON.stringify({ ticks: [gameState], seq: 6 }) })
+      );
+    });
+
+    it('returns null when a game cannot be started', async () => {
+      (global.fetch as any).mockResolvedValueOnce({
+        ok: false,
+        status: 401,
+        text: async () => 'Not authenticated',
+      });
+
+      expect(await api.startGame('walls', gameState)).toBeNull();
+    });
+  });
+
   describe('getActivePlayers', () => {
     it('fetches active players', async () => {
       const mockPlayers = [
@@ -1,8 +1,16 @@
-import { User, LeaderboardEntry, ActivePlayer, AuthResponse, GameMode, GameState } from '@/types/game';
+import { User, LeaderboardEntry, ActivePlayer, AuthResponse, GameMode, GamePatch, GameState } from '@/types/game';
 
 // API Base URL from environment variable
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'http://localhost:8000';
 
+// Signed access token returned by login/signup, sent as a bearer token
+const TOKEN_KEY = 'snake_token';
+
+function authHeaders(): Record<string, string> {
+  const token = localStorage.getItem(TOKEN_KEY);
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
+
 // Helper function to handle API responses
 async function handleResponse<T>(response: Response): Promise<T> {
   if (!response.ok) {
@@ -27,9 +35,12 @@ export const api = {
 
       const data = await handleResponse<AuthResponse>(response);
 
-      // Store user in localStorage if login successful
+      // Store user and token in localStorage if login successful
       if (data.success && data.user) {
         localStorage.setItem('snake_user', JSON.stringify(data.user));
+        if (data.token) {
+          localStorage.setItem(TOKEN_KEY, data.token);
+        }
       }
 
       return data;
@@ -51,9 +62,12 @@ export const api = {
 
       const data = await handleResponse<AuthResponse>(response);
 
-      // Store user in localStorage if signup successful
+      // Store user and token in localStorage if signup successful
       if (data.success && data.user) {
         localStorage.setItem('snake_user', JSON.stringify(data.user));
+        if (data.token) {
+          localStorage.setItem(TOKEN_KEY, data.token);
+        }
       }
 
       return data;
@@ -67,23 +81,29 @@ export const api = {
     try {
       await fetch(`${API_BASE_URL}/auth/logout`, {
         method: 'POST',
+        headers: authHeaders(),
       });
 
       localStorage.removeItem('snake_user');
+      localStorage.removeItem(TOKEN_KEY);
     } catch (error) {
       console.error('Logout error:', error);
       // Still remove from localStorage even if server call fails
       localStorage.removeItem('snake_user');
+      localStorage.removeItem(TOKEN_KEY);
     }
   },
 
   async getCurrentUser(): Promise<User | null> {
     try {
-      const response = await fetch(`${API_BASE_URL}/auth/me`);
+      const response = await fetch(`${API_BASE_URL}/auth/me`, {
+        headers: authHeaders(),
+      });
 
       if (response.status === 401) {
-        // Not authenticated
+        // Not authenticated (or the token expired)
         localStorage.removeItem('snake_user');
+        localStorage.removeItem(TOKEN_KEY);
         return null;
       }
 
@@ -122,6 +142,7 @@ export const api = {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...authHeaders(),
         },
         body: JSON.stringify({ score, mode }),
       });
@@ -133,6 +154,87 @@ export const api = {
     }
   },
 
+  // Game sessions (make a game visible to spectators while it is played)
+  async startGame(mode: GameMode, gameState: GameState): Promise<ActivePlayer | null> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/games`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...authHeaders(),
+        },
+        body: JSON.stringify({ mode, gameState }),
+      });
+
+      return await handleResponse<ActivePlayer>(response);
+    } catch (error) {
+      console.error('Start game error:', error);
+      return null;
+    }
+  },
+
+  // With a sequence number the upload is a snapshot that later patches continue from
+  async uploadTicks(gameId: string, ticks: GameState[], seq?: number): Promise<boolean> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/games/${gameId}/ticks`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...authHeaders(),
+        },
+        body: JSON.stringify(seq === undefined ? { ticks } : { ticks, seq }),
+      });
+
+      return await handleResponse<boolean>(response);
+    } catch (error) {
+      console.error('Upload ticks error:', error);
+      return false;
+    }
+  },
+
+  // 'resync' means the server needs a snapshot (uploadTicks with a seq) first
+  async uploadPatches(gameId: string, patches: GamePatch[]): Promise<'ok' | 'resync' | 'error'> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/games/${gameId}/patches`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...authHeaders(),
+        },
+        body: JSON.stringify({ patches }),
+      });
+
+      if (response.status === 409) {
+        return 'resync';
+      }
+      await handleResponse<boolean>(response);
+      return 'ok';
+    } catch (error) {
+      console.error('Upload patches error:', error);
+      return 'error';
+    }
+  },
+
+  // Ends the session and submits the final score in one step
+  async endGame(gameId: string, score: number): Promise<boolean> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/games/${gameId}/end`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          ...authHeaders(),
+        },
+        body: JSON.stringify({ score }),
+      });
+
+      await handleResponse<LeaderboardEntry | null>(response);
+      return true;
+    } catch (error) {
+      console.error('End game error:', error);
+      return false;
+    }
+  },
+
   // Active Players (for spectator mode)
   async getActivePlayers(): Promise<ActivePlayer[]> {
     try {
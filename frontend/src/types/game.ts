@@ -17,6 +17,19 @@ export interface GameState {
   speed: number;
 }
 
+// Change to a game state: new head cells (newest first) and cells dropped
+// from the tail, plus only the fields that changed
+export interface GamePatch {
+  seq: number;
+  head?: [number, number][];
+  drop?: number;
+  food?: [number, number];
+  score?: number;
+  status?: GameStatus;
+  direction?: Direction;
+  speed?: number;
+}
+
 export interface User {
   id: string;
   username: string;
@@ -42,5 +55,6 @@ export interface ActivePlayer {
 export interface AuthResponse {
   success: boolean;
   user?: User;
+  token?: string;
   error?: string;
 }
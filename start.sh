@@ -1,10 +1,10 @@
 #!/bin/bash
 set -e
 
-# Start Uvicorn in the background
-echo "Starting Uvicorn..."
+# Start the API workers in the background (SERVER_WORKERS, default one per CPU)
+echo "Starting API server..."
 cd /app/backend
-uvicorn app.main:app --host 127.0.0.1 --port 8000 &
+python -m app.server --host 127.0.0.1 --port 8000 &
 
 # Wait a moment for Uvicorn to start
 sleep 2